@@ -0,0 +1,154 @@
+"""Compares windowed and thumbnail read times of the striped GTiff products are
+written as by default against the same raster converted to COG.
+
+    python -m benchmarks.bench_cog_reads --size 4000 --windows 200
+"""
+
+import json
+import logging
+import shutil
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import click
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+
+from src.data.point_cloud.cog import convert_to_cog
+from src.settings import PROJECT_DIR
+
+DEFAULT_OUTPUT_FILE = PROJECT_DIR / "reports/benchmarks/cog_reads.json"
+
+
+@dataclass
+class ReadRun:
+    output_profile: str
+    file_size_mib: float
+    window_reads: int
+    window_read_ms: float
+    thumbnail_reads: int
+    thumbnail_read_ms: float
+
+
+def write_synthetic_dem(raster_file: Path, size: int, resolution: float = 0.5) -> None:
+    """Writes a rolling float32 surface the way writers.raster does by default:
+    striped GTiff with COMPRESS=DEFLATE.
+    """
+    rng = np.random.default_rng(0)
+    x = np.arange(size) * resolution
+    surface = 300.0 + np.add.outer(3.0 * np.cos(x / 80.0), 5.0 * np.sin(x / 50.0))
+    surface = (surface + rng.normal(0.0, 0.05, (size, size))).astype("float32")
+    profile = {
+        "driver": "GTiff",
+        "width": size,
+        "height": size,
+        "count": 1,
+        "dtype": "float32",
+        "crs": "EPSG:6344",
+        "nodata": -999999.0,
+        "compress": "deflate",
+        "transform": from_origin(689000.0, 4930000.0, resolution, resolution),
+    }
+    with rasterio.open(raster_file, "w", **profile) as dst:
+        dst.write(surface, 1)
+
+
+def _time_reads(raster_file: Path, windows: list[Window], thumbnails: int):
+    with rasterio.open(raster_file) as src:
+        start = time.perf_counter()
+        for window in windows:
+            src.read(1, window=window)
+        window_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(thumbnails):
+            src.read(1, out_shape=(256, 256), resampling=Resampling.average)
+        thumbnail_elapsed = time.perf_counter() - start
+    return window_elapsed, thumbnail_elapsed
+
+
+def bench_cog_reads(
+    size: int, window_count: int, thumbnails: int, work_dir: Path
+) -> list[ReadRun]:
+    logger = logging.getLogger(__name__)
+    gtiff_file = work_dir / "dem_gtiff.tif"
+    cog_file = work_dir / "dem_cog.tif"
+    write_synthetic_dem(gtiff_file, size)
+    shutil.copy(gtiff_file, cog_file)
+    convert_to_cog(str(cog_file))
+
+    rng = np.random.default_rng(0)
+    offsets = rng.integers(0, size - 256, (window_count, 2))
+    windows = [Window(col, row, 256, 256) for col, row in offsets]
+
+    runs = []
+    for output_profile, raster_file in [("gtiff", gtiff_file), ("cog", cog_file)]:
+        # GDAL's block cache would serve repeated reads, so each file is read with
+        # the cache disabled
+        with rasterio.Env(GDAL_CACHEMAX=0):
+            window_elapsed, thumbnail_elapsed = _time_reads(
+                raster_file, windows, thumbnails
+            )
+        run = ReadRun(
+            output_profile=output_profile,
+            file_size_mib=raster_file.stat().st_size / 1024**2,
+            window_reads=window_count,
+            window_read_ms=window_elapsed / window_count * 1000,
+            thumbnail_reads=thumbnails,
+            thumbnail_read_ms=thumbnail_elapsed / thumbnails * 1000,
+        )
+        logger.info(
+            "%s: %.2f ms per 256x256 window, %.1f ms per thumbnail, %.1f MiB",
+            output_profile,
+            run.window_read_ms,
+            run.thumbnail_read_ms,
+            run.file_size_mib,
+        )
+        runs.append(run)
+    return runs
+
+
+@click.command()
+@click.option(
+    "--size", default=2000, show_default=True, help="Raster width and height in cells"
+)
+@click.option(
+    "--windows",
+    "window_count",
+    default=200,
+    show_default=True,
+    help="Number of random 256x256 windows to read",
+)
+@click.option(
+    "--thumbnails",
+    default=10,
+    show_default=True,
+    help="Number of full-extent 256x256 thumbnails to read",
+)
+@click.option(
+    "--output-file",
+    default=DEFAULT_OUTPUT_FILE,
+    show_default=True,
+    type=click.Path(resolve_path=True, dir_okay=False, file_okay=True, path_type=Path),
+)
+def main(size: int, window_count: int, thumbnails: int, output_file: Path) -> None:
+    """Benchmarks random window and thumbnail reads of the default GTiff output
+    against the COG output profile.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        runs = bench_cog_reads(size, window_count, thumbnails, Path(work_dir))
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w") as f:
+        json.dump([asdict(run) for run in runs], f, indent=2)
+
+
+if __name__ == "__main__":
+    log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
@@ -0,0 +1,118 @@
+"""Measures wall time and peak memory of building a Delaunay mesh DEM for one
+synthetic tile as the tile is split into more sub-tiles.
+
+    python -m benchmarks.bench_subtile_dem --density 20 --subtiles 1 --subtiles 4
+"""
+
+import json
+import logging
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import click
+
+from benchmarks.fixtures import synthetic_tile, write_synthetic_las
+from benchmarks.measure import measure_tile_task
+from src.data.point_cloud.pipeline import ProductsConfig, generate_tile_task
+from src.data.point_cloud.product import ProductName
+from src.settings import PROJECT_DIR
+
+DEFAULT_OUTPUT_FILE = PROJECT_DIR / "reports/benchmarks/subtile_dem.json"
+
+
+@dataclass
+class SubtileRun:
+    subtiles: int
+    density: float
+    tile_size: float
+    success: bool
+    elapsed: float
+    max_rss_mib: float
+
+
+def bench_subtile_dem(
+    subtile_counts: list[int],
+    density: float,
+    tile_size: float,
+    resolution: float,
+    halo: float,
+    work_dir: Path,
+) -> list[SubtileRun]:
+    logger = logging.getLogger(__name__)
+    tile = synthetic_tile(size=tile_size)
+    ept_data = write_synthetic_las(
+        work_dir / "points.las", tile, density, buffer=halo + resolution
+    )
+    runs = []
+    for n in subtile_counts:
+        config = ProductsConfig(
+            [ProductName.DELAUNEY_MESH_DEM],
+            resolution,
+            work_dir / f"subtiles_{n}",
+            subtiles=n,
+            halo=halo,
+        )
+        config.output_dir.mkdir(exist_ok=True)
+        task = generate_tile_task(tile, ept_data, config)
+        m = measure_tile_task(task)
+        run = SubtileRun(n, density, tile_size, m.success, m.elapsed, m.max_rss_mib)
+        logger.info(
+            "%sx%s sub-tiles: %.1fs, peak RSS %.0f MiB", n, n, m.elapsed, m.max_rss_mib
+        )
+        runs.append(run)
+    return runs
+
+
+@click.command()
+@click.option(
+    "--subtiles",
+    "subtile_counts",
+    multiple=True,
+    default=[1, 2, 4, 8],
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Sub-tile grid size to measure. Repeat to measure several",
+)
+@click.option(
+    "--density",
+    default=20.0,
+    show_default=True,
+    help="Synthetic point density in points per square meter",
+)
+@click.option(
+    "--tile-size", default=1000.0, show_default=True, help="Tile size in meters"
+)
+@click.option("--resolution", default=0.5, show_default=True)
+@click.option("--halo", default=20.0, show_default=True)
+@click.option(
+    "--output-file",
+    default=DEFAULT_OUTPUT_FILE,
+    show_default=True,
+    type=click.Path(resolve_path=True, dir_okay=False, file_okay=True, path_type=Path),
+)
+def main(
+    subtile_counts: tuple[int, ...],
+    density: float,
+    tile_size: float,
+    resolution: float,
+    halo: float,
+    output_file: Path,
+) -> None:
+    """Benchmarks peak memory and wall time of the Delaunay mesh DEM against the
+    number of sub-tiles each tile is split into.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        runs = bench_subtile_dem(
+            list(subtile_counts), density, tile_size, resolution, halo, Path(work_dir)
+        )
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w") as f:
+        json.dump([asdict(run) for run in runs], f, indent=2)
+
+
+if __name__ == "__main__":
+    log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
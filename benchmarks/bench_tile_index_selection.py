@@ -0,0 +1,138 @@
+"""Compares the latency of selecting the tiles under a small AOI from tile indexes
+of growing size, written as a plain GeoParquet, as a spatially sorted GeoParquet
+with a bbox column, and as a GeoParquet dataset partitioned by workunit.
+
+    python -m benchmarks.bench_tile_index_selection --index-size 100 --index-size 300
+"""
+
+import json
+import logging
+import statistics
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import click
+import geopandas
+from geopandas import GeoDataFrame
+
+from benchmarks.fixtures import synthetic_aoi, synthetic_tile_index
+from src.data.point_cloud.pipeline import select_tiles_by_location
+from src.data.tile_index.storage import (
+    read_tile_index,
+    write_partitioned_tile_index,
+    write_tile_index_parquet,
+)
+from src.settings import PROJECT_DIR
+
+DEFAULT_OUTPUT_FILE = PROJECT_DIR / "reports/benchmarks/tile_index_selection.json"
+
+
+@dataclass
+class SelectionRun:
+    layout: str
+    index_tiles: int
+    selected_tiles: int
+    select_ms: float
+
+
+def _write_layouts(tile_index: GeoDataFrame, work_dir: Path) -> dict[str, Path]:
+    layouts = {
+        "plain": work_dir / "plain.parquet",
+        "sorted": work_dir / "sorted.parquet",
+        "partitioned": work_dir / "partitioned",
+    }
+    tile_index.to_parquet(layouts["plain"])
+    write_tile_index_parquet(tile_index, layouts["sorted"])
+    write_partitioned_tile_index(tile_index, layouts["partitioned"])
+    return layouts
+
+
+def _select_plain(path: Path, aoi: GeoDataFrame) -> GeoDataFrame:
+    return select_tiles_by_location(aoi, geopandas.read_parquet(path))
+
+
+def _select_pushdown(path: Path, aoi: GeoDataFrame) -> GeoDataFrame:
+    return select_tiles_by_location(aoi, read_tile_index(path, aoi))
+
+
+def bench_tile_index_selection(
+    index_sizes: list[int], aoi_fraction: float, repeats: int, work_dir: Path
+) -> list[SelectionRun]:
+    logger = logging.getLogger(__name__)
+    runs = []
+    for index_size in index_sizes:
+        tile_index = synthetic_tile_index(index_size, index_size)
+        aoi = synthetic_aoi(tile_index, aoi_fraction)
+        size_dir = work_dir / str(index_size)
+        size_dir.mkdir()
+        for layout, path in _write_layouts(tile_index, size_dir).items():
+            select = _select_plain if layout == "plain" else _select_pushdown
+            elapsed = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                selected = select(path, aoi)
+                elapsed.append(time.perf_counter() - start)
+            run = SelectionRun(
+                layout=layout,
+                index_tiles=len(tile_index),
+                selected_tiles=len(selected),
+                select_ms=statistics.median(elapsed) * 1000,
+            )
+            logger.info(
+                "%s, %d tiles: %.1f ms to select %d tiles",
+                layout,
+                run.index_tiles,
+                run.select_ms,
+                run.selected_tiles,
+            )
+            runs.append(run)
+    return runs
+
+
+@click.command()
+@click.option(
+    "--index-size",
+    "index_sizes",
+    multiple=True,
+    default=[30, 100, 300],
+    show_default=True,
+    help="Width and height of a synthetic tile index in tiles. Repeat for several",
+)
+@click.option(
+    "--aoi-fraction",
+    default=0.0005,
+    show_default=True,
+    help="Fraction of the tile index covered by the AOI",
+)
+@click.option(
+    "--repeats",
+    default=5,
+    show_default=True,
+    help="Selections timed per layout, of which the median is reported",
+)
+@click.option(
+    "--output-file",
+    default=DEFAULT_OUTPUT_FILE,
+    show_default=True,
+    type=click.Path(resolve_path=True, dir_okay=False, file_okay=True, path_type=Path),
+)
+def main(
+    index_sizes: list[int], aoi_fraction: float, repeats: int, output_file: Path
+) -> None:
+    """Benchmarks tile selection latency against tile index size and layout."""
+    with tempfile.TemporaryDirectory() as work_dir:
+        runs = bench_tile_index_selection(
+            list(index_sizes), aoi_fraction, repeats, Path(work_dir)
+        )
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w") as f:
+        json.dump([asdict(run) for run in runs], f, indent=2)
+
+
+if __name__ == "__main__":
+    log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
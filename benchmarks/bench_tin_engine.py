@@ -0,0 +1,169 @@
+"""Compares the PDAL and NumPy/SciPy engines of the Delaunay mesh DEM on the same
+tile, timing both and measuring how far their rasters differ from each other and,
+for synthetic tiles, from the surface the points were sampled from.
+
+    python -m benchmarks.bench_tin_engine --density 10
+    python -m benchmarks.bench_tin_engine --las-file tile.laz --epsg 6344 \\
+        --bounds 689000 4929000 690000 4930000
+"""
+
+import json
+import logging
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import click
+import numpy as np
+import rasterio
+from pyproj import CRS
+
+from benchmarks.fixtures import synthetic_surface, synthetic_tile, write_synthetic_las
+from benchmarks.measure import measure_tile_task
+from src.data.point_cloud.ept import EPTData
+from src.data.point_cloud.pipeline import ProductsConfig, generate_tile_task
+from src.data.point_cloud.product import DemEngine, ProductName
+from src.settings import PROJECT_DIR
+
+DEFAULT_OUTPUT_FILE = PROJECT_DIR / "reports/benchmarks/tin_engine.json"
+
+
+@dataclass
+class EngineRun:
+    engine: str
+    source: str
+    success: bool
+    elapsed: float
+    max_rss_mib: float
+    rmse_to_pdal: Optional[float] = None
+    max_abs_diff_to_pdal: Optional[float] = None
+    rmse_to_surface: Optional[float] = None
+
+
+def _read_dem(dem_file: str) -> tuple[np.ma.MaskedArray, rasterio.Affine]:
+    with rasterio.open(dem_file) as src:
+        return src.read(1, masked=True), src.transform
+
+
+def _rmse(diff: np.ma.MaskedArray) -> float:
+    return float(np.sqrt(np.ma.mean(diff**2)))
+
+
+def _surface_diff(dem: np.ma.MaskedArray, transform: rasterio.Affine):
+    rows, cols = np.indices(dem.shape)
+    x, y = rasterio.transform.xy(transform, rows, cols)
+    return dem - synthetic_surface(np.asarray(x), np.asarray(y)).reshape(dem.shape)
+
+
+def bench_tin_engine(
+    tile, ept_data: EPTData, source: str, resolution: float, work_dir: Path
+) -> list[EngineRun]:
+    logger = logging.getLogger(__name__)
+    runs, dems = [], {}
+    for engine in DemEngine:
+        config = ProductsConfig(
+            [ProductName.DELAUNEY_MESH_DEM],
+            resolution,
+            work_dir / engine,
+            product_options={ProductName.DELAUNEY_MESH_DEM: {"engine": engine}},
+        )
+        config.output_dir.mkdir(exist_ok=True)
+        task = generate_tile_task(tile, ept_data, config)
+        m = measure_tile_task(task)
+        run = EngineRun(engine, source, m.success, m.elapsed, m.max_rss_mib)
+        if m.success:
+            dems[engine] = _read_dem(next(iter(task.outputs)))
+        if m.success and source == "synthetic":
+            run.rmse_to_surface = _rmse(_surface_diff(*dems[engine]))
+        runs.append(run)
+
+    if len(dems) == len(DemEngine):
+        diff = dems[DemEngine.NUMPY][0] - dems[DemEngine.PDAL][0]
+        runs[-1].rmse_to_pdal = _rmse(diff)
+        runs[-1].max_abs_diff_to_pdal = float(np.ma.max(np.ma.abs(diff)))
+
+    for run in runs:
+        logger.info(
+            "%s engine on %s tile: %.1fs, peak RSS %.0f MiB, RMSE to PDAL %s, "
+            "RMSE to surface %s",
+            run.engine,
+            run.source,
+            run.elapsed,
+            run.max_rss_mib,
+            run.rmse_to_pdal,
+            run.rmse_to_surface,
+        )
+    return runs
+
+
+@click.command()
+@click.option(
+    "--density",
+    default=10.0,
+    show_default=True,
+    help="Synthetic point density in points per square meter",
+)
+@click.option(
+    "--tile-size", default=1000.0, show_default=True, help="Tile size in meters"
+)
+@click.option("--resolution", default=0.5, show_default=True)
+@click.option(
+    "--las-file",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, path_type=Path),
+    help="LAS/LAZ file of a real tile to compare the engines on as well",
+)
+@click.option("--epsg", type=int, help="EPSG code of the real tile")
+@click.option(
+    "--bounds", type=float, nargs=4, help="minx miny maxx maxy of the real tile"
+)
+@click.option(
+    "--output-file",
+    default=DEFAULT_OUTPUT_FILE,
+    show_default=True,
+    type=click.Path(resolve_path=True, dir_okay=False, file_okay=True, path_type=Path),
+)
+def main(
+    density: float,
+    tile_size: float,
+    resolution: float,
+    las_file: Optional[Path],
+    epsg: Optional[int],
+    bounds: Optional[tuple[float, float, float, float]],
+    output_file: Path,
+) -> None:
+    """Benchmarks the PDAL and NumPy/SciPy DEM engines side by side."""
+    runs = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        tile = synthetic_tile(size=tile_size)
+        ept_data = write_synthetic_las(work_dir / "points.las", tile, density)
+        (work_dir / "synthetic").mkdir()
+        runs += bench_tin_engine(
+            tile, ept_data, "synthetic", resolution, work_dir / "synthetic"
+        )
+
+        if las_file is not None:
+            minx, miny, maxx, maxy = bounds
+            tile = synthetic_tile(
+                tile_name=las_file.stem,
+                origin=(minx, miny),
+                size=max(maxx - minx, maxy - miny),
+                crs=CRS.from_epsg(epsg),
+            )
+            ept_data = EPTData(las_file.stem, tile.crs, str(las_file.resolve()))
+            (work_dir / "real").mkdir()
+            runs += bench_tin_engine(
+                tile, ept_data, "real", resolution, work_dir / "real"
+            )
+
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w") as f:
+        json.dump([asdict(run) for run in runs], f, indent=2)
+
+
+if __name__ == "__main__":
+    log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
@@ -0,0 +1,156 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pdal
+from geopandas import GeoDataFrame
+from pyproj import CRS
+from shapely import box
+
+from src.data.point_cloud.ept import EPTData
+from src.data.point_cloud.tile import TileData
+
+POINT_DTYPE = np.dtype(
+    [
+        ("X", "f8"),
+        ("Y", "f8"),
+        ("Z", "f8"),
+        ("Intensity", "u2"),
+        ("Classification", "u1"),
+    ]
+)
+
+
+def synthetic_tile(
+    tile_name: str = "15TXN689290",
+    origin: tuple[float, float] = (689000.0, 4929000.0),
+    size: float = 1000.0,
+    crs: CRS = CRS.from_epsg(6344),
+) -> TileData:
+    minx, miny = origin
+    return TileData(
+        tile_name=tile_name,
+        minx=minx,
+        miny=miny,
+        maxx=minx + size,
+        maxy=miny + size,
+        crs=crs,
+        ept_filter_as_wkt=box(minx, miny, minx + size, miny + size).wkt,
+    )
+
+
+def synthetic_tile_index(
+    columns: int,
+    rows: int,
+    tile_size: float = 1000.0,
+    origin: tuple[float, float] = (600000.0, 4800000.0),
+    workunits: int = 4,
+    crs: CRS = CRS.from_epsg(6344),
+) -> GeoDataFrame:
+    """A grid of columns x rows tiles named like USNG tiles, with consecutive
+    bands of columns assigned to each workunit.
+    """
+    col, row = np.meshgrid(np.arange(columns), np.arange(rows))
+    col, row = col.ravel(), row.ravel()
+    minx = origin[0] + col * tile_size
+    miny = origin[1] + row * tile_size
+    return GeoDataFrame(
+        data={
+            "tile_name": [f"15TXN{c:03d}{r:03d}" for c, r in zip(col, row)],
+            "workunit": [f"SYNTHETIC_{c * workunits // columns}_2024" for c in col],
+        },
+        geometry=box(minx, miny, minx + tile_size, miny + tile_size),
+        crs=crs,
+    )
+
+
+def synthetic_aoi(tile_index: GeoDataFrame, fraction: float = 0.25) -> GeoDataFrame:
+    """A box over the lower left corner of the tile index covering about the
+    given fraction of its tiles.
+    """
+    minx, miny, maxx, maxy = tile_index.total_bounds
+    scale = fraction**0.5
+    aoi = box(minx, miny, minx + (maxx - minx) * scale, miny + (maxy - miny) * scale)
+    return GeoDataFrame(geometry=[aoi.buffer(-1.0)], crs=tile_index.crs).to_crs(4326)
+
+
+def synthetic_surface(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """The gently rolling ground surface synthetic points are sampled from."""
+    return 300.0 + 5.0 * np.sin(x / 50.0) + 3.0 * np.cos(y / 80.0)
+
+
+def synthetic_points(
+    bounds: tuple[float, float, float, float],
+    density: float,
+    ground_fraction: float = 0.6,
+    seed: int = 0,
+) -> np.ndarray:
+    """Uniformly scattered points, a fraction of which are classified as ground
+    and lie on the synthetic surface while the rest lie up to 20 m above it.
+    """
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = bounds
+    count = int((maxx - minx) * (maxy - miny) * density)
+    points = np.zeros(count, dtype=POINT_DTYPE)
+    points["X"] = rng.uniform(minx, maxx, count)
+    points["Y"] = rng.uniform(miny, maxy, count)
+    ground = rng.random(count) < ground_fraction
+    height_above_ground = np.where(ground, 0.0, rng.uniform(0.5, 20.0, count))
+    z = synthetic_surface(points["X"], points["Y"]) + height_above_ground
+    points["Z"] = z + rng.normal(0.0, 0.05, count)
+    points["Intensity"] = rng.integers(0, 4096, count)
+    points["Classification"] = np.where(ground, 2, 1)
+    return points
+
+
+def write_synthetic_las(
+    las_file: Path,
+    tile: TileData,
+    density: float,
+    buffer: float = 50.0,
+    seed: int = 0,
+) -> EPTData:
+    """Writes a LAS file of synthetic points covering the tile plus a buffer and
+    returns an EPTData pointing at it, for use with local_source_pipeline.
+    """
+    bounds = (
+        tile.minx - buffer,
+        tile.miny - buffer,
+        tile.maxx + buffer,
+        tile.maxy + buffer,
+    )
+    points = synthetic_points(bounds, density, seed=seed)
+    writer = {
+        "type": "writers.las",
+        "filename": str(las_file),
+        "a_srs": f"EPSG:{tile.epsg}",
+        "scale_x": 0.01,
+        "scale_y": 0.01,
+        "scale_z": 0.01,
+    }
+    pdal.Pipeline(json.dumps([writer]), arrays=[points]).execute()
+    return EPTData(workunit=tile.tile_name, crs=tile.crs, ept_json_url=str(las_file))
+
+
+def local_source_pipeline(pipeline_json: str) -> str:
+    """Replaces each readers.ept stage with a readers.las stage cropped to the same
+    polygon, so that pipelines built for hosted EPT run against a local LAS file.
+    """
+    stages = []
+    for stage in json.loads(pipeline_json):
+        if stage["type"] != "readers.ept":
+            stages.append(stage)
+            continue
+        las_tag = f"{stage['tag']}_las"
+        stages.append(
+            {"tag": las_tag, "type": "readers.las", "filename": stage["filename"]}
+        )
+        stages.append(
+            {
+                "tag": stage["tag"],
+                "inputs": [las_tag],
+                "type": "filters.crop",
+                "polygon": stage["polygon"],
+            }
+        )
+    return json.dumps(stages)
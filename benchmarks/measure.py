@@ -0,0 +1,53 @@
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from multiprocessing import get_context
+from typing import Any, Callable, Optional
+
+from benchmarks.fixtures import local_source_pipeline
+from src.data.point_cloud.executor import TileTask, execute_tile_task
+
+
+@dataclass
+class Measurement:
+    elapsed: float
+    max_rss_mib: float
+    result: Any = None
+
+
+@dataclass
+class TaskMeasurement:
+    success: bool
+    elapsed: float
+    max_rss_mib: float
+    error: Optional[str] = None
+
+
+def _measure(func: Callable, *args) -> Measurement:
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    max_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return Measurement(elapsed, max_rss_mib, result)
+
+
+def measure_in_fresh_process(func: Callable, *args) -> Measurement:
+    """Calls func in a fresh process, so that ru_maxrss reflects only this call.
+    func, its arguments and its result must be picklable.
+    """
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(_measure, func, *args).result()
+
+
+def _execute(task: TileTask):
+    return execute_tile_task(task, retries=0)
+
+
+def measure_tile_task(task: TileTask) -> TaskMeasurement:
+    """Executes the task against local LAS sources in a fresh process."""
+    task = replace(
+        task, pipeline_jsons=[local_source_pipeline(p) for p in task.pipeline_jsons]
+    )
+    m = measure_in_fresh_process(_execute, task)
+    return TaskMeasurement(m.result.success, m.elapsed, m.max_rss_mib, m.result.error)
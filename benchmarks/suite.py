@@ -0,0 +1,221 @@
+"""Benchmarks each step of the point cloud pipeline offline against synthetic
+fixtures and writes the results, keyed by commit, so runs of different commits
+can be compared.
+
+    python -m benchmarks.suite --density 20 --tile-size 1000
+    python -m benchmarks.suite --baseline reports/benchmarks/suite/<commit>.json
+"""
+
+import json
+import logging
+import platform
+import subprocess
+import tempfile
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import click
+import pdal
+from geopandas import GeoDataFrame
+
+from benchmarks.fixtures import (
+    synthetic_aoi,
+    synthetic_tile,
+    synthetic_tile_index,
+    write_synthetic_las,
+)
+from benchmarks.measure import measure_in_fresh_process, measure_tile_task
+from src.data.point_cloud.ept import EPTData
+from src.data.point_cloud.pipeline import (
+    ProductsConfig,
+    generate_pipelines,
+    generate_tile_data,
+    generate_tile_task,
+    select_tiles_by_location,
+)
+from src.data.point_cloud.product import ProductName
+from src.settings import PROJECT_DIR
+
+DEFAULT_OUTPUT_DIR = PROJECT_DIR / "reports/benchmarks/suite"
+READ_BUFFER = 10.0  # tiles are read with a 10 m buffer, see _calc_ept_filter_as_wkt
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    elapsed: float
+    max_rss_mib: float
+    items: int
+    unit: str
+    params: dict = field(default_factory=dict)
+    success: bool = True
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _count(func, *args) -> int:
+    return len(func(*args))
+
+
+def bench_planning(
+    tile_index: GeoDataFrame, aoi: GeoDataFrame, ept_data: EPTData, work_dir: Path
+) -> list[BenchmarkResult]:
+    """Times selecting tiles, building tile data and building pipelines."""
+    params = {"index_tiles": len(tile_index)}
+    selected = select_tiles_by_location(aoi, tile_index)
+    tile_data = generate_tile_data(selected, ept_data)
+    config = ProductsConfig([ProductName.DELAUNEY_MESH_DEM], 0.5, work_dir)
+
+    steps = [
+        ("select_tiles_by_location", select_tiles_by_location, aoi, tile_index),
+        ("generate_tile_data", generate_tile_data, selected, ept_data),
+        ("generate_pipelines", generate_pipelines, tile_data, ept_data, config),
+    ]
+    results = []
+    for name, func, *args in steps:
+        m = measure_in_fresh_process(_count, func, *args)
+        results.append(
+            BenchmarkResult(name, m.elapsed, m.max_rss_mib, m.result, "tiles", params)
+        )
+    return results
+
+
+def bench_execution(
+    density: float, tile_size: float, resolution: float, work_dir: Path
+) -> list[BenchmarkResult]:
+    """Times the full execution of one tile for each product."""
+    tile = synthetic_tile(size=tile_size)
+    ept_data = write_synthetic_las(work_dir / "points.las", tile, density)
+    points_read = int(density * (tile_size + 2 * READ_BUFFER) ** 2)
+    params = {"density": density, "tile_size": tile_size, "resolution": resolution}
+
+    results = []
+    for product_name in ProductName:
+        config = ProductsConfig([product_name], resolution, work_dir / product_name)
+        config.output_dir.mkdir()
+        task = generate_tile_task(tile, ept_data, config)
+        m = measure_tile_task(task)
+        if not m.success:
+            logging.getLogger(__name__).warning("%s failed: %s", product_name, m.error)
+        results.append(
+            BenchmarkResult(
+                f"execute_tile_task[{product_name}]",
+                m.elapsed,
+                m.max_rss_mib,
+                points_read,
+                "points",
+                params,
+                m.success,
+            )
+        )
+    return results
+
+
+def _log_results(results: list[BenchmarkResult], baseline: Optional[dict]) -> None:
+    logger = logging.getLogger(__name__)
+    baseline_elapsed = {
+        r["name"]: r["elapsed"] for r in (baseline or {}).get("results", [])
+    }
+    for r in results:
+        change = ""
+        if baseline_elapsed.get(r.name):
+            change = f", {r.elapsed / baseline_elapsed[r.name]:.2f}x baseline"
+        logger.info(
+            "%s: %.3fs, peak RSS %.0f MiB, %.0f %s/s%s",
+            r.name,
+            r.elapsed,
+            r.max_rss_mib,
+            r.items_per_second,
+            r.unit,
+            change,
+        )
+
+
+@click.command()
+@click.option(
+    "--density",
+    default=20.0,
+    show_default=True,
+    help="Synthetic point density in points per square meter",
+)
+@click.option(
+    "--tile-size", default=1000.0, show_default=True, help="Tile size in meters"
+)
+@click.option("--resolution", default=0.5, show_default=True)
+@click.option(
+    "--index-size",
+    default=100,
+    show_default=True,
+    help="Width and height of the synthetic tile index in tiles",
+)
+@click.option(
+    "--output-dir",
+    default=DEFAULT_OUTPUT_DIR,
+    show_default=True,
+    type=click.Path(resolve_path=True, dir_okay=True, file_okay=False, path_type=Path),
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, path_type=Path),
+    help="Results of an earlier run to compare wall times against",
+)
+def main(
+    density: float,
+    tile_size: float,
+    resolution: float,
+    index_size: int,
+    output_dir: Path,
+    baseline: Optional[Path],
+) -> None:
+    """Runs the point cloud pipeline benchmark suite."""
+    commit = _git_commit()
+    tile_index = synthetic_tile_index(index_size, index_size, tile_size)
+    aoi = synthetic_aoi(tile_index)
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        ept_data = EPTData("SYNTHETIC", tile_index.crs, str(work_dir / "points.las"))
+        results = bench_planning(tile_index, aoi, ept_data, work_dir)
+        results += bench_execution(density, tile_size, resolution, work_dir)
+
+    baseline_report = None
+    if baseline is not None:
+        with open(baseline) as f:
+            baseline_report = json.load(f)
+    _log_results(results, baseline_report)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report = {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "pdal": getattr(pdal, "__version__", None),
+        "results": [
+            {**asdict(r), "items_per_second": r.items_per_second} for r in results
+        ],
+    }
+    with open(output_dir / f"{commit}.json", "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
@@ -0,0 +1,39 @@
+import logging
+from pathlib import Path
+
+import click
+
+from src.data.point_cloud.ept import DEFAULT_STAC_INDEX_FILE, StacItemIndex
+
+
+@click.command()
+@click.option(
+    "-o",
+    "--index-file",
+    default=DEFAULT_STAC_INDEX_FILE,
+    show_default=True,
+    type=click.Path(resolve_path=True, dir_okay=False, file_okay=True, path_type=Path),
+    help="Local index of the USGS EPT STAC catalog",
+)
+@click.option(
+    "--revalidate",
+    is_flag=True,
+    help="Revalidate previously resolved items with conditional requests",
+)
+def main(index_file: Path, revalidate: bool) -> None:
+    """Builds or refreshes the local workunit to EPT index used to resolve the
+    Entwine Point Tile (ept) source of each workunit without walking the STAC
+    catalog.
+    """
+    logger = logging.getLogger(__name__)
+    index = StacItemIndex.load(index_file)
+    logger.info("Refreshing %s", index.catalog_url)
+    index.refresh(revalidate_items=revalidate)
+    logger.info("Index of %s workunit(s) written to %s", len(index.entries), index_file)
+
+
+if __name__ == "__main__":
+    log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
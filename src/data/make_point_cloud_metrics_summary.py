@@ -0,0 +1,39 @@
+import logging
+from pathlib import Path
+
+import click
+
+from src.data.point_cloud.metrics import summarize_metrics
+
+
+@click.command()
+@click.option(
+    "--metrics-file",
+    required=True,
+    type=click.Path(
+        exists=True, resolve_path=True, dir_okay=False, file_okay=True, path_type=Path
+    ),
+    help="Metrics log written next to the outputs of create_rasters_from_points",
+)
+@click.option(
+    "--top",
+    default=10,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of tiles and stages to list",
+)
+def main(metrics_file: Path, top: int) -> None:
+    """Ranks the slowest tiles and the stages taking the most time in a point cloud
+    metrics log.
+    """
+    logger = logging.getLogger(__name__)
+    slowest_tiles, slowest_stages = summarize_metrics(metrics_file, top)
+    logger.info("Slowest tiles:\n%s", slowest_tiles.to_string(index=False))
+    logger.info("Slowest stages:\n%s", slowest_stages.to_string())
+
+
+if __name__ == "__main__":
+    log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
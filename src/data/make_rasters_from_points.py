@@ -1,9 +1,15 @@
 import logging
 from pathlib import Path
+from typing import Optional
 
 import click
 
-from src.data.point_cloud.pipeline import _cli_create_point_cloud_products
+from src.data.point_cloud.clip import ClipMode
+from src.data.point_cloud.pipeline import (
+    DEFAULT_BATCH_SIZE,
+    _cli_create_point_cloud_products,
+)
+from src.data.point_cloud.product import DemEngine, ProductName
 
 
 @click.command()
@@ -16,8 +22,8 @@ from src.data.point_cloud.pipeline import _cli_create_point_cloud_products
 @click.option(
     "--tile-index-file",
     required=True,
-    type=click.Path(resolve_path=True, dir_okay=False, file_okay=True, path_type=Path),
-    help="Tile index geopackage",
+    type=click.Path(resolve_path=True, dir_okay=True, file_okay=True, path_type=Path),
+    help="Tile index geopackage, GeoParquet file or partitioned GeoParquet dataset",
 )
 @click.option(
     "--output-dir",
@@ -25,11 +31,204 @@ from src.data.point_cloud.pipeline import _cli_create_point_cloud_products
     type=click.Path(resolve_path=True, dir_okay=True, file_okay=False, path_type=Path),
     help="Output directory to write products",
 )
-def main(aoi_file: Path, tile_index_file: Path, output_dir: Path) -> None:
+@click.option(
+    "--product",
+    "products",
+    multiple=True,
+    default=[ProductName.DELAUNEY_MESH_DEM.value],
+    show_default=True,
+    type=click.Choice([name.value for name in ProductName]),
+    help="Raster product to create. Repeat to create several products from one read",
+)
+@click.option(
+    "--resolution",
+    default=0.5,
+    show_default=True,
+    type=click.FloatRange(min=0, min_open=True),
+    help="Cell size of the raster products in meters",
+)
+@click.option(
+    "--points-per-cell",
+    type=click.FloatRange(min=0, min_open=True),
+    help=(
+        "Read the EPT octree only as deep as needed for about this many points per "
+        "cell of the finest product. Every point is read when not set"
+    ),
+)
+@click.option(
+    "--full-density",
+    "full_density_products",
+    multiple=True,
+    type=click.Choice([name.value for name in ProductName]),
+    help="Read every point whenever this product is created. Repeat for several",
+)
+@click.option(
+    "--workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of worker processes used to execute tile pipelines",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Recreate every product, ignoring the output directory's manifest",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Report the tiles and products that would be created without running",
+)
+@click.option(
+    "--ept-cache-dir",
+    type=click.Path(resolve_path=True, dir_okay=True, file_okay=False, path_type=Path),
+    help="Directory of a local cache that EPT reads are served from",
+)
+@click.option(
+    "--ept-cache-size",
+    default=20.0,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="Size limit of the EPT cache in GiB",
+)
+@click.option(
+    "--subtiles",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Split each tile into an N x N grid of sub-tiles to bound peak memory",
+)
+@click.option(
+    "--block-size",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help=(
+        "Read K x K adjacent tiles as one block and crop the tiles' rasters out of "
+        "the block's, so shared edges are fetched once"
+    ),
+)
+@click.option(
+    "--cog",
+    "cog_products",
+    multiple=True,
+    type=click.Choice([name.value for name in ProductName]),
+    help="Write the product as a Cloud-Optimized GeoTIFF. Repeat for several products",
+)
+@click.option(
+    "--dem-engine",
+    default=DemEngine.PDAL.value,
+    show_default=True,
+    type=click.Choice([engine.value for engine in DemEngine]),
+    help="Triangulate DEMs with PDAL's filters or the NumPy/SciPy TIN engine",
+)
+@click.option(
+    "--clip",
+    default=ClipMode.NONE.value,
+    show_default=True,
+    type=click.Choice([mode.value for mode in ClipMode]),
+    help=(
+        "Read partially covered tiles only near the AOI, and mask the rest of their "
+        "rasters with nodata or crop the rasters to the AOI"
+    ),
+)
+@click.option(
+    "--clip-buffer",
+    default=20.0,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="Distance around the AOI, in the tile index's units, read when clipping",
+)
+@click.option(
+    "--plan",
+    is_flag=True,
+    help=(
+        "Estimate each tile's points and memory from the EPT hierarchy and run the "
+        "largest tiles first. With --dry-run, report the estimates"
+    ),
+)
+@click.option(
+    "--memory-budget",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Memory in GiB the tiles running at once may need, as estimated by --plan",
+)
+@click.option(
+    "--stage-metrics",
+    is_flag=True,
+    help="Time every stage and count its points, at the cost of copying points",
+)
+@click.option(
+    "--batch-size",
+    default=DEFAULT_BATCH_SIZE,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Tiles selected at a time while earlier tiles execute",
+)
+@click.option(
+    "--validation-sample",
+    type=click.IntRange(min=1),
+    help="Validate the tile data of a random sample of N tiles per batch, not all",
+)
+@click.option(
+    "--skip-validation",
+    is_flag=True,
+    help="Do not validate the selected tiles and their tile data against schemas",
+)
+def main(
+    aoi_file: Path,
+    tile_index_file: Path,
+    output_dir: Path,
+    products: tuple[str, ...],
+    resolution: float,
+    points_per_cell: Optional[float],
+    full_density_products: tuple[str, ...],
+    workers: int,
+    force: bool,
+    dry_run: bool,
+    ept_cache_dir: Optional[Path],
+    ept_cache_size: float,
+    subtiles: int,
+    block_size: int,
+    cog_products: tuple[str, ...],
+    dem_engine: str,
+    clip: str,
+    clip_buffer: float,
+    plan: bool,
+    memory_budget: Optional[float],
+    stage_metrics: bool,
+    batch_size: int,
+    validation_sample: Optional[int],
+    skip_validation: bool,
+) -> None:
     """Runs a point cloud processing pipeline that produces raster products from
     hosted Entwire Point Tiles (ept).
     """
-    _cli_create_point_cloud_products(aoi_file, tile_index_file, output_dir)
+    _cli_create_point_cloud_products(
+        aoi_file,
+        tile_index_file,
+        output_dir,
+        products=[ProductName(name) for name in products],
+        resolution=resolution,
+        points_per_cell=points_per_cell,
+        full_density_products=[ProductName(name) for name in full_density_products],
+        workers=workers,
+        force=force,
+        dry_run=dry_run,
+        ept_cache_dir=ept_cache_dir,
+        ept_cache_size=int(ept_cache_size * 1024**3),
+        subtiles=subtiles,
+        block_size=block_size,
+        cog_products=[ProductName(name) for name in cog_products],
+        dem_engine=DemEngine(dem_engine),
+        clip=ClipMode(clip),
+        clip_buffer=clip_buffer,
+        plan=plan,
+        memory_budget_mib=None if memory_budget is None else memory_budget * 1024,
+        stage_metrics=stage_metrics,
+        batch_size=batch_size,
+        validation_sample=validation_sample,
+        validate=not skip_validation,
+    )
 
 
 if __name__ == "__main__":
@@ -4,7 +4,12 @@ from pathlib import Path
 import click
 
 from src.data.tile_index.config import TileIndexPipelineConfig
-from src.data.tile_index.pipeline import tile_index_pipeline
+from src.data.tile_index.ept_metadata import (
+    DEFAULT_EPT_METADATA_CACHE_FILE,
+    DEFAULT_TTL,
+    EPTMetadataResolver,
+)
+from src.data.tile_index.pipeline import DEFAULT_SOURCE_CACHE_DIR, tile_index_pipeline
 
 
 @click.command()
@@ -30,20 +35,60 @@ from src.data.tile_index.pipeline import tile_index_pipeline
     "-o",
     "--output-file",
     required=True,
+    type=click.Path(resolve_path=True, dir_okay=True, file_okay=True, path_type=Path),
+    help=(
+        "Output file. A .parquet file is spatially sorted with a bbox column, a path"
+        " without a suffix is written as a GeoParquet dataset partitioned by workunit"
+    ),
+)
+@click.option(
+    "--ept-metadata-cache",
+    default=DEFAULT_EPT_METADATA_CACHE_FILE,
+    show_default=True,
     type=click.Path(resolve_path=True, dir_okay=False, file_okay=True, path_type=Path),
-    help="Output file. Must end with .parquet",
+    help="File caching the SRS read from each source's ept.json",
+)
+@click.option(
+    "--ept-metadata-ttl",
+    default=DEFAULT_TTL / 3600,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="Hours a cached ept.json SRS is used before it is revalidated",
+)
+@click.option(
+    "--cache-dir",
+    default=DEFAULT_SOURCE_CACHE_DIR,
+    show_default=True,
+    type=click.Path(resolve_path=True, dir_okay=True, file_okay=False, path_type=Path),
+    help="Directory of per-source partitions reused while a source is unchanged",
+)
+@click.option(
+    "--workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of worker processes used to extract changed sources",
 )
-def main(config_file: Path, input_dir: Path, output_file: Path) -> None:
+def main(
+    config_file: Path,
+    input_dir: Path,
+    output_file: Path,
+    ept_metadata_cache: Path,
+    ept_metadata_ttl: float,
+    cache_dir: Path,
+    workers: int,
+) -> None:
     """Runs a vector processing pipeline that cleans and merges USGS provided
     Tile Index shapefiles into a compressed geoparquet. Tiles are used to define
     the spatial extent of individual rasters generated from point cloud datasets.
     """
     logger = logging.getLogger(__name__)
     logger.info("Reading configuration settings from %s", config_file)
-    config = TileIndexPipelineConfig.parse_toml(config_file)
+    resolver = EPTMetadataResolver.load(ept_metadata_cache, ept_metadata_ttl * 3600)
+    config = TileIndexPipelineConfig.parse_toml(config_file, resolver)
 
     logger.info("Running pipeline on %s shapefiles", len(config.tile_index_sources))
-    tile_index_pipeline(config, input_dir, output_file)
+    tile_index_pipeline(config, input_dir, output_file, cache_dir, workers)
 
     logger.info("Output tile index written to %s", output_file)
 
@@ -0,0 +1,89 @@
+import math
+from dataclasses import dataclass
+from typing import Iterable
+
+import shapely
+from pyproj import CRS
+from shapely import box
+from shapely.geometry.base import BaseGeometry
+
+from src.data.point_cloud.crs import get_transformer, is_noop_reprojection
+from src.data.point_cloud.subtile import Bounds, mosaic_subtiles
+from src.data.point_cloud.tile import TileData
+
+
+@dataclass
+class Block:
+    tile_data: TileData  # extent of the block's tiles, read as a single polygon
+    tiles: list[TileData]
+
+
+def _read_geometry(tile: TileData) -> BaseGeometry:
+    if tile.clip_as_wkt is not None:
+        return shapely.from_wkt(tile.clip_as_wkt)
+    tile_box = box(tile.minx, tile.miny, tile.maxx, tile.maxy)
+    return tile_box.buffer(10, join_style="mitre")
+
+
+def _footprint_wkt(tiles: list[TileData], tile_crs: CRS, ept_crs: CRS) -> str:
+    footprint = shapely.union_all([_read_geometry(t) for t in tiles])
+    if not is_noop_reprojection(tile_crs, ept_crs):
+        transformer = get_transformer(tile_crs, ept_crs)
+        footprint = shapely.transform(
+            footprint, transformer.transform, interleaved=False
+        )
+    return footprint.wkt
+
+
+def group_tiles_into_blocks(
+    tiles: Iterable[TileData], k: int, ept_crs: CRS
+) -> list[Block]:
+    """Groups tiles into blocks of up to k x k adjacent tiles, aligned to a grid of
+    k tiles from the origin of the tiles' CRS so the same tiles always share a
+    block. Each block is read with the union of its tiles' 10 m buffers, or of
+    their read polygons when clipped to the AOI, so shared edges and the EPT nodes
+    straddling them are fetched once.
+    """
+    members: dict[tuple[int, int], list[TileData]] = {}
+    for tile in tiles:
+        key = (
+            math.floor(tile.minx / (k * (tile.maxx - tile.minx))),
+            math.floor(tile.miny / (k * (tile.maxy - tile.miny))),
+        )
+        members.setdefault(key, []).append(tile)
+
+    blocks = []
+    for block_tiles in members.values():
+        block_tiles.sort(key=lambda t: t.tile_name)
+        first = block_tiles[0]
+        tile_data = TileData(
+            tile_name=f"block_{first.tile_name}",
+            minx=min(t.minx for t in block_tiles),
+            miny=min(t.miny for t in block_tiles),
+            maxx=max(t.maxx for t in block_tiles),
+            maxy=max(t.maxy for t in block_tiles),
+            crs=first.crs,
+            ept_filter_as_wkt=_footprint_wkt(block_tiles, first.crs, ept_crs),
+            _epsg=first.epsg,
+        )
+        blocks.append(Block(tile_data, block_tiles))
+    return blocks
+
+
+def _grid_bounds(tile: TileData, resolution: float) -> Bounds:
+    return (
+        tile.origin_x,
+        tile.origin_y,
+        tile.origin_x + tile.width(resolution) * resolution,
+        tile.origin_y + tile.height(resolution) * resolution,
+    )
+
+
+def crop_tile_from_block(
+    tile: TileData, block_file: str, resolution: float, output_file: str
+) -> None:
+    """Writes the tile's grid cut out of a raster of its block, with the block
+    raster's driver, data type and nodata value.
+    """
+    core = _grid_bounds(tile, resolution)
+    mosaic_subtiles(tile, [(block_file, core)], resolution, output_file)
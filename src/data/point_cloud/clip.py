@@ -0,0 +1,57 @@
+from enum import StrEnum, auto
+
+import numpy as np
+import rasterio
+import shapely
+from geopandas import GeoSeries
+from rasterio.features import geometry_mask
+from shapely.geometry.base import BaseGeometry
+
+
+class ClipMode(StrEnum):
+    NONE = auto()  # read and write whole tiles
+    MASK = auto()  # read the AOI's part of each tile, write whole tiles
+    CROP = auto()  # read the AOI's part of each tile, write only its extent
+
+
+def read_geometries(geometry: GeoSeries, clip_area: BaseGeometry) -> GeoSeries:
+    """The tiles' 10 m mitred read buffers, clipped to the area when one is given."""
+    buffered = geometry.buffer(10, join_style="mitre")
+    if clip_area is None:
+        return buffered
+    return buffered.intersection(clip_area)
+
+
+def crop_bounds(
+    tile_bounds: np.ndarray, read_bounds: np.ndarray, resolution: float
+) -> np.ndarray:
+    """Shrinks each tile's (minx, miny, maxx, maxy) bounds to the bounds of its
+    read polygon, snapped outward to the tile's grid at the resolution so the
+    cropped rasters' cells line up with those of whole-tile rasters.
+    """
+    origin = tile_bounds[:, [0, 1, 0, 1]]
+    cells = (read_bounds - origin) / resolution
+    snapped_cells = np.column_stack([np.floor(cells[:, :2]), np.ceil(cells[:, 2:])])
+    snapped = snapped_cells * resolution + origin
+    return np.column_stack(
+        [
+            np.maximum(snapped[:, :2], tile_bounds[:, :2]),
+            np.minimum(snapped[:, 2:], tile_bounds[:, 2:]),
+        ]
+    )
+
+
+def mask_outside(raster_file: str, clip_as_wkt: str) -> None:
+    """Sets the cells of a raster whose centers fall outside the clip polygon to
+    the raster's nodata value.
+    """
+    with rasterio.open(raster_file, "r+") as dst:
+        if dst.nodata is None:
+            return
+        outside = geometry_mask(
+            [shapely.from_wkt(clip_as_wkt)], dst.shape, dst.transform
+        )
+        for band in range(1, dst.count + 1):
+            data = dst.read(band)
+            data[outside] = dst.nodata
+            dst.write(data, band)
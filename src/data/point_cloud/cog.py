@@ -0,0 +1,28 @@
+import os
+
+import rasterio.shutil
+
+from src.data.point_cloud.product import COG_BLOCK_SIZE
+
+COG_CREATION_OPTIONS = {
+    "BLOCKSIZE": COG_BLOCK_SIZE,
+    "COMPRESS": "DEFLATE",
+    "PREDICTOR": "YES",  # floating point predictor for float data, horizontal otherwise
+    "OVERVIEWS": "AUTO",
+    "OVERVIEW_RESAMPLING": "AVERAGE",
+}
+
+
+def convert_to_cog(raster_file: str) -> None:
+    """Rewrites a raster in place as a Cloud-Optimized GeoTIFF with internal
+    blocks and overviews, so windowed reads and previews decode only what they use.
+    """
+    tmp_file = f"{raster_file}.cog.tmp"
+    try:
+        rasterio.shutil.copy(
+            raster_file, tmp_file, driver="COG", **COG_CREATION_OPTIONS
+        )
+        os.replace(tmp_file, raster_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
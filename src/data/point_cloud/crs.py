@@ -0,0 +1,73 @@
+import math
+from functools import lru_cache
+from typing import Optional
+
+import shapely
+from geopandas import GeoSeries
+from pyproj import CRS, Transformer
+
+
+@lru_cache(maxsize=None)
+def crs_from_epsg(epsg: int) -> CRS:
+    return CRS.from_epsg(epsg)
+
+
+@lru_cache(maxsize=None)
+def epsg_code(crs: CRS) -> Optional[int]:
+    return crs.to_epsg()
+
+
+def _split_compound(crs: CRS) -> tuple[CRS, Optional[CRS]]:
+    """Returns the horizontal and, when there is one, vertical part of the CRS."""
+    if not crs.is_compound:
+        return crs, None
+    horizontal, vertical = crs.sub_crs_list[0], crs.sub_crs_list[-1]
+    return horizontal, vertical if vertical.is_vertical else None
+
+
+@lru_cache(maxsize=None)
+def is_noop_reprojection(from_crs: CRS, to_crs: CRS) -> bool:
+    """Whether reprojecting from one CRS to the other leaves every coordinate as it
+    is. Their horizontal parts must be equivalent; a vertical datum only matters
+    when the target has one, as reprojecting to a CRS without one leaves Z as is.
+    """
+    from_horizontal, from_vertical = _split_compound(from_crs)
+    to_horizontal, to_vertical = _split_compound(to_crs)
+    if not from_horizontal.equals(to_horizontal, ignore_axis_order=True):
+        return False
+    if to_vertical is None:
+        return True
+    if from_vertical is None:
+        return False
+    return from_vertical.equals(to_vertical, ignore_axis_order=True)
+
+
+@lru_cache(maxsize=None)
+def get_transformer(from_crs: CRS, to_crs: CRS) -> Transformer:
+    return Transformer.from_crs(from_crs, to_crs, always_xy=True)
+
+
+def linear_scale(from_crs: CRS, to_crs: CRS, x: float, y: float) -> float:
+    """The length in to_crs units of one from_crs unit at (x, y), the smaller of
+    its x and y directions, e.g. about 1.4 Web Mercator units per meter at 45N.
+    """
+    if is_noop_reprojection(from_crs, to_crs):
+        return 1.0
+    xs, ys = get_transformer(from_crs, to_crs).transform([x, x + 1, x], [y, y, y + 1])
+    return min(
+        math.hypot(xs[1] - xs[0], ys[1] - ys[0]),
+        math.hypot(xs[2] - xs[0], ys[2] - ys[0]),
+    )
+
+
+def reproject_geometries(geometry: GeoSeries, to_crs: CRS) -> GeoSeries:
+    """Reprojects the geometries like GeoSeries.to_crs, but with a cached
+    transformer, and not at all when the CRSs are equivalent.
+    """
+    if is_noop_reprojection(geometry.crs, to_crs):
+        return geometry.set_crs(to_crs, allow_override=True)
+    transformer = get_transformer(geometry.crs, to_crs)
+    reprojected = shapely.transform(
+        geometry.values, transformer.transform, interleaved=False
+    )
+    return GeoSeries(reprojected, index=geometry.index, crs=to_crs)
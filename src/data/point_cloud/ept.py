@@ -1,8 +1,21 @@
-from dataclasses import dataclass
+from __future__ import annotations
 
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Optional
+from urllib.parse import urljoin, urlsplit
+
+import requests
 from pyproj import CRS
-from pystac import Item
-from pystac_client import Client
+
+from src.data.point_cloud.crs import crs_from_epsg
+from src.settings import DATA_DIR
+
+STAC_CATALOG_URL = "https://usgs-lidar-stac.s3-us-west-2.amazonaws.com/ept/catalog.json"
+DEFAULT_STAC_INDEX_FILE = DATA_DIR / "interim/ept_stac_index.json"
 
 
 @dataclass
@@ -12,19 +25,200 @@ class EPTData:
     ept_json_url: str
 
 
-def _get_first_matching_stac_item(stac_catalog_url: str, workunit: str) -> Item:
-    client = Client.open(stac_catalog_url)
-    item_links = [link for link in client.get_item_links() if workunit in link.href]
-    return Item.from_file(item_links[0].href)
+@dataclass
+class StacIndexEntry:
+    workunit: str
+    item_url: str
+    ept_json_url: Optional[str] = None
+    epsg: Optional[int] = None
+    bbox: Optional[list[float]] = None
+    last_modified: Optional[str] = None
+    etag: Optional[str] = None
 
+    @property
+    def is_resolved(self) -> bool:
+        return self.ept_json_url is not None and self.epsg is not None
 
-def fetch_ept_data(workunit: str) -> EPTData:
-    stac_catalog_url = (
-        "https://usgs-lidar-stac.s3-us-west-2.amazonaws.com/ept/catalog.json"
-    )
-    item = _get_first_matching_stac_item(stac_catalog_url, workunit)
+
+def _conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> dict:
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def _workunit_from_href(href: str) -> str:
+    return PurePosixPath(urlsplit(href).path).stem
+
+
+class StacItemIndex:
+    """A locally persisted index of the USGS EPT STAC catalog mapping each
+    workunit to its item url, EPT url, EPSG code and bounds. Items are resolved
+    once and then revalidated with conditional requests on refresh.
+    """
+
+    def __init__(
+        self,
+        index_file: Path,
+        catalog_url: str = STAC_CATALOG_URL,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        self.index_file = index_file
+        self.catalog_url = catalog_url
+        self.session = session or requests.Session()
+        self.catalog_etag: Optional[str] = None
+        self.catalog_last_modified: Optional[str] = None
+        self.entries: dict[str, StacIndexEntry] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(
+        index_file: Path = DEFAULT_STAC_INDEX_FILE,
+        catalog_url: str = STAC_CATALOG_URL,
+        session: Optional[requests.Session] = None,
+    ) -> StacItemIndex:
+        index = StacItemIndex(index_file, catalog_url, session)
+        if index_file.exists():
+            with open(index_file) as f:
+                data = json.load(f)
+            if data["catalog_url"] == catalog_url:
+                index.catalog_etag = data["catalog_etag"]
+                index.catalog_last_modified = data["catalog_last_modified"]
+                index.entries = {
+                    entry["workunit"]: StacIndexEntry(**entry)
+                    for entry in data["entries"]
+                }
+        return index
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "catalog_url": self.catalog_url,
+                "catalog_etag": self.catalog_etag,
+                "catalog_last_modified": self.catalog_last_modified,
+                "entries": [asdict(entry) for entry in self.entries.values()],
+            }
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.index_file.with_suffix(".tmp")
+            with open(tmp_file, "w") as f:
+                json.dump(data, f)
+            tmp_file.replace(self.index_file)
+
+    def refresh_catalog(self) -> bool:
+        """Re-reads the catalog's item links unless it is unchanged since the last
+        refresh. Returns True when the catalog changed.
+        """
+        headers = _conditional_headers(self.catalog_etag, self.catalog_last_modified)
+        r = self.session.get(self.catalog_url, headers=headers)
+        if r.status_code == 304:
+            return False
+        r.raise_for_status()
+        item_urls = {
+            _workunit_from_href(link["href"]): urljoin(self.catalog_url, link["href"])
+            for link in r.json()["links"]
+            if link["rel"] == "item"
+        }
+        with self._lock:
+            self.entries = {
+                workunit: self.entries.get(workunit, StacIndexEntry(workunit, url))
+                for workunit, url in item_urls.items()
+            }
+            self.catalog_etag = r.headers.get("ETag")
+            self.catalog_last_modified = r.headers.get("Last-Modified")
+        return True
+
+    def resolve_entry(self, entry: StacIndexEntry) -> StacIndexEntry:
+        """Fetches the entry's STAC item unless it is unchanged since last read."""
+        headers = _conditional_headers(entry.etag, entry.last_modified)
+        if not entry.is_resolved:
+            headers = {}
+        r = self.session.get(entry.item_url, headers=headers)
+        if r.status_code == 304:
+            return entry
+        r.raise_for_status()
+        item = r.json()
+        resolved = StacIndexEntry(
+            workunit=entry.workunit,
+            item_url=entry.item_url,
+            ept_json_url=urljoin(entry.item_url, item["assets"]["ept.json"]["href"]),
+            epsg=item["properties"]["proj:epsg"],
+            bbox=item.get("bbox"),
+            last_modified=r.headers.get("Last-Modified"),
+            etag=r.headers.get("ETag"),
+        )
+        with self._lock:
+            self.entries[entry.workunit] = resolved
+        return resolved
+
+    def refresh(self, revalidate_items: bool = False, max_workers: int = 16) -> None:
+        """Refreshes the catalog and resolves any new items. Previously resolved
+        items are revalidated with conditional requests when revalidate_items is set.
+        """
+        self.refresh_catalog()
+        entries = [
+            entry
+            for entry in self.entries.values()
+            if revalidate_items or not entry.is_resolved
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(self.resolve_entry, entries))
+        self.save()
+
+    def get(self, workunit: str) -> StacIndexEntry:
+        """Returns the resolved entry of the workunit, which must match exactly."""
+        if workunit not in self.entries:
+            self.refresh_catalog()
+        if workunit not in self.entries:
+            raise KeyError(f"Workunit {workunit} not found in {self.catalog_url}")
+        entry = self.entries[workunit]
+        if not entry.is_resolved:
+            entry = self.resolve_entry(entry)
+            self.save()
+        return entry
+
+
+def _ept_data(entry: StacIndexEntry) -> EPTData:
     return EPTData(
-        workunit=workunit,
-        crs=CRS.from_epsg(item.properties["proj:epsg"]),
-        ept_json_url=item.assets["ept.json"].href,
+        workunit=entry.workunit,
+        crs=crs_from_epsg(entry.epsg),
+        ept_json_url=entry.ept_json_url,
     )
+
+
+def fetch_ept_data(
+    workunit: str, stac_index: Optional[StacItemIndex] = None
+) -> EPTData:
+    stac_index = stac_index or StacItemIndex.load()
+    return _ept_data(stac_index.get(workunit))
+
+
+def fetch_ept_data_for_workunits(
+    workunits: Iterable[str],
+    stac_index: Optional[StacItemIndex] = None,
+    max_workers: int = 8,
+) -> dict[str, EPTData]:
+    """Resolves the EPTData of each distinct workunit. The catalog is refreshed at
+    most once, before any item is fetched, when a workunit is not in the index;
+    the unresolved STAC items are then fetched concurrently.
+    """
+    stac_index = stac_index or StacItemIndex.load()
+    distinct = list(dict.fromkeys(workunits))
+    if any(workunit not in stac_index.entries for workunit in distinct):
+        stac_index.refresh_catalog()
+    missing = [workunit for workunit in distinct if workunit not in stac_index.entries]
+    if missing:
+        raise KeyError(
+            f"Workunits {', '.join(missing)} not found in {stac_index.catalog_url}"
+        )
+    unresolved = [
+        stac_index.entries[workunit]
+        for workunit in distinct
+        if not stac_index.entries[workunit].is_resolved
+    ]
+    if unresolved:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(stac_index.resolve_entry, unresolved))
+        stac_index.save()
+    return {workunit: _ept_data(stac_index.entries[workunit]) for workunit in distinct}
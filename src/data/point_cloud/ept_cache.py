@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import Counter, OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+
+DEFAULT_CACHE_SIZE = 20 * 1024**3  # 20 GiB
+TILE_PATH_PREFIX = "tiles"
+TMP_SUFFIX = ".eptcache-tmp"  # downloads in progress, never cached resources
+
+
+class EPTCache:
+    """A local mirror of the EPT resources (ept.json, hierarchy files and octree
+    nodes) that have been requested, capped at max_bytes by evicting the least
+    recently used files.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = DEFAULT_CACHE_SIZE,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.session = session or requests.Session()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._files: OrderedDict[Path, int] = OrderedDict()
+        self._size = 0
+        self._load_existing()
+
+    def _load_existing(self) -> None:
+        """Registers the files already in cache_dir, deleting any download left
+        unfinished by an earlier process.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        files = []
+        for f in self.cache_dir.rglob("*"):
+            if not f.is_file():
+                continue
+            if f.name.endswith(TMP_SUFFIX):
+                f.unlink(missing_ok=True)
+                continue
+            files.append(f)
+        for f in sorted(files, key=lambda f: f.stat().st_mtime):
+            self._files[f] = f.stat().st_size
+            self._size += self._files[f]
+
+    def cache_path(self, url: str) -> Path:
+        parts = urlsplit(url)
+        relative = Path(parts.netloc, *parts.path.split("/"))
+        if ".." in relative.parts:
+            raise ValueError(f"Refusing to cache url outside of cache_dir: {url}")
+        return self.cache_dir / relative
+
+    def get(self, url: str) -> Path:
+        """Returns the local path of url, downloading it on a cache miss."""
+        return self.fetch(url)[0]
+
+    def fetch(self, url: str) -> tuple[Path, bool]:
+        """Returns the local path of url and whether it was downloaded."""
+        path = self.cache_path(url)
+        with self._lock:
+            if path in self._files:
+                self.hits += 1
+                self._files.move_to_end(path)
+                os.utime(path)
+                return path, False
+            self.misses += 1
+
+        size = self._download(url, path)
+        with self._lock:
+            if path not in self._files:
+                self._files[path] = size
+                self._size += size
+            self._evict(keep=path)
+        return path, True
+
+    def _download(self, url: str, path: Path) -> int:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self.session.get(url, stream=True) as r:
+            r.raise_for_status()
+            r.raw.decode_content = True
+            with NamedTemporaryFile(
+                "wb", dir=path.parent, suffix=TMP_SUFFIX, delete=False
+            ) as tmp:
+                try:
+                    shutil.copyfileobj(r.raw, tmp)
+                except BaseException:
+                    tmp.close()
+                    os.unlink(tmp.name)
+                    raise
+        os.replace(tmp.name, path)
+        return path.stat().st_size
+
+    def _evict(self, keep: Path) -> None:
+        logger = logging.getLogger(__name__)
+        for path in list(self._files):
+            if self._size <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._size -= self._files.pop(path)
+            path.unlink(missing_ok=True)
+            logger.debug("Evicted %s from EPT cache", path)
+
+
+class _EPTCacheRequestHandler(BaseHTTPRequestHandler):
+    server: EPTCacheServer
+
+    def _upstream_url(self) -> tuple[Optional[str], str]:
+        """Returns the tile the request was made for, if any, and the upstream url."""
+        path = urlsplit(self.path).path.lstrip("/")
+        tile_name = None
+        if path.startswith(f"{TILE_PATH_PREFIX}/"):
+            _, tile_name, path = path.split("/", 2)
+        scheme, netloc, path = path.split("/", 2)
+        return tile_name, f"{scheme}://{netloc}/{path}"
+
+    def _send_cached(self, include_body: bool) -> None:
+        try:
+            tile_name, url = self._upstream_url()
+            path, downloaded = self.server.cache.fetch(url)
+        except requests.HTTPError as e:
+            self.send_error(e.response.status_code)
+            return
+        except (requests.RequestException, ValueError) as e:
+            self.send_error(502, explain=str(e))
+            return
+        size = path.stat().st_size
+        self.send_response(200)
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        if include_body:
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile)
+            self.server.record_transfer(tile_name, size, downloaded)
+
+    def do_GET(self) -> None:
+        self._send_cached(include_body=True)
+
+    def do_HEAD(self) -> None:
+        self._send_cached(include_body=False)
+
+    def log_message(self, format: str, *args) -> None:
+        logging.getLogger(__name__).debug(format, *args)
+
+
+class EPTCacheServer(ThreadingHTTPServer):
+    """A caching HTTP proxy on localhost that serves EPT resources from an
+    EPTCache. Remote urls are addressed as http://host:port/<scheme>/<netloc>/<path>
+    so that the relative hierarchy and node urls resolved by readers.ept also pass
+    through the proxy. Urls prefixed with /tiles/<tile_name> are counted towards
+    that tile's bytes_fetched and bytes_downloaded.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, cache: EPTCache, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _EPTCacheRequestHandler)
+        self.cache = cache
+        self.bytes_fetched: Counter[str] = Counter()
+        self.bytes_downloaded: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def record_transfer(
+        self, tile_name: Optional[str], size: int, downloaded: bool
+    ) -> None:
+        """Counts the bytes served for a tile and those downloaded to serve them."""
+        if tile_name is None:
+            return
+        with self._lock:
+            self.bytes_fetched[tile_name] += size
+            if downloaded:
+                self.bytes_downloaded[tile_name] += size
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def proxy_url(self, url: str) -> str:
+        return _proxied_url(url, self.base_url)
+
+    def start(self) -> EPTCacheServer:
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> EPTCacheServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def _proxied_url(url: str, proxy_base_url: str, tile_name: Optional[str] = None) -> str:
+    parts = urlsplit(url)
+    if tile_name is not None:
+        proxy_base_url = f"{proxy_base_url}/{TILE_PATH_PREFIX}/{tile_name}"
+    return f"{proxy_base_url}/{parts.scheme}/{parts.netloc}{parts.path}"
+
+
+def proxy_ept_readers(
+    pipeline_json: str, proxy_base_url: str, tile_name: Optional[str] = None
+) -> str:
+    """Points the readers.ept stages of a serialized pipeline at an EPTCacheServer,
+    attributing the reads to tile_name when one is given.
+    """
+    stages = json.loads(pipeline_json)
+    for stage in stages:
+        if stage.get("type") == "readers.ept":
+            stage["filename"] = _proxied_url(
+                stage["filename"], proxy_base_url, tile_name
+            )
+    return json.dumps(stages)
@@ -0,0 +1,335 @@
+import json
+import logging
+import re
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+import pdal
+
+from src.data.point_cloud.ept_cache import proxy_ept_readers
+from src.data.point_cloud.metrics import (
+    StageMetrics,
+    TileMetrics,
+    execute_pipeline_segmented,
+    output_bytes,
+    peak_rss_mib,
+    reset_peak_rss,
+    source_points,
+)
+
+# Fragments of PDAL/curl error messages raised when a remote EPT read fails for
+# reasons that are likely to resolve on their own (throttling, dropped sockets).
+# Kept specific: PDAL quotes the EPT url in most errors, including permanent ones
+# such as a 404 or an invalid polygon, so "http" or "connection" would match them.
+TRANSIENT_ERROR_MARKERS = (
+    "timeout",
+    "timed out",
+    "couldn't resolve host",
+    "connection reset",
+    "too many requests",
+    "slow down",
+    "service unavailable",
+    "bad gateway",
+)
+
+# An HTTP 429 or 5xx status standing on its own, not as part of a url or name.
+TRANSIENT_STATUS_PATTERN = re.compile(r"(?<![\w./-])(?:429|5\d\d)(?![\w./-])")
+
+# Tasks submitted to the worker pool ahead of completion, per worker. Enough to
+# keep every worker busy while the next tasks are generated, few enough that a
+# lazily generated stream of tasks is never materialized.
+TASKS_IN_FLIGHT_PER_WORKER = 2
+
+
+@dataclass
+class TileTask:
+    """The serialized pipelines that produce a tile's outputs, executed in order,
+    followed by any post steps that assemble or convert the outputs.
+    """
+
+    tile_name: str
+    pipeline_jsons: list[str]
+    outputs: dict[str, str] = field(default_factory=dict)  # filename: input hash
+    post_steps: list[Callable[[], None]] = field(default_factory=list)
+    scratch_dir: Optional[Path] = None  # removed once the task ends, even failing
+    reprojection_elided: bool = False  # the source is already in the tile's CRS
+    read_area: Optional[float] = None  # area read, when clipped to the AOI
+    area_saved: Optional[float] = None  # area clipping to the AOI spared reading
+    estimated_points: Optional[int] = None  # from the EPT hierarchy, when planned
+    estimated_memory_mib: Optional[float] = None
+
+
+@dataclass
+class TileResult:
+    tile_name: str
+    success: bool
+    attempts: int
+    elapsed: float
+    error: Optional[str] = None
+    metrics: TileMetrics = field(default_factory=TileMetrics)
+
+
+def _is_transient(error: Exception) -> bool:
+    message = str(error).lower()
+    if any(marker in message for marker in TRANSIENT_ERROR_MARKERS):
+        return True
+    return TRANSIENT_STATUS_PATTERN.search(message) is not None
+
+
+def _run_pipeline(pipeline_json: str) -> list[StageMetrics]:
+    stages = json.loads(pipeline_json)
+    pipeline = pdal.Pipeline(pipeline_json)
+    start = time.perf_counter()
+    points = pipeline.execute()
+    tags = [stage.get("tag", stage["type"]) for stage in stages]
+    return [StageMetrics(tags, time.perf_counter() - start, points)]
+
+
+def _execute_pipeline(
+    tile_name: str,
+    pipeline_json: str,
+    retries: int,
+    backoff: float,
+    stage_metrics: bool = False,
+) -> tuple[int, Optional[str], list[StageMetrics]]:
+    """Returns the number of attempts made, the error of the last attempt, if it
+    failed, and the metrics of the pipeline's stages.
+    """
+    logger = logging.getLogger(__name__)
+    run = execute_pipeline_segmented if stage_metrics else _run_pipeline
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            metrics = run(pipeline_json)
+        except RuntimeError as e:
+            if attempts <= retries and _is_transient(e):
+                delay = backoff * 2 ** (attempts - 1)
+                logger.warning(
+                    "Tile %s failed (attempt %s), retrying in %ss: %s",
+                    tile_name,
+                    attempts,
+                    delay,
+                    e,
+                )
+                time.sleep(delay)
+                continue
+            return attempts, str(e), []
+        return attempts, None, metrics
+
+
+def execute_tile_task(
+    task: TileTask,
+    retries: int = 3,
+    backoff: float = 2.0,
+    ept_proxy_url: Optional[str] = None,
+    stage_metrics: bool = False,
+) -> TileResult:
+    """Builds a pdal.Pipeline from each of the task's serialized pipelines and
+    executes it, then runs the task's post steps and removes its scratch
+    directory, whether or not they succeed. Transient read failures are
+    retried with exponential backoff; any other failure is returned as an
+    unsuccessful result rather than raised. EPT reads are routed through the
+    EPTCacheServer at ept_proxy_url when one is given.
+
+    The result carries the tile's metrics: the time and point count of each
+    pipeline, or of each stage when stage_metrics is set, the peak RSS, the size
+    of each output and, when the task has no reprojection stage and stage_metrics
+    is set, the number of points that were spared one.
+    """
+    start = time.perf_counter()
+    reset_peak_rss()
+    metrics = TileMetrics()
+    attempts = 0
+
+    def result(error: Optional[str] = None) -> TileResult:
+        if task.reprojection_elided:
+            metrics.points_not_reprojected = source_points(metrics.stages)
+        metrics.max_rss_mib = peak_rss_mib()
+        metrics.output_bytes = output_bytes(list(task.outputs))
+        elapsed = time.perf_counter() - start
+        return TileResult(
+            task.tile_name, error is None, attempts, elapsed, error, metrics
+        )
+
+    try:
+        for pipeline_json in task.pipeline_jsons:
+            if ept_proxy_url is not None:
+                pipeline_json = proxy_ept_readers(
+                    pipeline_json, ept_proxy_url, task.tile_name
+                )
+            pipeline_attempts, error, stages = _execute_pipeline(
+                task.tile_name, pipeline_json, retries, backoff, stage_metrics
+            )
+            attempts = max(attempts, pipeline_attempts)
+            metrics.stages += stages
+            if error is not None:
+                return result(error)
+
+        post_start = time.perf_counter()
+        try:
+            for post_step in task.post_steps:
+                post_step()
+        except Exception as e:
+            return result(repr(e))
+        finally:
+            metrics.post_steps_elapsed = time.perf_counter() - post_start
+        return result()
+    finally:
+        if task.scratch_dir is not None:
+            shutil.rmtree(task.scratch_dir, ignore_errors=True)
+
+
+def _log_result(result: TileResult) -> None:
+    logger = logging.getLogger(__name__)
+    if result.success:
+        logger.info("Tile %s completed in %.1fs", result.tile_name, result.elapsed)
+    else:
+        logger.error("Tile %s failed: %s", result.tile_name, result.error)
+
+
+def _failed_result(tile_name: str, error: Exception) -> TileResult:
+    return TileResult(tile_name, False, 1, 0.0, repr(error))
+
+
+def _serial_result(task: TileTask, *args) -> TileResult:
+    try:
+        return execute_tile_task(task, *args)
+    except Exception as e:  # e.g. a pipeline pdal rejects before executing it
+        return _failed_result(task.tile_name, e)
+
+
+def _future_result(future: Future, tile_name: str) -> TileResult:
+    try:
+        return future.result()
+    except Exception as e:  # e.g. BrokenProcessPool when a worker segfaults
+        return _failed_result(tile_name, e)
+
+
+def _fits_memory_budget(
+    task: TileTask, pending: Iterable[TileTask], memory_budget_mib: Optional[float]
+) -> bool:
+    """Whether the task's estimated memory fits in the budget alongside the tasks
+    already handed to the pool. A task always fits when none are pending, so one
+    estimated beyond the budget still runs, alone.
+    """
+    pending = list(pending)
+    if memory_budget_mib is None or task.estimated_memory_mib is None or not pending:
+        return True
+    in_flight = sum(t.estimated_memory_mib or 0 for t in pending)
+    return in_flight + task.estimated_memory_mib <= memory_budget_mib
+
+
+def iter_tile_results(
+    tasks: Iterable[TileTask],
+    workers: int = 1,
+    retries: int = 3,
+    backoff: float = 2.0,
+    ept_proxy_url: Optional[str] = None,
+    stage_metrics: bool = False,
+    memory_budget_mib: Optional[float] = None,
+) -> Iterator[tuple[TileTask, TileResult]]:
+    """Executes tile tasks as they are drawn from tasks, yielding each task with
+    its result as soon as it completes. Tasks run serially when workers is 1,
+    otherwise across a pool of worker processes that each build their own
+    pdal.Pipeline; the pool is only ever handed a few tasks per worker ahead of
+    completion, so tasks can be generated while earlier ones execute. Either way,
+    a task that raises rather than returning a result is reported as failed.
+
+    With a memory budget, tasks are also held back while the estimated memory of
+    the tasks handed to the pool, queued or running, would exceed it.
+    """
+    if workers <= 1:
+        for task in tasks:
+            result = _serial_result(
+                task, retries, backoff, ept_proxy_url, stage_metrics
+            )
+            _log_result(result)
+            yield task, result
+        return
+
+    tasks = iter(tasks)
+    held: Optional[TileTask] = None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: dict[Future, TileTask] = {}
+        while True:
+            while len(pending) < workers * TASKS_IN_FLIGHT_PER_WORKER:
+                task = held or next(tasks, None)
+                held = None
+                if task is None:
+                    break
+                if not _fits_memory_budget(task, pending.values(), memory_budget_mib):
+                    held = task
+                    break
+                future = pool.submit(
+                    execute_tile_task,
+                    task,
+                    retries,
+                    backoff,
+                    ept_proxy_url,
+                    stage_metrics,
+                )
+                pending[future] = task
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = pending.pop(future)
+                result = _future_result(future, task.tile_name)
+                _log_result(result)
+                yield task, result
+
+
+def execute_tile_tasks(
+    tasks: Iterable[TileTask],
+    workers: int = 1,
+    retries: int = 3,
+    backoff: float = 2.0,
+    ept_proxy_url: Optional[str] = None,
+    stage_metrics: bool = False,
+    memory_budget_mib: Optional[float] = None,
+) -> list[TileResult]:
+    """Executes tile tasks serially when workers is 1, otherwise across a pool of
+    worker processes that each build their own pdal.Pipeline.
+    """
+    return [
+        result
+        for _, result in iter_tile_results(
+            tasks,
+            workers,
+            retries,
+            backoff,
+            ept_proxy_url,
+            stage_metrics,
+            memory_budget_mib,
+        )
+    ]
+
+
+def write_execution_summary(results: list[TileResult], output_file: Path) -> None:
+    succeeded = [r for r in results if r.success]
+    summary = {
+        "tiles": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "results": [
+            {k: v for k, v in asdict(r).items() if k != "metrics"} for r in results
+        ],
+    }
+    with open(output_file, "w") as f:
+        json.dump(summary, f, indent=2)
+
+
+def append_tile_metrics(results: list[TileResult], metrics_file: Path) -> None:
+    """Appends a line per tile result, with its metrics, to a JSONL metrics log."""
+    recorded_at = datetime.now(timezone.utc).isoformat()
+    with open(metrics_file, "a") as f:
+        for result in results:
+            record = {"recorded_at": recorded_at, **asdict(result)}
+            record.update(record.pop("metrics"))
+            f.write(json.dumps(record) + "\n")
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from src.data.point_cloud.product import PDALStage
+
+MANIFEST_FILE_NAME = "manifest.sqlite"
+
+
+def hash_product_inputs(
+    source_stages: list[PDALStage], product_stages: list[PDALStage]
+) -> str:
+    """Hashes everything that determines a product raster: the EPT URL and read
+    polygon of the source stages, and the product stages, which carry the
+    resolution, tile grid and output file name.
+    """
+    inputs = {"source": source_stages, "product": product_stages}
+    serialized = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def output_files(stages: list[PDALStage]) -> list[str]:
+    """Returns the files written by writer stages and by filters.python stages
+    that are given an output filename.
+    """
+    filenames = []
+    for stage in stages:
+        pdalargs = stage.get("pdalargs", {})
+        if stage["type"].startswith("writers."):
+            filenames.append(stage["filename"])
+        elif stage["type"] == "filters.python" and "filename" in pdalargs:
+            filenames.append(pdalargs["filename"])
+    return filenames
+
+
+@dataclass
+class ProductManifest:
+    """Records the input hash of every product raster written to an output
+    directory so reruns can skip products that are already up-to-date.
+    """
+
+    manifest_file: Path
+    entries: dict[str, str] = field(default_factory=dict)
+
+    @staticmethod
+    def load(manifest_file: Path) -> ProductManifest:
+        if not manifest_file.exists():
+            return ProductManifest(manifest_file)
+        with closing(sqlite3.connect(manifest_file)) as con:
+            rows = con.execute("SELECT filename, input_hash FROM products").fetchall()
+        return ProductManifest(manifest_file, dict(rows))
+
+    def is_current(self, filenames: list[str], input_hash: str) -> bool:
+        return all(
+            self.entries.get(filename) == input_hash and Path(filename).exists()
+            for filename in filenames
+        )
+
+    def record(self, tile_name: str, outputs: dict[str, str]) -> None:
+        recorded_at = datetime.now().isoformat(timespec="seconds")
+        rows = [
+            (filename, tile_name, input_hash, recorded_at)
+            for filename, input_hash in outputs.items()
+        ]
+        with closing(sqlite3.connect(self.manifest_file)) as con, con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS products ("
+                "filename TEXT PRIMARY KEY, tile_name TEXT, input_hash TEXT, "
+                "recorded_at TEXT)"
+            )
+            con.executemany("INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?)", rows)
+        self.entries.update(outputs)
@@ -0,0 +1,189 @@
+import json
+import resource
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import pdal
+from pandas import DataFrame
+
+from src.data.point_cloud.point_source import SOURCE_POINTS_TAG
+from src.data.point_cloud.product import PDALStage
+
+METRICS_FILE_NAME = "metrics.jsonl"
+
+# Stages whose output is a mesh or raster attached to the points, which does not
+# survive being passed between pipelines as arrays.
+MESH_STAGE_TYPES = ("filters.delaunay", "filters.faceraster")
+
+
+@dataclass
+class StageMetrics:
+    tags: list[str]  # stages executed together as one pipeline
+    elapsed: float
+    points: Optional[int] = None  # points in the view after the last stage
+
+
+@dataclass
+class TileMetrics:
+    stages: list[StageMetrics] = field(default_factory=list)
+    post_steps_elapsed: float = 0.0
+    max_rss_mib: Optional[float] = None
+    output_bytes: dict[str, int] = field(default_factory=dict)
+    bytes_fetched: Optional[int] = None  # EPT bytes served to readers.ept
+    bytes_downloaded: Optional[int] = None  # EPT bytes downloaded on cache misses
+    points_not_reprojected: Optional[int] = None  # source points left in place
+    read_area: Optional[float] = None  # m2 read, when clipped to the AOI
+    area_saved: Optional[float] = None  # m2 clipping to the AOI spared reading
+    bytes_saved_estimate: Optional[int] = None  # bytes_fetched per m2 read * saved
+
+
+def reset_peak_rss() -> None:
+    """Resets the peak RSS reported by /proc for this process, so consecutive
+    tiles executed by one worker are measured separately. A no-op where the
+    kernel does not support it.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mib() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def segment_stages(stages: list[PDALStage]) -> list[list[PDALStage]]:
+    """Splits tagged stages into segments of one stage each, except that a stage
+    reading the output of a mesh stage joins that stage's segment.
+    """
+    segments = []
+    segment_of: dict[str, list[PDALStage]] = {}
+    type_of: dict[str, str] = {}
+    for stage in stages:
+        mesh_inputs = [
+            tag for tag in stage.get("inputs", []) if type_of[tag] in MESH_STAGE_TYPES
+        ]
+        if mesh_inputs:
+            segment = segment_of[mesh_inputs[0]]
+            segment.append(stage)
+        else:
+            segment = [stage]
+            segments.append(segment)
+        segment_of[stage["tag"]] = segment
+        type_of[stage["tag"]] = stage["type"]
+    return segments
+
+
+def execute_pipeline_segmented(pipeline_json: str) -> list[StageMetrics]:
+    """Executes each segment of the pipeline as its own pdal.Pipeline, passing
+    the points between segments as arrays, to time every stage and count the
+    points after it. Every stage must be tagged and list its inputs, as the stages
+    generated by this package are.
+    """
+    segments = segment_stages(json.loads(pipeline_json))
+    consumers: dict[str, int] = {}
+    for segment in segments:
+        for tag in segment[0].get("inputs", []):
+            consumers[tag] = consumers.get(tag, 0) + 1
+
+    arrays_by_tag = {}
+    metrics = []
+    for segment in segments:
+        first, *rest = segment
+        inputs = first.get("inputs", [])
+        arrays = [array for tag in inputs for array in arrays_by_tag[tag]]
+        first = {k: v for k, v in first.items() if k != "inputs"}
+        pipeline = pdal.Pipeline(json.dumps([first, *rest]), arrays=arrays or None)
+        start = time.perf_counter()
+        points = pipeline.execute()
+        elapsed = time.perf_counter() - start
+        metrics.append(StageMetrics([s["tag"] for s in segment], elapsed, points))
+
+        for tag in inputs:
+            consumers[tag] -= 1
+            if consumers[tag] == 0:
+                del arrays_by_tag[tag]
+        if consumers.get(segment[-1]["tag"]):
+            arrays_by_tag[segment[-1]["tag"]] = pipeline.arrays
+    return metrics
+
+
+def source_points(stages: list[StageMetrics]) -> Optional[int]:
+    """Counts the points the source stages delivered to the products, summed over
+    the pipelines of a tile. Unknown without stage metrics: the point count of a
+    pipeline as a whole is that of whichever branch PDAL reports last, not of its
+    source stage.
+    """
+    sources = [s for s in stages if SOURCE_POINTS_TAG in s.tags]
+    if not sources or any(s.tags != [SOURCE_POINTS_TAG] for s in sources):
+        return None
+    return sum(s.points or 0 for s in sources)
+
+
+def output_bytes(filenames: list[str]) -> dict[str, int]:
+    return {f: Path(f).stat().st_size for f in filenames if Path(f).exists()}
+
+
+def load_metrics(metrics_file: Path) -> tuple[DataFrame, DataFrame]:
+    """Reads a metrics log into a frame of tiles and a frame of stages."""
+    with open(metrics_file) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    tiles = DataFrame(
+        [{k: v for k, v in r.items() if k != "stages"} for r in records],
+        columns=[
+            "recorded_at",
+            "tile_name",
+            "success",
+            "attempts",
+            "elapsed",
+            "max_rss_mib",
+            "bytes_fetched",
+            "points_not_reprojected",
+            "area_saved",
+            "bytes_saved_estimate",
+        ],
+    )
+    stages = DataFrame(
+        [
+            {
+                "recorded_at": r["recorded_at"],
+                "tile_name": r["tile_name"],
+                "stage": "+".join(s["tags"]),
+                "elapsed": s["elapsed"],
+                "points": s["points"],
+            }
+            for r in records
+            for s in r["stages"]
+        ],
+        columns=["recorded_at", "tile_name", "stage", "elapsed", "points"],
+    )
+    return tiles, stages
+
+
+def summarize_metrics(metrics_file: Path, top: int = 10) -> tuple[DataFrame, DataFrame]:
+    """Ranks the slowest tiles, and the stages taking the most time in total."""
+    tiles, stages = load_metrics(metrics_file)
+    slowest_tiles = tiles.sort_values("elapsed", ascending=False).head(top)
+    slowest_stages = (
+        stages.groupby("stage")
+        .agg(
+            total=("elapsed", "sum"),
+            mean=("elapsed", "mean"),
+            max=("elapsed", "max"),
+            runs=("elapsed", "size"),
+            points=("points", "sum"),
+        )
+        .sort_values("total", ascending=False)
+        .head(top)
+    )
+    return slowest_tiles, slowest_stages
@@ -1,18 +1,73 @@
 import json
 import logging
+import math
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
 
 import geopandas
 import pdal
+import shapely
 from geopandas import GeoDataFrame, GeoSeries
-from pandas import DataFrame, Series
+from pandas import Series
 from pyproj import CRS
+from shapely.geometry.base import BaseGeometry
 
+from src.data.point_cloud.block import (
+    Block,
+    crop_tile_from_block,
+    group_tiles_into_blocks,
+)
+from src.data.point_cloud.clip import (
+    ClipMode,
+    crop_bounds,
+    mask_outside,
+    read_geometries,
+)
+from src.data.point_cloud.cog import convert_to_cog
+from src.data.point_cloud.crs import is_noop_reprojection, reproject_geometries
 from src.data.point_cloud.df_schema import SelectedTilesSchema, TileDataSchema
-from src.data.point_cloud.ept import EPTData, fetch_ept_data
+from src.data.point_cloud.ept import EPTData, fetch_ept_data_for_workunits
+from src.data.point_cloud.ept_cache import (
+    DEFAULT_CACHE_SIZE,
+    EPTCache,
+    EPTCacheServer,
+)
+from src.data.point_cloud.executor import (
+    TileResult,
+    TileTask,
+    append_tile_metrics,
+    iter_tile_results,
+    write_execution_summary,
+)
+from src.data.point_cloud.manifest import (
+    MANIFEST_FILE_NAME,
+    ProductManifest,
+    hash_product_inputs,
+    output_files,
+)
+from src.data.point_cloud.metrics import METRICS_FILE_NAME
+from src.data.point_cloud.plan import (
+    PLAN_WINDOW_PER_WORKER,
+    TileEstimate,
+    TilePlanner,
+    largest_first,
+    plan_tile_tasks,
+)
 from src.data.point_cloud.point_source import vendor_classified_ground_points
-from src.data.point_cloud.product import delauney_mesh_dem
-from src.data.point_cloud.tile import TileData
+from src.data.point_cloud.product import (
+    DemEngine,
+    OutputProfile,
+    PDALStage,
+    ProductName,
+    generate_product_stages,
+)
+from src.data.point_cloud.subtile import mosaic_subtiles, split_tile_data
+from src.data.point_cloud.tile import TileData, TileDataBatch
+from src.data.tile_index.storage import read_tile_index, sort_spatially
+
+DEFAULT_BATCH_SIZE = 1024
 
 
 def select_tiles(aoi_file: Path, tile_index_gpkg: Path) -> GeoDataFrame:
@@ -23,90 +78,736 @@ def select_tiles(aoi_file: Path, tile_index_gpkg: Path) -> GeoDataFrame:
 
 
 def select_tiles_by_location(
-    aoi: GeoDataFrame, tile_index: GeoDataFrame
+    aoi: GeoDataFrame, tile_index: GeoDataFrame, validate: bool = True
 ) -> GeoDataFrame:
     proj_aoi = aoi.to_crs(tile_index.crs)
     selected_tiles = geopandas.sjoin(
         left_df=tile_index, right_df=proj_aoi, how="inner", predicate="intersects"
     )
+    # a tile meeting several AOI features is joined once per feature
+    selected_tiles = selected_tiles.drop_duplicates(subset=["workunit", "tile_name"])
+    if not validate:
+        return selected_tiles
     validated: GeoDataFrame = SelectedTilesSchema.validate(selected_tiles)
     return validated
 
 
-# TODO: Test
-def _calc_ept_filter_as_wkt(geometry: GeoSeries, ept_crs: CRS) -> Series:
-    return (
-        geometry.buffer(10, join_style="mitre")
-        .to_crs(ept_crs)
-        .to_wkt()
-        .astype("string")
+def iter_selected_tile_batches(
+    aoi: GeoDataFrame,
+    tile_index: GeoDataFrame,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    validate: bool = True,
+) -> Iterator[GeoDataFrame]:
+    """Lazily selects the tiles intersecting the AOI in spatially compact batches.
+    Candidates are found by bounding box from the tile index's spatial index and
+    ordered along a Hilbert curve; the exact intersection test then runs one batch
+    at a time, so the first batch can be processed before the rest are selected.
+    Validation of each batch against SelectedTilesSchema can be skipped.
+    """
+    logger = logging.getLogger(__name__)
+    proj_aoi = aoi.to_crs(tile_index.crs)
+    _, candidates = tile_index.sindex.query(proj_aoi.geometry)
+    candidate_tiles = sort_spatially(tile_index.iloc[sorted(set(candidates))])
+    logger.info(
+        "AOI bounding boxes overlap %s tile(s) of the tile index", len(candidate_tiles)
     )
+    for start in range(0, len(candidate_tiles), batch_size):
+        batch = candidate_tiles.iloc[start : start + batch_size]
+        selected_tiles = select_tiles_by_location(proj_aoi, batch, validate)
+        if not selected_tiles.empty:
+            yield selected_tiles
+
+
+def _calc_ept_filter_as_wkt(
+    geometry: GeoSeries, ept_crs: CRS, clip_area: Optional[BaseGeometry] = None
+) -> Series:
+    read_geometry = read_geometries(geometry, clip_area)
+    return reproject_geometries(read_geometry, ept_crs).to_wkt().astype("string")
+
+
+def generate_tile_data_batch(
+    selected_tiles: GeoDataFrame,
+    ept_data: EPTData,
+    validate: bool = True,
+    sample: Optional[int] = None,
+    clip_area: Optional[BaseGeometry] = None,
+    crop_resolution: Optional[float] = None,
+) -> TileDataBatch:
+    """Builds column-oriented tile data for the selected tiles. Validation against
+    TileDataSchema can be limited to a random sample of rows, or skipped, for large
+    selections where it would otherwise dominate.
+
+    Given a clip area, in the tiles' CRS, each tile is read only where its buffer
+    intersects the area, and given a crop resolution too, the tile's extent is
+    shrunk to that of its read polygon on the tile's grid.
+    """
+    bounds = selected_tiles.bounds.to_numpy(dtype=float)
+    clip_as_wkt = unclipped_area = None
+    if clip_area is not None:
+        read_geometry = read_geometries(selected_tiles.geometry, clip_area)
+        clip_as_wkt = read_geometry.to_wkt().to_numpy(dtype=object)
+        unclipped = read_geometries(selected_tiles.geometry, None)
+        unclipped_area = unclipped.area.to_numpy(dtype=float)
+        if crop_resolution is not None:
+            read_bounds = read_geometry.bounds.to_numpy(dtype=float)
+            bounds = crop_bounds(bounds, read_bounds, crop_resolution)
+    batch = TileDataBatch(
+        tile_name=selected_tiles["tile_name"].to_numpy(dtype=object),
+        minx=bounds[:, 0],
+        miny=bounds[:, 1],
+        maxx=bounds[:, 2],
+        maxy=bounds[:, 3],
+        crs=selected_tiles.crs,
+        ept_filter_as_wkt=_calc_ept_filter_as_wkt(
+            selected_tiles.geometry, ept_data.crs, clip_area
+        ).to_numpy(dtype=object),
+        clip_as_wkt=clip_as_wkt,
+        unclipped_area=unclipped_area,
+    )
+    if validate:
+        sample = sample if sample is not None and sample < len(batch) else None
+        TileDataSchema.validate(batch.to_frame(), sample=sample)
+    return batch
 
 
 def generate_tile_data(
     selected_tiles: GeoDataFrame, ept_data: EPTData
 ) -> list[TileData]:
-    tile_data_df = DataFrame(
-        data={
-            "tile_name": selected_tiles["tile_name"],
-            "minx": selected_tiles.bounds["minx"],
-            "miny": selected_tiles.bounds["miny"],
-            "maxx": selected_tiles.bounds["maxx"],
-            "maxy": selected_tiles.bounds["maxy"],
-            "crs": selected_tiles.crs,
-            "ept_filter_as_wkt": _calc_ept_filter_as_wkt(
-                selected_tiles.geometry, ept_data.crs
-            ),
+    return list(generate_tile_data_batch(selected_tiles, ept_data))
+
+
+def _check_unique_tags(stages: list[PDALStage]) -> None:
+    tags = [stage["tag"] for stage in stages if "tag" in stage]
+    duplicated = {tag for tag in tags if tags.count(tag) > 1}
+    if duplicated:
+        raise ValueError(f"Pipeline stages have duplicate tags: {sorted(duplicated)}")
+
+
+@dataclass
+class ProductsConfig:
+    """The raster products to create for each tile and how to create them."""
+
+    products: list[ProductName]
+    resolution: float
+    output_dir: Path
+    product_options: dict[ProductName, dict] = field(default_factory=dict)
+    subtiles: int = 1
+    halo: float = 20.0
+    block_size: int = 1
+    points_per_cell: Optional[float] = None  # None reads every point
+    full_density_products: list[ProductName] = field(default_factory=list)
+    clip: ClipMode = ClipMode.NONE
+    clip_buffer: float = 20.0  # distance around the AOI read when clipping
+
+    def __post_init__(self) -> None:
+        if self.subtiles > 1 and self.block_size > 1:
+            raise ValueError("Tiles can be split into sub-tiles or grouped into blocks")
+        if self.subtiles > 1 and self.clip != ClipMode.NONE:
+            raise ValueError("Tiles clipped to the AOI cannot be split into sub-tiles")
+        if self.block_size > 1 and self.clip == ClipMode.CROP:
+            raise ValueError("Tiles cropped to the AOI cannot be grouped into blocks")
+
+    def options(
+        self, product_name: ProductName, output_dir: Optional[Path] = None
+    ) -> dict:
+        return {
+            "resolution": self.resolution,
+            "output_dir": output_dir or self.output_dir,
+            **self.product_options.get(product_name, {}),
         }
+
+    def read_resolution(self) -> Optional[float]:
+        """The coarsest point spacing that still puts points_per_cell points in each
+        cell of the finest product, or None to read every point, as is done when no
+        target is set or a product is listed in full_density_products. Points are
+        counted as read, before the ground filter.
+        """
+        if self.points_per_cell is None:
+            return None
+        if any(name in self.full_density_products for name in self.products):
+            return None
+        finest = min(self.options(name)["resolution"] for name in self.products)
+        return finest / math.sqrt(self.points_per_cell)
+
+    def crop_resolution(self) -> Optional[float]:
+        """The grid cropped tiles are snapped to, that of the coarsest product, or
+        None when tiles are not cropped to the AOI.
+        """
+        if self.clip != ClipMode.CROP:
+            return None
+        return max(self.options(name)["resolution"] for name in self.products)
+
+
+def _source_stages(
+    ept_data: EPTData, tile: TileData, config: ProductsConfig
+) -> list[PDALStage]:
+    return vendor_classified_ground_points(ept_data, tile, config.read_resolution())
+
+
+def _outdated_product_stages(
+    tile: TileData,
+    source_stages: list[PDALStage],
+    config: ProductsConfig,
+    manifest: Optional[ProductManifest],
+) -> tuple[dict[ProductName, list[PDALStage]], dict[str, str]]:
+    """Returns the stages of the products the manifest does not report as
+    up-to-date, along with the input hash of each of their output files.
+    """
+    outdated = {}
+    outputs = {}
+    for product_name in config.products:
+        options = config.options(product_name)
+        product_stages = generate_product_stages(tile, product_name, options)
+        input_hash = hash_product_inputs(source_stages, product_stages)
+        filenames = output_files(product_stages)
+        if manifest is not None and manifest.is_current(filenames, input_hash):
+            continue
+        outdated[product_name] = product_stages
+        outputs.update({filename: input_hash for filename in filenames})
+    return outdated, outputs
+
+
+def _subtile_pipelines(
+    tile: TileData,
+    ept_data: EPTData,
+    outdated: dict[ProductName, list[PDALStage]],
+    config: ProductsConfig,
+    scratch_dir: Path,
+) -> tuple[list[str], list[Callable[[], None]]]:
+    """Builds one pipeline per sub-tile, writing to scratch_dir, and the post
+    steps that mosaic the sub-tile cores into each of the tile's outputs.
+    """
+    split_resolution = max(config.options(name)["resolution"] for name in outdated)
+    subtiles = split_tile_data(
+        tile, config.subtiles, config.halo, split_resolution, ept_data.crs
+    )
+    pipeline_jsons = []
+    parts: dict[str, list] = {}
+    resolutions: dict[str, float] = {}
+    for subtile in subtiles:
+        stages = _source_stages(ept_data, subtile.tile_data, config)
+        for product_name, product_stages in outdated.items():
+            options = config.options(product_name, output_dir=scratch_dir)
+            subtile_stages = generate_product_stages(
+                subtile.tile_data, product_name, options
+            )
+            stages += subtile_stages
+            for output_file, part_file in zip(
+                output_files(product_stages), output_files(subtile_stages)
+            ):
+                parts.setdefault(output_file, []).append((part_file, subtile.core))
+                resolutions[output_file] = options["resolution"]
+        _check_unique_tags(stages)
+        pipeline_jsons.append(json.dumps(stages))
+
+    post_steps = [
+        partial(mosaic_subtiles, tile, parts[f], resolutions[f], f) for f in parts
+    ]
+    return pipeline_jsons, post_steps
+
+
+def _mask_post_steps(
+    tile: TileData, outdated: dict[ProductName, list[PDALStage]]
+) -> list[Callable[[], None]]:
+    if tile.clip_as_wkt is None:
+        return []
+    return [
+        partial(mask_outside, output_file, tile.clip_as_wkt)
+        for product_stages in outdated.values()
+        for output_file in output_files(product_stages)
+    ]
+
+
+def _clip_areas(tiles: list[TileData]) -> tuple[Optional[float], Optional[float]]:
+    """The area read for the tiles clipped to the AOI and the area clipping spared
+    reading, or None for both when no tile is clipped.
+    """
+    clipped = [tile for tile in tiles if tile.clip_as_wkt is not None]
+    if not clipped:
+        return None, None
+    read_area = sum(shapely.from_wkt(tile.clip_as_wkt).area for tile in clipped)
+    return read_area, sum(tile.unclipped_area for tile in clipped) - read_area
+
+
+def _cog_post_steps(
+    outdated: dict[ProductName, list[PDALStage]], config: ProductsConfig
+) -> list[Callable[[], None]]:
+    return [
+        partial(convert_to_cog, output_file)
+        for product_name, product_stages in outdated.items()
+        if config.options(product_name).get("output_profile") == OutputProfile.COG
+        for output_file in output_files(product_stages)
+    ]
+
+
+def generate_tile_task(
+    tile: TileData,
+    ept_data: EPTData,
+    config: ProductsConfig,
+    manifest: Optional[ProductManifest] = None,
+) -> Optional[TileTask]:
+    """Builds a single branched pipeline in which the points read from the EPT
+    source fan out to the stages of every requested product. Products the manifest
+    reports as up-to-date are left out; None is returned when no product remains.
+
+    When config.subtiles is greater than 1 the tile is instead split into a grid of
+    sub-tiles, each read and triangulated by its own pipeline with a halo around its
+    core, and the cores are mosaicked into the tile's outputs. Outputs of tiles
+    clipped to the AOI are masked outside of it, and outputs of products using the
+    COG output profile are converted to COG once they are complete.
+    """
+    source_stages = _source_stages(ept_data, tile, config)
+    outdated, outputs = _outdated_product_stages(tile, source_stages, config, manifest)
+    if not outputs:
+        return None
+
+    scratch_dir = None
+    if config.subtiles > 1:
+        scratch_dir = config.output_dir / ".subtiles" / tile.tile_name
+        pipeline_jsons, post_steps = _subtile_pipelines(
+            tile, ept_data, outdated, config, scratch_dir
+        )
+    else:
+        stages = source_stages + [s for stages in outdated.values() for s in stages]
+        _check_unique_tags(stages)
+        pipeline_jsons, post_steps = [json.dumps(stages)], []
+    post_steps += _mask_post_steps(tile, outdated)
+    post_steps += _cog_post_steps(outdated, config)
+    read_area, area_saved = _clip_areas([tile])
+    return TileTask(
+        tile.tile_name,
+        pipeline_jsons,
+        outputs,
+        post_steps,
+        scratch_dir,
+        reprojection_elided=is_noop_reprojection(ept_data.crs, tile.crs),
+        read_area=read_area,
+        area_saved=area_saved,
+    )
+
+
+def _block_task(
+    block: Block,
+    outdated_by_tile: dict[str, dict[ProductName, list[PDALStage]]],
+    outputs: dict[str, str],
+    ept_data: EPTData,
+    config: ProductsConfig,
+) -> TileTask:
+    """Builds a single pipeline reading the block's points once and creating every
+    product any of its tiles needs over the block, in a scratch directory, and the
+    post steps that crop each tile's outdated outputs out of the block rasters,
+    masking those of tiles clipped to the AOI.
+    """
+    scratch_dir = config.output_dir / ".blocks" / block.tile_data.tile_name
+    stages = _source_stages(ept_data, block.tile_data, config)
+    block_files = {}
+    for product_name in config.products:
+        if not any(product_name in outdated for outdated in outdated_by_tile.values()):
+            continue
+        options = config.options(product_name, output_dir=scratch_dir)
+        product_stages = generate_product_stages(block.tile_data, product_name, options)
+        stages += product_stages
+        block_files[product_name] = output_files(product_stages)
+    _check_unique_tags(stages)
+
+    post_steps = []
+    for tile in block.tiles:
+        outdated = outdated_by_tile[tile.tile_name]
+        for product_name, product_stages in outdated.items():
+            resolution = config.options(product_name)["resolution"]
+            for block_file, output_file in zip(
+                block_files[product_name], output_files(product_stages)
+            ):
+                post_steps.append(
+                    partial(
+                        crop_tile_from_block, tile, block_file, resolution, output_file
+                    )
+                )
+        post_steps += _mask_post_steps(tile, outdated)
+        post_steps += _cog_post_steps(outdated, config)
+    read_area, area_saved = _clip_areas(block.tiles)
+    return TileTask(
+        block.tile_data.tile_name,
+        [json.dumps(stages)],
+        outputs,
+        post_steps,
+        scratch_dir,
+        reprojection_elided=is_noop_reprojection(ept_data.crs, block.tile_data.crs),
+        read_area=read_area,
+        area_saved=area_saved,
+    )
+
+
+def generate_block_tasks(
+    tile_data: Iterable[TileData],
+    ept_data: EPTData,
+    config: ProductsConfig,
+    manifest: Optional[ProductManifest] = None,
+) -> Iterator[TileTask]:
+    """Groups the tiles with outdated products into blocks of up to
+    config.block_size x block_size adjacent tiles and builds one task per block,
+    which reads the block's points with a single readers.ept stage and crops each
+    tile's outputs out of the block's products. The outputs and their input hashes
+    are the same as those of tasks built tile by tile.
+    """
+    outdated_tiles = {}
+    for tile in tile_data:
+        source_stages = _source_stages(ept_data, tile, config)
+        outdated, outputs = _outdated_product_stages(
+            tile, source_stages, config, manifest
+        )
+        if outputs:
+            outdated_tiles[tile.tile_name] = (tile, outdated, outputs)
+
+    tiles = [tile for tile, _, _ in outdated_tiles.values()]
+    for block in group_tiles_into_blocks(tiles, config.block_size, ept_data.crs):
+        if len(block.tiles) == 1:
+            yield generate_tile_task(block.tiles[0], ept_data, config, manifest)
+            continue
+        outdated_by_tile = {}
+        outputs = {}
+        for tile in block.tiles:
+            _, outdated, tile_outputs = outdated_tiles[tile.tile_name]
+            outdated_by_tile[tile.tile_name] = outdated
+            outputs.update(tile_outputs)
+        yield _block_task(block, outdated_by_tile, outputs, ept_data, config)
+
+
+def generate_tile_tasks(
+    tile_data: Iterable[TileData],
+    ept_data: EPTData,
+    config: ProductsConfig,
+    manifest: Optional[ProductManifest] = None,
+) -> list[TileTask]:
+    tasks = [generate_tile_task(tile, ept_data, config, manifest) for tile in tile_data]
+    return [task for task in tasks if task is not None]
+
+
+def iter_workunit_tile_tasks(
+    tile_batches: Iterable[GeoDataFrame],
+    config: ProductsConfig,
+    manifest: Optional[ProductManifest] = None,
+    validation_sample: Optional[int] = None,
+    ept_data_by_workunit: Optional[dict[str, EPTData]] = None,
+    clip_area: Optional[BaseGeometry] = None,
+    validate: bool = True,
+) -> Iterator[TileTask]:
+    """Lazily generates tile tasks for batches of selected tiles that may span
+    several workunits, building each tile's pipeline against the EPT source of its
+    own workunit. The EPT data of a workunit is fetched the first time one of its
+    tiles is reached, unless it is given in ept_data_by_workunit. Tiles are only
+    read where they meet the clip area, in the tiles' CRS, when one is given.
+    Each batch's tile data is validated, on a sample of validation_sample tiles
+    when given, unless validate is unset.
+    """
+    logger = logging.getLogger(__name__)
+    ept_data_by_workunit = dict(ept_data_by_workunit or {})
+    for selected_tiles in tile_batches:
+        workunits = selected_tiles["workunit"].unique()
+        missing = [w for w in workunits if w not in ept_data_by_workunit]
+        if missing:
+            logger.info(
+                "Fetching Entwine Point Tile (EPT) data for %s workunit(s) from AWS "
+                "STAC Catalog",
+                len(missing),
+            )
+            ept_data_by_workunit.update(fetch_ept_data_for_workunits(missing))
+
+        for workunit, tiles in selected_tiles.groupby("workunit", sort=False):
+            ept_data = ept_data_by_workunit[workunit]
+            tile_data = generate_tile_data_batch(
+                tiles,
+                ept_data,
+                validate=validate,
+                sample=validation_sample,
+                clip_area=clip_area,
+                crop_resolution=config.crop_resolution(),
+            )
+            if config.block_size > 1:
+                yield from generate_block_tasks(tile_data, ept_data, config, manifest)
+                continue
+            for tile in tile_data:
+                task = generate_tile_task(tile, ept_data, config, manifest)
+                if task is not None:
+                    yield task
+
+
+def generate_workunit_tile_tasks(
+    selected_tiles: GeoDataFrame,
+    ept_data_by_workunit: dict[str, EPTData],
+    config: ProductsConfig,
+    manifest: Optional[ProductManifest] = None,
+    validation_sample: Optional[int] = None,
+) -> list[TileTask]:
+    """Generates tile tasks for a selection that may span several workunits, building
+    each tile's pipeline against the EPT source of its own workunit.
+    """
+    return list(
+        iter_workunit_tile_tasks(
+            [selected_tiles],
+            config,
+            manifest,
+            validation_sample,
+            ept_data_by_workunit,
+        )
     )
-    validated = TileDataSchema.validate(tile_data_df)
-    tile_data = [TileData(**data) for data in validated.to_dict(orient="records")]
-    return tile_data
 
 
-# TODO: Test
 def generate_pipelines(
-    tile_data: list[TileData], ept_data: EPTData, resolution: float, output_dir: Path
+    tile_data: list[TileData], ept_data: EPTData, config: ProductsConfig
 ) -> list[pdal.Pipeline]:
-    pipelines = []
-    for tile in tile_data:
-        source_stages = vendor_classified_ground_points(ept_data, tile)
-        product_stages = delauney_mesh_dem(tile, resolution, output_dir)
-        pipeline_json = json.dumps(source_stages + product_stages)
-        pipelines.append(pdal.Pipeline(pipeline_json))
-    return pipelines
+    tasks = generate_tile_tasks(tile_data, ept_data, config)
+    return [
+        pdal.Pipeline(pipeline_json)
+        for task in tasks
+        for pipeline_json in task.pipeline_jsons
+    ]
+
+
+def _iter_tile_results(
+    tasks: Iterable[TileTask],
+    workers: int,
+    retries: int,
+    ept_cache_dir: Optional[Path],
+    ept_cache_size: int,
+    stage_metrics: bool = False,
+    memory_budget_mib: Optional[float] = None,
+) -> Iterator[tuple[TileTask, TileResult]]:
+    logger = logging.getLogger(__name__)
+    logger.info("Executing tile pipelines with %s worker(s)", workers)
+    if ept_cache_dir is None:
+        yield from iter_tile_results(
+            tasks,
+            workers=workers,
+            retries=retries,
+            stage_metrics=stage_metrics,
+            memory_budget_mib=memory_budget_mib,
+        )
+        return
+
+    cache = EPTCache(ept_cache_dir, max_bytes=ept_cache_size)
+    with EPTCacheServer(cache) as server:
+        logger.info("Reading EPT resources through local cache %s", ept_cache_dir)
+        for task, result in iter_tile_results(
+            tasks,
+            workers=workers,
+            retries=retries,
+            ept_proxy_url=server.base_url,
+            stage_metrics=stage_metrics,
+            memory_budget_mib=memory_budget_mib,
+        ):
+            result.metrics.bytes_fetched = server.bytes_fetched[result.tile_name]
+            result.metrics.bytes_downloaded = server.bytes_downloaded[result.tile_name]
+            yield task, result
+    logger.info("EPT cache served %s hit(s), %s miss(es)", cache.hits, cache.misses)
+
+
+def _record_read_savings(task: TileTask, result: TileResult) -> None:
+    """Copies the areas read and spared by clipping the task to the AOI into the
+    result's metrics, estimating the bytes spared from the bytes fetched per area.
+    """
+    metrics = result.metrics
+    metrics.read_area, metrics.area_saved = task.read_area, task.area_saved
+    if task.area_saved is not None and metrics.bytes_fetched and task.read_area:
+        bytes_per_area = metrics.bytes_fetched / task.read_area
+        metrics.bytes_saved_estimate = round(task.area_saved * bytes_per_area)
 
 
 def rasters_from_points_pipeline(
-    aoi: GeoDataFrame, tile_index: GeoDataFrame, output_dir: Path
+    aoi: GeoDataFrame,
+    tile_index: GeoDataFrame,
+    config: ProductsConfig,
+    workers: int = 1,
+    retries: int = 3,
+    force: bool = False,
+    dry_run: bool = False,
+    ept_cache_dir: Optional[Path] = None,
+    ept_cache_size: int = DEFAULT_CACHE_SIZE,
+    validation_sample: Optional[int] = None,
+    stage_metrics: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    plan: bool = False,
+    memory_budget_mib: Optional[float] = None,
+    validate: bool = True,
 ) -> None:
     """Runs a point cloud processing pipeline that produces raster products from
-    hosted Entwire Point Tiles (ept).
+    hosted Entwire Point Tiles (ept). Every requested product is generated from a
+    single read of each tile's points. Products recorded in the output directory's
+    manifest with matching inputs are skipped unless force is set.
+
+    Tiles are selected, planned and executed as a stream: execution starts on the
+    first batch of batch_size tiles while later batches are still being selected,
+    and each tile is recorded in the manifest and metrics log as it completes.
+    With config.clip set, partially covered tiles are only read within
+    config.clip_buffer of the AOI, and their rasters masked or cropped to it.
+    Setting stage_metrics times every stage and counts the points after it, at the
+    cost of copying the points between stages. The selected tiles and their tile
+    data are validated against their schemas, on a sample of validation_sample
+    tiles per batch when given, unless validate is unset.
+
+    Setting plan, or a memory budget, estimates each tile's points and memory from
+    the EPT hierarchy before it runs. Tiles then run largest first within a window
+    of a few planned tiles per worker, and no more at once than the budget fits; a
+    dry run reports the estimates.
     """
     logger = logging.getLogger(__name__)
-    selected_tiles = select_tiles_by_location(aoi, tile_index)
-    logger.info(
-        "Intersection of AOI & tile index yielded %s tile(s)", selected_tiles.shape[0]
+    output_dir = config.output_dir
+    manifest = ProductManifest.load(output_dir / MANIFEST_FILE_NAME)
+    clip_area = None
+    if config.clip != ClipMode.NONE:
+        clip_area = aoi.to_crs(tile_index.crs).buffer(config.clip_buffer).union_all()
+    tasks = iter_workunit_tile_tasks(
+        iter_selected_tile_batches(aoi, tile_index, batch_size, validate),
+        config=config,
+        manifest=None if force else manifest,
+        validation_sample=validation_sample,
+        clip_area=clip_area,
+        validate=validate,
     )
 
-    logger.info("Fetching Entwine Point Tile (EPT) data from AWS STAC Catalog")
-    ept_data = fetch_ept_data(selected_tiles["workunit"].iloc[0])
+    if plan or memory_budget_mib is not None:
+        planned = plan_tile_tasks(tasks, TilePlanner())
+        if dry_run:
+            _log_plan_report(planned, workers, memory_budget_mib)
+            return
+        window = workers * PLAN_WINDOW_PER_WORKER
+        tasks = largest_first((task for task, _ in planned), window)
 
-    tile_data = generate_tile_data(selected_tiles, ept_data)
+    if dry_run:
+        _log_dry_run_report(tasks)
+        return
 
-    pipelines = generate_pipelines(
-        tile_data=tile_data, ept_data=ept_data, resolution=0.5, output_dir=output_dir
-    )
+    output_dir.mkdir(parents=True, exist_ok=True)
+    metrics_file = output_dir / METRICS_FILE_NAME
+    results = []
+    for task, result in _iter_tile_results(
+        tasks,
+        workers,
+        retries,
+        ept_cache_dir,
+        ept_cache_size,
+        stage_metrics,
+        memory_budget_mib,
+    ):
+        if result.success:
+            manifest.record(task.tile_name, task.outputs)
+        _record_read_savings(task, result)
+        append_tile_metrics([result], metrics_file)
+        results.append(result)
+    logger.info("%s tile(s) processed", len(results))
+    not_reprojected = [
+        r.metrics.points_not_reprojected
+        for r in results
+        if r.metrics.points_not_reprojected is not None
+    ]
+    if not_reprojected:
+        logger.info(
+            "Sources of %s tile(s) were already in the tile CRS, sparing %s point(s) "
+            "a reprojection",
+            len(not_reprojected),
+            sum(not_reprojected),
+        )
+    clipped = [r.metrics for r in results if r.metrics.area_saved is not None]
+    if clipped:
+        logger.info(
+            "Clipping reads to the AOI spared %.0f m2 of %s tile(s), about %s "
+            "byte(s) of EPT data",
+            sum(m.area_saved for m in clipped),
+            len(clipped),
+            sum(m.bytes_saved_estimate or 0 for m in clipped),
+        )
 
-    for tile, pipeline in zip(tile_data, pipelines):
-        logger.info("Executing pipeline for tile: %s", tile.tile_name)
-        pipeline.execute()
+    summary_file = output_dir / "execution_summary.json"
+    write_execution_summary(results, summary_file)
+    failed = [r.tile_name for r in results if not r.success]
+    if failed:
+        logger.warning("%s tile(s) failed: %s", len(failed), ", ".join(failed))
+    logger.info("Execution summary written to %s", summary_file)
+    logger.info("Tile metrics appended to %s", metrics_file)
 
     logger.info("Complete")
 
 
+def _log_dry_run_report(tasks: Iterable[TileTask]) -> None:
+    logger = logging.getLogger(__name__)
+    logger.info("Dry run, tiles that would be processed:")
+    count = 0
+    for task in tasks:
+        logger.info("  %s -> %s", task.tile_name, ", ".join(task.outputs))
+        count += 1
+    logger.info("Dry run, %s tile(s) would be processed", count)
+
+
+def _log_plan_report(
+    planned: Iterable[tuple[TileTask, TileEstimate]],
+    workers: int,
+    memory_budget_mib: Optional[float],
+) -> None:
+    logger = logging.getLogger(__name__)
+    logger.info("Dry run, estimated cost of the tiles that would be processed:")
+    estimates = []
+    for _, estimate in planned:
+        logger.info(
+            "  %s: %s point(s), %s node(s), %.1f MiB of nodes, %.0f MiB of memory",
+            estimate.tile_name,
+            estimate.points,
+            estimate.nodes,
+            estimate.node_bytes / 2**20,
+            estimate.memory_mib,
+        )
+        estimates.append(estimate)
+    logger.info(
+        "Dry run, %s tile(s) would read about %s point(s) from %s node(s), "
+        "%.1f GiB uncompressed",
+        len(estimates),
+        sum(e.points for e in estimates),
+        sum(e.nodes for e in estimates),
+        sum(e.node_bytes for e in estimates) / 2**30,
+    )
+    if not estimates:
+        return
+    largest = sorted(estimates, key=lambda e: e.memory_mib, reverse=True)
+    logger.info(
+        "Largest tile %s needs about %.0f MiB; the %s largest, one per worker, "
+        "about %.0f MiB together",
+        largest[0].tile_name,
+        largest[0].memory_mib,
+        min(workers, len(largest)),
+        sum(e.memory_mib for e in largest[:workers]),
+    )
+    if memory_budget_mib is not None:
+        logger.info(
+            "A memory budget of %.0f MiB runs at least %s of the largest tiles at once",
+            memory_budget_mib,
+            max(1, int(memory_budget_mib // largest[0].memory_mib)),
+        )
+
+
 def _cli_create_point_cloud_products(
-    aoi_file: Path, tile_index_file: Path, output_dir: Path
+    aoi_file: Path,
+    tile_index_file: Path,
+    output_dir: Path,
+    products: Optional[list[ProductName]] = None,
+    resolution: float = 0.5,
+    points_per_cell: Optional[float] = None,
+    full_density_products: Optional[list[ProductName]] = None,
+    workers: int = 1,
+    force: bool = False,
+    dry_run: bool = False,
+    ept_cache_dir: Optional[Path] = None,
+    ept_cache_size: int = DEFAULT_CACHE_SIZE,
+    subtiles: int = 1,
+    cog_products: Optional[list[ProductName]] = None,
+    dem_engine: DemEngine = DemEngine.PDAL,
+    stage_metrics: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    block_size: int = 1,
+    clip: ClipMode = ClipMode.NONE,
+    clip_buffer: float = 20.0,
+    plan: bool = False,
+    memory_budget_mib: Optional[float] = None,
+    validation_sample: Optional[int] = None,
+    validate: bool = True,
 ) -> None:
     def read_geo_file(f: Path) -> GeoDataFrame:
         return (
@@ -116,6 +817,37 @@ def _cli_create_point_cloud_products(
         )
 
     aoi = read_geo_file(aoi_file)
-    tile_index = read_geo_file(tile_index_file)
+    tile_index = read_tile_index(tile_index_file, aoi)
+    product_options = {
+        name: {"output_profile": OutputProfile.COG} for name in cog_products or []
+    }
+    product_options.setdefault(ProductName.DELAUNEY_MESH_DEM, {})["engine"] = dem_engine
+    config = ProductsConfig(
+        products=products or [ProductName.DELAUNEY_MESH_DEM],
+        resolution=resolution,
+        output_dir=output_dir,
+        product_options=product_options,
+        subtiles=subtiles,
+        block_size=block_size,
+        points_per_cell=points_per_cell,
+        full_density_products=full_density_products or [],
+        clip=clip,
+        clip_buffer=clip_buffer,
+    )
 
-    rasters_from_points_pipeline(aoi, tile_index, output_dir)
+    rasters_from_points_pipeline(
+        aoi,
+        tile_index,
+        config,
+        workers=workers,
+        force=force,
+        dry_run=dry_run,
+        ept_cache_dir=ept_cache_dir,
+        ept_cache_size=ept_cache_size,
+        stage_metrics=stage_metrics,
+        batch_size=batch_size,
+        plan=plan,
+        memory_budget_mib=memory_budget_mib,
+        validation_sample=validation_sample,
+        validate=validate,
+    )
@@ -0,0 +1,200 @@
+import heapq
+import json
+import math
+from dataclasses import dataclass
+from itertools import count, islice
+from typing import Iterable, Iterator, Optional
+from urllib.parse import urljoin
+
+import numpy as np
+import requests
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+from src.data.point_cloud.executor import TileTask
+
+# Memory a worker needs per point read, for the point table's dimensions and the
+# working copies of the product filters, and its resident size before reading any
+# points. Rough figures to be checked against max_rss_mib in the metrics log.
+BYTES_PER_POINT_IN_MEMORY = 200
+BASE_MEMORY_MIB = 300.0
+
+# Planned tasks largest_first chooses from, per worker. Planning a task takes a few
+# hierarchy reads, so the window is kept small enough for the first tasks to start
+# promptly rather than the size of a batch of selected tiles.
+PLAN_WINDOW_PER_WORKER = 4
+
+NodeKey = tuple[int, int, int, int]  # depth, x, y, z
+
+
+@dataclass
+class TileEstimate:
+    tile_name: str
+    points: int  # points within the read polygons, down to the read depth
+    nodes: int  # octree nodes fetched
+    node_bytes: int  # uncompressed size of the nodes fetched
+    memory_mib: float  # peak memory of the tile's largest pipeline
+
+
+class EPTHierarchy:
+    """The octree of an EPT source as described by its ept.json and hierarchy
+    files, which give the point count of every node. Hierarchy subtrees are only
+    fetched once a read reaches them.
+    """
+
+    def __init__(
+        self, ept_json_url: str, session: Optional[requests.Session] = None
+    ) -> None:
+        self.ept_json_url = ept_json_url
+        self.session = session or requests.Session()
+        info = self._get_json(ept_json_url)
+        self.bounds: list[float] = info["bounds"]  # xmin, ymin, zmin, xmax, ymax, zmax
+        self.span: int = info["span"]
+        self.point_size: int = sum(dimension["size"] for dimension in info["schema"])
+        self._counts: dict[NodeKey, int] = {}
+        self._subtrees: set[NodeKey] = set()
+        self._load_subtree((0, 0, 0, 0))
+
+    def _get_json(self, url: str) -> dict:
+        r = self.session.get(url)
+        r.raise_for_status()
+        return r.json()
+
+    def _load_subtree(self, key: NodeKey) -> None:
+        name = "-".join(str(part) for part in key)
+        url = urljoin(self.ept_json_url, f"ept-hierarchy/{name}.json")
+        for node_name, count in self._get_json(url).items():
+            node = tuple(int(part) for part in node_name.split("-"))
+            if count == -1:
+                self._subtrees.add(node)
+            else:
+                self._counts[node] = count
+        self._subtrees.discard(key)
+
+    def count(self, node: NodeKey) -> int:
+        if node in self._subtrees:
+            self._load_subtree(node)
+        return self._counts.get(node, 0)
+
+    def children(self, node: NodeKey) -> list[NodeKey]:
+        d, x, y, z = node
+        candidates = [
+            (d + 1, 2 * x + i, 2 * y + j, 2 * z + k)
+            for i in (0, 1)
+            for j in (0, 1)
+            for k in (0, 1)
+        ]
+        return [c for c in candidates if c in self._counts or c in self._subtrees]
+
+    def max_depth(self, resolution: Optional[float]) -> Optional[int]:
+        """The deepest level readers.ept reads at the resolution: the first whose
+        point spacing is at least as fine, or None when every level is read.
+        """
+        if resolution is None:
+            return None
+        root_spacing = (self.bounds[3] - self.bounds[0]) / self.span
+        return max(0, math.ceil(math.log2(root_spacing / resolution)))
+
+    def _node_boxes(self, nodes: list[NodeKey]) -> np.ndarray:
+        keys = np.array(nodes, dtype=float).reshape(-1, 4)
+        size = (self.bounds[3] - self.bounds[0]) / 2 ** keys[:, 0]
+        minx = self.bounds[0] + keys[:, 1] * size
+        miny = self.bounds[1] + keys[:, 2] * size
+        return shapely.box(minx, miny, minx + size, miny + size)
+
+    def estimate_read(
+        self, polygon: BaseGeometry, resolution: Optional[float] = None
+    ) -> tuple[float, int, int]:
+        """Estimates the points a readers.ept stage with the polygon and resolution
+        returns, assuming points are spread evenly within each node, along with the
+        number and uncompressed size of the nodes it fetches.
+        """
+        shapely.prepare(polygon)
+        max_depth = self.max_depth(resolution)
+        points, nodes, node_points = 0.0, 0, 0
+        level, depth = [(0, 0, 0, 0)], 0
+        while level:
+            boxes = self._node_boxes(level)
+            hits = shapely.intersects(boxes, polygon)
+            level = [node for node, hit in zip(level, hits) if hit]
+            boxes = boxes[hits]
+            counts = np.array([self.count(node) for node in level], dtype=float)
+            overlap = shapely.area(shapely.intersection(boxes, polygon))
+            points += float((counts * overlap / shapely.area(boxes)).sum())
+            nodes += len(level)
+            node_points += int(counts.sum())
+            if max_depth is not None and depth >= max_depth:
+                break
+            level = [child for node in level for child in self.children(node)]
+            depth += 1
+        return points, nodes, node_points * self.point_size
+
+
+class TilePlanner:
+    """Estimates the cost of tile tasks from the EPT hierarchies of their readers,
+    without reading any points.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None) -> None:
+        self.session = session or requests.Session()
+        self._hierarchies: dict[str, EPTHierarchy] = {}
+
+    def hierarchy(self, ept_json_url: str) -> EPTHierarchy:
+        if ept_json_url not in self._hierarchies:
+            self._hierarchies[ept_json_url] = EPTHierarchy(ept_json_url, self.session)
+        return self._hierarchies[ept_json_url]
+
+    def estimate(self, task: TileTask) -> TileEstimate:
+        """Sums the reads of the task's pipelines. Pipelines run one at a time, so
+        the task's memory is that of the pipeline reading the most points.
+        """
+        points, nodes, node_bytes, peak_points = 0.0, 0, 0, 0.0
+        for pipeline_json in task.pipeline_jsons:
+            pipeline_points = 0.0
+            for stage in json.loads(pipeline_json):
+                if stage.get("type") != "readers.ept":
+                    continue
+                read = self.hierarchy(stage["filename"]).estimate_read(
+                    shapely.from_wkt(stage["polygon"]), stage.get("resolution")
+                )
+                pipeline_points += read[0]
+                nodes += read[1]
+                node_bytes += read[2]
+            points += pipeline_points
+            peak_points = max(peak_points, pipeline_points)
+        memory_mib = BASE_MEMORY_MIB + peak_points * BYTES_PER_POINT_IN_MEMORY / 2**20
+        return TileEstimate(
+            task.tile_name, round(points), nodes, node_bytes, memory_mib
+        )
+
+
+def plan_tile_tasks(
+    tasks: Iterable[TileTask], planner: TilePlanner
+) -> Iterator[tuple[TileTask, TileEstimate]]:
+    """Lazily estimates each task, recording the estimate on the task so the
+    executor can order and budget it.
+    """
+    for task in tasks:
+        estimate = planner.estimate(task)
+        task.estimated_points = estimate.points
+        task.estimated_memory_mib = estimate.memory_mib
+        yield task, estimate
+
+
+def largest_first(tasks: Iterable[TileTask], window: int) -> Iterator[TileTask]:
+    """Reorders tasks by their estimated points, largest first, choosing each from
+    a sliding buffer of up to window planned tasks, so a huge tile is not left to
+    run alone at the end of a stream. The buffer grows by one task per task
+    yielded, so the first is yielded once two tasks are planned rather than once
+    the whole window is.
+    """
+    tasks = iter(tasks)
+    order = count()  # ties run in stream order
+    buffer: list[tuple[int, int, TileTask]] = []
+    while True:
+        for task in islice(tasks, min(2, window - len(buffer))):
+            key = (-(task.estimated_points or 0), next(order), task)
+            heapq.heappush(buffer, key)
+        if not buffer:
+            return
+        yield heapq.heappop(buffer)[2]
@@ -1,30 +1,62 @@
+from typing import Optional
+
+from src.data.point_cloud.crs import is_noop_reprojection, linear_scale
 from src.data.point_cloud.ept import EPTData
 from src.data.point_cloud.tile import TileData
 
 PDALStage = dict
 
+SOURCE_POINTS_TAG = "vendor_classified_ground_points"
+
+
+def _ept_resolution(
+    ept_data: EPTData, tile_data: TileData, read_resolution: float
+) -> float:
+    center_x = (tile_data.minx + tile_data.maxx) / 2
+    center_y = (tile_data.miny + tile_data.maxy) / 2
+    scale = linear_scale(tile_data.crs, ept_data.crs, center_x, center_y)
+    return round(read_resolution * scale, 3)
+
 
 def vendor_classified_ground_points(
     ept_data: EPTData,
     tile_data: TileData,
+    read_resolution: Optional[float] = None,
 ) -> list[PDALStage]:
-    return [
-        {
-            "tag": "raw_points",
-            "type": "readers.ept",
-            "filename": ept_data.ept_json_url,
-            "polygon": tile_data.ept_filter_as_wkt,
-        },
+    """Reads the ground points of the tile in the tile's CRS. The reprojection
+    stage is left out when the EPT is already in an equivalent CRS, in which case
+    the ground filter is the stage tagged as the source of the points.
+
+    Given a read_resolution, the point spacing in tile CRS units the products
+    need, the EPT octree is only read as deep as that spacing requires; otherwise
+    every point is read.
+    """
+    reader = {
+        "tag": "raw_points",
+        "type": "readers.ept",
+        "filename": ept_data.ept_json_url,
+        "polygon": tile_data.ept_filter_as_wkt,
+    }
+    if read_resolution is not None:
+        reader["resolution"] = _ept_resolution(ept_data, tile_data, read_resolution)
+    stages = [
+        reader,
         {
             "tag": "ground_only",
             "inputs": ["raw_points"],
             "type": "filters.range",
             "limits": "Classification[2:2]",
         },
+    ]
+    if is_noop_reprojection(ept_data.crs, tile_data.crs):
+        stages[-1]["tag"] = SOURCE_POINTS_TAG
+        return stages
+    stages.append(
         {
-            "tag": "vendor_classified_ground_points",
+            "tag": SOURCE_POINTS_TAG,
             "inputs": ["ground_only"],
             "type": "filters.reprojection",
             "out_srs": f"EPSG:{tile_data.epsg}",
-        },
-    ]
+        }
+    )
+    return stages
@@ -1,13 +1,50 @@
 from enum import StrEnum, auto
 from functools import partial
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Optional
 
 from src.data.point_cloud.tile import TileData
 
 PDALStage = dict
 
 
+class OutputProfile(StrEnum):
+    GTIFF = auto()
+    COG = auto()
+
+
+COG_BLOCK_SIZE = 512
+
+
+class DemEngine(StrEnum):
+    PDAL = auto()  # filters.delaunay & filters.faceraster
+    NUMPY = auto()  # src.data.point_cloud.tin run by filters.python
+
+
+# Runs in PDAL's embedded interpreter, which injects pdalargs into the module
+TIN_DEM_FILTER_SOURCE = """
+from src.data.point_cloud.tin import write_tin_dem
+
+
+def tin_dem(ins, outs):
+    write_tin_dem(ins, pdalargs)
+    return True
+"""
+
+
+def _gdalopts(output_profile: OutputProfile, data_type: str) -> str:
+    """GTiff creation options for the output profile. COG outputs are written
+    internally tiled with a predictor and converted to COG after the pipeline runs.
+    """
+    if output_profile == OutputProfile.COG:
+        predictor = 3 if data_type.startswith("float") else 2
+        return (
+            f"TILED=YES,BLOCKXSIZE={COG_BLOCK_SIZE},BLOCKYSIZE={COG_BLOCK_SIZE},"
+            f"COMPRESS=DEFLATE,PREDICTOR={predictor}"
+        )
+    return "COMPRESS=DEFLATE"
+
+
 def _build_file_path_str(
     output_dir: Path, prefix: str, tile_name: str, postfix: str, extention: str
 ) -> str:
@@ -23,10 +60,40 @@ def delauney_mesh_dem(
     postfix: str = "",
     extention: str = ".tif",
     gdaldriver: str = "GTiff",
-    gdalopts: str = "COMPRESS=DEFLATE",
+    gdalopts: Optional[str] = None,
+    output_profile: OutputProfile = OutputProfile.GTIFF,
     data_type: str = "float32",
     nodata: float = -999999,
+    engine: DemEngine = DemEngine.PDAL,
 ) -> list[PDALStage]:
+    filename = _build_file_path_str(
+        output_dir, prefix, tile_data.tile_name, postfix, extention
+    )
+    gdalopts = gdalopts or _gdalopts(output_profile, data_type)
+    if engine == DemEngine.NUMPY:
+        return [
+            {
+                "tag": "tin_dem",
+                "inputs": [input_tag],
+                "type": "filters.python",
+                "module": "tin_dem",
+                "function": "tin_dem",
+                "source": TIN_DEM_FILTER_SOURCE,
+                "pdalargs": {
+                    "filename": filename,
+                    "resolution": resolution,
+                    "width": tile_data.width(resolution),
+                    "height": tile_data.height(resolution),
+                    "origin_x": tile_data.origin_x,
+                    "origin_y": tile_data.origin_y,
+                    "crs": f"EPSG:{tile_data.epsg}",
+                    "gdaldriver": gdaldriver,
+                    "gdalopts": gdalopts,
+                    "data_type": data_type,
+                    "nodata": nodata,
+                },
+            }
+        ]
     return [
         {
             "tag": "delaunay_mesh",
@@ -47,9 +114,7 @@ def delauney_mesh_dem(
             "tag": "write_faceraster",
             "inputs": ["faceraster"],
             "type": "writers.raster",
-            "filename": _build_file_path_str(
-                output_dir, prefix, tile_data.tile_name, postfix, extention
-            ),
+            "filename": filename,
             "gdaldriver": gdaldriver,
             "gdalopts": gdalopts,
             "data_type": data_type,
@@ -68,7 +133,8 @@ def intensity_raster(
     postfix: str = "",
     extention: str = ".tif",
     gdaldriver: str = "GTiff",
-    gdalopts: str = "COMPRESS=DEFLATE",
+    gdalopts: Optional[str] = None,
+    output_profile: OutputProfile = OutputProfile.GTIFF,
     data_type: str = "uint16",
     nodata: int = 65535,  # max of uint16
 ) -> list[PDALStage]:
@@ -89,16 +155,52 @@ def intensity_raster(
                 output_dir, prefix, tile_data.tile_name, postfix, extention
             ),
             "gdaldriver": gdaldriver,
-            "gdalopts": gdalopts,
+            "gdalopts": gdalopts or _gdalopts(output_profile, data_type),
             "data_type": data_type,
             "nodata": nodata,
         },
     ]
 
 
-def point_density_raster() -> list[PDALStage]:
-    """A raster of the point count contained within each cell."""
-    raise NotImplementedError()
+def point_density_raster(
+    tile_data: TileData,
+    resolution: float,
+    output_dir: Path,
+    input_tag: str = "vendor_classified_ground_points",
+    prefix: str = "density_",
+    postfix: str = "",
+    extention: str = ".tif",
+    gdaldriver: str = "GTiff",
+    gdalopts: Optional[str] = None,
+    output_profile: OutputProfile = OutputProfile.GTIFF,
+    data_type: str = "uint16",
+    nodata: int = 0,  # cells without points
+) -> list[PDALStage]:
+    """A raster of the point count contained within each cell. In binmode each point
+    is counted only in the cell it falls in, so the writer makes a single pass over
+    the points without the radius search used when interpolating.
+    """
+    return [
+        {
+            "tag": "write_point_density_raster",
+            "inputs": [input_tag],
+            "type": "writers.gdal",
+            "output_type": "count",
+            "binmode": True,
+            "resolution": resolution,
+            "width": tile_data.width(resolution),
+            "height": tile_data.height(resolution),
+            "origin_x": tile_data.origin_x,
+            "origin_y": tile_data.origin_y,
+            "filename": _build_file_path_str(
+                output_dir, prefix, tile_data.tile_name, postfix, extention
+            ),
+            "gdaldriver": gdaldriver,
+            "gdalopts": gdalopts or _gdalopts(output_profile, data_type),
+            "data_type": data_type,
+            "nodata": nodata,
+        },
+    ]
 
 
 ProductStagesFunc = Callable[[TileData], list[PDALStage]]
@@ -124,4 +226,5 @@ def product_stages_func_factory(
 def generate_product_stages(
     tile_data: TileData, product_name: ProductName, product_options: dict
 ) -> list[PDALStage]:
-    ...
+    product_stages_func = product_stages_func_factory(product_name, **product_options)
+    return product_stages_func(tile_data=tile_data)
@@ -0,0 +1,103 @@
+import math
+from dataclasses import dataclass
+
+import rasterio
+import shapely
+from pyproj import CRS
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+from shapely import box
+
+from src.data.point_cloud.crs import get_transformer, is_noop_reprojection
+from src.data.point_cloud.tile import TileData
+
+Bounds = tuple[float, float, float, float]
+
+
+@dataclass
+class SubTile:
+    tile_data: TileData  # extent including the halo
+    core: Bounds  # extent written to the mosaic
+
+
+def _read_polygon_wkt(bounds: Bounds, tile_crs: CRS, ept_crs: CRS) -> str:
+    polygon = box(*bounds).buffer(10, join_style="mitre")
+    if is_noop_reprojection(tile_crs, ept_crs):
+        return polygon.wkt
+    transformer = get_transformer(tile_crs, ept_crs)
+    projected = shapely.transform(polygon, transformer.transform, interleaved=False)
+    return projected.wkt
+
+
+def _core_edges(start: float, cells: int, n: int, resolution: float) -> list[float]:
+    step = math.ceil(cells / n)
+    return [start + min(i * step, cells) * resolution for i in range(n + 1)]
+
+
+def split_tile_data(
+    tile: TileData, n: int, halo: float, resolution: float, ept_crs: CRS
+) -> list[SubTile]:
+    """Splits a tile into an n x n grid of sub-tiles aligned to the tile's raster
+    grid. Each sub-tile extends past its core by the halo, rounded up to whole
+    cells, so triangulation near the core's edges sees the neighbouring points.
+    """
+    halo = math.ceil(halo / resolution) * resolution
+    x_edges = _core_edges(tile.minx, tile.width(resolution), n, resolution)
+    y_edges = _core_edges(tile.miny, tile.height(resolution), n, resolution)
+    subtiles = []
+    for row in range(n):
+        for col in range(n):
+            core = (x_edges[col], y_edges[row], x_edges[col + 1], y_edges[row + 1])
+            if core[0] == core[2] or core[1] == core[3]:
+                continue
+            extent = (core[0] - halo, core[1] - halo, core[2] + halo, core[3] + halo)
+            tile_data = TileData(
+                tile_name=f"{tile.tile_name}_r{row}c{col}",
+                minx=extent[0],
+                miny=extent[1],
+                maxx=extent[2],
+                maxy=extent[3],
+                crs=tile.crs,
+                ept_filter_as_wkt=_read_polygon_wkt(extent, tile.crs, ept_crs),
+                _epsg=tile.epsg,
+            )
+            subtiles.append(SubTile(tile_data, core))
+    return subtiles
+
+
+def _window(bounds: Bounds, left: float, top: float, resolution: float) -> Window:
+    col_off = round((bounds[0] - left) / resolution)
+    row_off = round((top - bounds[3]) / resolution)
+    width = round((bounds[2] - bounds[0]) / resolution)
+    height = round((bounds[3] - bounds[1]) / resolution)
+    return Window(col_off, row_off, width, height)
+
+
+def mosaic_subtiles(
+    tile: TileData,
+    parts: list[tuple[str, Bounds]],
+    resolution: float,
+    output_file: str,
+) -> None:
+    """Writes the core of each sub-tile raster into a single raster covering the
+    tile's grid, using the first sub-tile's driver, data type and nodata value.
+    """
+    width, height = tile.width(resolution), tile.height(resolution)
+    top = tile.origin_y + height * resolution
+    with rasterio.open(parts[0][0]) as src:
+        profile = {
+            k: v
+            for k, v in src.profile.items()
+            if k not in ("blockxsize", "blockysize")
+        }
+    profile.update(
+        width=width,
+        height=height,
+        transform=from_origin(tile.origin_x, top, resolution, resolution),
+    )
+    with rasterio.open(output_file, "w", **profile) as dst:
+        for part_file, core in parts:
+            with rasterio.open(part_file) as src:
+                src_window = _window(core, src.bounds.left, src.bounds.top, resolution)
+                data = src.read(window=src_window)
+            dst.write(data, window=_window(core, tile.origin_x, top, resolution))
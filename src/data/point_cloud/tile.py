@@ -1,8 +1,15 @@
+from __future__ import annotations
+
 import math
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
 
+import numpy as np
+from pandas import DataFrame
 from pyproj import CRS
 
+from src.data.point_cloud.crs import epsg_code
+
 
 @dataclass(slots=True)
 class TileData:
@@ -13,10 +20,15 @@ class TileData:
     maxy: float
     crs: CRS
     ept_filter_as_wkt: str
+    clip_as_wkt: Optional[str] = None  # read polygon in the tile CRS, if clipped
+    unclipped_area: Optional[float] = None  # area of the read polygon, unclipped
+    _epsg: Optional[int] = field(default=None, repr=False, compare=False)
 
     @property
     def epsg(self) -> int:
-        return self.crs.to_epsg()
+        if self._epsg is None:
+            self._epsg = epsg_code(self.crs)
+        return self._epsg
 
     @property
     def origin_x(self) -> float:
@@ -31,3 +43,84 @@ class TileData:
 
     def height(self, resolution: float) -> int:
         return math.ceil((self.maxy - self.miny) / resolution)
+
+
+@dataclass(slots=True)
+class TileDataBatch:
+    """Column-oriented tile data for a selection of tiles sharing one CRS. The EPSG
+    code is resolved once for the whole batch and passed on to each TileData
+    yielded when iterating, and the columns are converted to Python values once
+    rather than element by element.
+    """
+
+    tile_name: np.ndarray
+    minx: np.ndarray
+    miny: np.ndarray
+    maxx: np.ndarray
+    maxy: np.ndarray
+    crs: CRS
+    ept_filter_as_wkt: np.ndarray
+    clip_as_wkt: Optional[np.ndarray] = None
+    unclipped_area: Optional[np.ndarray] = None
+    epsg: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.epsg = epsg_code(self.crs)
+
+    def __len__(self) -> int:
+        return len(self.tile_name)
+
+    def __getitem__(self, i: int) -> TileData:
+        return TileData(
+            tile_name=str(self.tile_name[i]),
+            minx=float(self.minx[i]),
+            miny=float(self.miny[i]),
+            maxx=float(self.maxx[i]),
+            maxy=float(self.maxy[i]),
+            crs=self.crs,
+            ept_filter_as_wkt=str(self.ept_filter_as_wkt[i]),
+            clip_as_wkt=None if self.clip_as_wkt is None else str(self.clip_as_wkt[i]),
+            unclipped_area=(
+                None if self.unclipped_area is None else float(self.unclipped_area[i])
+            ),
+            _epsg=self.epsg,
+        )
+
+    def __iter__(self) -> Iterator[TileData]:
+        unset = [None] * len(self)
+        columns = zip(
+            self.tile_name.tolist(),
+            self.minx.tolist(),
+            self.miny.tolist(),
+            self.maxx.tolist(),
+            self.maxy.tolist(),
+            self.ept_filter_as_wkt.tolist(),
+            unset if self.clip_as_wkt is None else self.clip_as_wkt.tolist(),
+            unset if self.unclipped_area is None else self.unclipped_area.tolist(),
+        )
+        for name, minx, miny, maxx, maxy, ept_filter, clip, unclipped in columns:
+            yield TileData(
+                tile_name=name,
+                minx=minx,
+                miny=miny,
+                maxx=maxx,
+                maxy=maxy,
+                crs=self.crs,
+                ept_filter_as_wkt=ept_filter,
+                clip_as_wkt=clip,
+                unclipped_area=unclipped,
+                _epsg=self.epsg,
+            )
+
+    def to_frame(self) -> DataFrame:
+        return DataFrame(
+            data={
+                "tile_name": self.tile_name,
+                "minx": self.minx,
+                "miny": self.miny,
+                "maxx": self.maxx,
+                "maxy": self.maxy,
+                "crs": [self.crs] * len(self),
+                "ept_filter_as_wkt": self.ept_filter_as_wkt,
+            }
+        )
@@ -0,0 +1,91 @@
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from scipy.spatial import Delaunay, QhullError
+
+DEFAULT_BLOCK_ROWS = 256
+
+
+def rasterize_tin(
+    x: np.ndarray,
+    y: np.ndarray,
+    z: np.ndarray,
+    resolution: float,
+    width: int,
+    height: int,
+    origin_x: float,
+    origin_y: float,
+    nodata: float,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+) -> np.ndarray:
+    """Triangulates the points and linearly interpolates z at the center of each
+    cell of the grid, whose lower left corner is the origin. Cells outside the
+    triangulation are set to nodata, as is every cell when the points cannot be
+    triangulated: fewer than three, or all collinear. The grid is interpolated in
+    blocks of rows so the cell coordinates never need to be held for the whole
+    grid at once.
+
+    Rows of the returned array run north to south, as they are written to a raster.
+    """
+    raster = np.full((height, width), nodata, dtype="float64")
+    if len(x) < 3:
+        return raster
+    try:
+        tri = Delaunay(np.column_stack([x, y]))
+    except QhullError:
+        return raster
+    cols = origin_x + (np.arange(width) + 0.5) * resolution
+    for row_start in range(0, height, block_rows):
+        rows = np.arange(row_start, min(row_start + block_rows, height))
+        rows_y = origin_y + (height - rows - 0.5) * resolution
+        grid_x, grid_y = np.meshgrid(cols, rows_y)
+        xy = np.column_stack([grid_x.ravel(), grid_y.ravel()])
+
+        simplex = tri.find_simplex(xy)
+        inside = simplex >= 0
+        transform = tri.transform[simplex[inside]]
+        b = np.einsum("ijk,ik->ij", transform[:, :2], xy[inside] - transform[:, 2])
+        barycentric = np.column_stack([b, 1 - b.sum(axis=1)])
+        vertex_z = z[tri.simplices[simplex[inside]]]
+
+        block = np.full(len(xy), nodata, dtype="float64")
+        block[inside] = np.einsum("ij,ij->i", barycentric, vertex_z)
+        raster[rows] = block.reshape(len(rows), width)
+    return raster
+
+
+def _creation_options(gdalopts: str) -> dict:
+    return dict(opt.split("=", 1) for opt in gdalopts.split(",") if opt)
+
+
+def write_tin_dem(points: dict[str, np.ndarray], args: dict) -> None:
+    """Writes the DEM of the points with the same grid, driver, creation options,
+    data type and nodata value writers.raster is given for the PDAL engine.
+    """
+    raster = rasterize_tin(
+        points["X"],
+        points["Y"],
+        points["Z"],
+        args["resolution"],
+        args["width"],
+        args["height"],
+        args["origin_x"],
+        args["origin_y"],
+        args["nodata"],
+    )
+    top = args["origin_y"] + args["height"] * args["resolution"]
+    profile = {
+        "driver": args["gdaldriver"],
+        "width": args["width"],
+        "height": args["height"],
+        "count": 1,
+        "dtype": args["data_type"],
+        "crs": args["crs"],
+        "nodata": args["nodata"],
+        "transform": from_origin(
+            args["origin_x"], top, args["resolution"], args["resolution"]
+        ),
+        **_creation_options(args["gdalopts"]),
+    }
+    with rasterio.open(args["filename"], "w", **profile) as dst:
+        dst.write(raster.astype(args["data_type"]), 1)
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
-import requests
+from src.data.tile_index.ept_metadata import EPTMetadataResolver
 
 
 @dataclass
@@ -16,25 +16,33 @@ class TileIndexSource:
     ept_json_url: Optional[str] = None
     ept_epsg_code: Optional[str] = None
 
-    def __post_init__(self) -> None:
-        if self.ept_json_url is not None:
-            try:
-                r = requests.get(self.ept_json_url)
-                r.raise_for_status()
-            except requests.HTTPError:
-                pass  # let self.ept_epsg_code stay as default
-            data = r.json()
-            self.ept_epsg_code = data.get("srs").get("horizontal")
-
 
 @dataclass
 class TileIndexPipelineConfig:
     tile_index_sources: list[TileIndexSource]
 
     @staticmethod
-    def parse_toml(config_file: Path) -> TileIndexPipelineConfig:
+    def parse_toml(
+        config_file: Path, resolver: Optional[EPTMetadataResolver] = None
+    ) -> TileIndexPipelineConfig:
+        """Reads the config, resolving the EPSG code of the sources that give an
+        ept.json url but no code with the resolver, when one is given.
+        """
         with open(config_file, "rb") as f:
             config_data = tomllib.load(f)
-        return TileIndexPipelineConfig(
+        config = TileIndexPipelineConfig(
             [TileIndexSource(**source) for source in config_data["tile_index_sources"]]
         )
+        if resolver is not None:
+            config.resolve_ept_metadata(resolver)
+        return config
+
+    def resolve_ept_metadata(self, resolver: EPTMetadataResolver) -> None:
+        unresolved = [
+            source
+            for source in self.tile_index_sources
+            if source.ept_json_url is not None and source.ept_epsg_code is None
+        ]
+        srs = resolver.resolve(source.ept_json_url for source in unresolved)
+        for source in unresolved:
+            source.ept_epsg_code = srs[source.ept_json_url]
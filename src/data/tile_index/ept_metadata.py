@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.settings import DATA_DIR
+
+DEFAULT_EPT_METADATA_CACHE_FILE = DATA_DIR / "interim/ept_metadata_cache.json"
+DEFAULT_TTL = 24 * 60 * 60  # seconds an entry is used without revalidation
+DEFAULT_MAX_WORKERS = 16
+
+
+@dataclass
+class EPTMetadataEntry:
+    ept_json_url: str
+    srs_horizontal: Optional[str]
+    validated_at: float  # seconds since the epoch
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def _conditional_headers(entry: Optional[EPTMetadataEntry]) -> dict:
+    headers = {}
+    if entry is not None and entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry is not None and entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+class EPTMetadataResolver:
+    """Resolves the horizontal SRS of EPT sources from their ept.json, fetching
+    the documents concurrently over a pooled session. Results are kept in a local
+    cache file; entries younger than ttl are used as is, older ones are revalidated
+    with conditional requests.
+    """
+
+    def __init__(
+        self,
+        cache_file: Path,
+        ttl: float = DEFAULT_TTL,
+        session: Optional[requests.Session] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.max_workers = max_workers
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self.entries: dict[str, EPTMetadataEntry] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(
+        cache_file: Path = DEFAULT_EPT_METADATA_CACHE_FILE,
+        ttl: float = DEFAULT_TTL,
+        session: Optional[requests.Session] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> EPTMetadataResolver:
+        resolver = EPTMetadataResolver(cache_file, ttl, session, max_workers)
+        if cache_file.exists():
+            with open(cache_file) as f:
+                resolver.entries = {
+                    entry["ept_json_url"]: EPTMetadataEntry(**entry)
+                    for entry in json.load(f)["entries"]
+                }
+        return resolver
+
+    def save(self) -> None:
+        with self._lock:
+            data = {"entries": [asdict(entry) for entry in self.entries.values()]}
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(".tmp")
+            with open(tmp_file, "w") as f:
+                json.dump(data, f)
+            tmp_file.replace(self.cache_file)
+
+    def _is_fresh(self, entry: Optional[EPTMetadataEntry]) -> bool:
+        return entry is not None and time.time() - entry.validated_at < self.ttl
+
+    def _fetch(self, ept_json_url: str) -> Optional[EPTMetadataEntry]:
+        """Fetches the ept.json unless it is unchanged since it was cached. Returns
+        None, with a warning, when the request fails and nothing is cached.
+        """
+        logger = logging.getLogger(__name__)
+        cached = self.entries.get(ept_json_url)
+        try:
+            r = self.session.get(ept_json_url, headers=_conditional_headers(cached))
+            if r.status_code == 304 and cached is not None:
+                entry = replace(cached, validated_at=time.time())
+            else:
+                r.raise_for_status()
+                entry = EPTMetadataEntry(
+                    ept_json_url=ept_json_url,
+                    srs_horizontal=r.json().get("srs", {}).get("horizontal"),
+                    validated_at=time.time(),
+                    etag=r.headers.get("ETag"),
+                    last_modified=r.headers.get("Last-Modified"),
+                )
+        except (requests.RequestException, ValueError) as e:
+            if cached is None:
+                logger.warning("Failed to read %s: %s", ept_json_url, e)
+                return None
+            logger.warning("Failed to revalidate %s, using cached: %s", ept_json_url, e)
+            return cached
+        with self._lock:
+            self.entries[ept_json_url] = entry
+        return entry
+
+    def resolve(self, ept_json_urls: Iterable[str]) -> dict[str, Optional[str]]:
+        """Returns the horizontal SRS of each distinct url, None where it could not
+        be read. Only urls without a fresh cache entry are requested, concurrently,
+        and the cache is saved when any was.
+        """
+        distinct = list(dict.fromkeys(ept_json_urls))
+        stale = [url for url in distinct if not self._is_fresh(self.entries.get(url))]
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                list(pool.map(self._fetch, stale))
+            self.save()
+        return {
+            url: self.entries[url].srs_horizontal if url in self.entries else None
+            for url in distinct
+        }
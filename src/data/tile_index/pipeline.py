@@ -1,3 +1,9 @@
+import hashlib
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from importlib.util import find_spec
 from pathlib import Path
 from typing import Optional
 
@@ -6,11 +12,28 @@ import pandas as pd
 from geopandas import GeoDataFrame
 
 from src.data.tile_index.config import TileIndexPipelineConfig, TileIndexSource
+from src.data.tile_index.storage import (
+    write_partitioned_tile_index,
+    write_tile_index_parquet,
+)
+from src.settings import DATA_DIR
+
+DEFAULT_SOURCE_CACHE_DIR = DATA_DIR / "interim/tile_index_sources"
+HASH_CHUNK_SIZE = 1024**2
+
+
+def _read_file_kwargs() -> dict:
+    """Reads through pyogrio's Arrow interface when it is installed."""
+    if find_spec("pyogrio") is None:
+        return {}
+    return {"engine": "pyogrio", "use_arrow": True}
 
 
 def _extract_tile_index(zipped_shapefile: Path, tile_name_field: str) -> GeoDataFrame:
     return geopandas.read_file(
-        filename=zipped_shapefile, include_fields=[tile_name_field]
+        filename=zipped_shapefile,
+        include_fields=[tile_name_field],
+        **_read_file_kwargs(),
     )
 
 
@@ -50,15 +73,88 @@ def _extract_transform_tile_index(
     )
 
 
-def tile_index_pipeline(
-    config: TileIndexPipelineConfig, input_dir: Path, output_file: Path
-) -> None:
-    gdfs = (
-        _extract_transform_tile_index(source, input_dir)
+def _source_key(source: TileIndexSource, input_dir: Path) -> str:
+    """Hashes the source's zipped shapefile along with its config fields, so a
+    source is reprocessed when either changes.
+    """
+    digest = hashlib.sha256(json.dumps(asdict(source), sort_keys=True).encode())
+    with open(input_dir / source.zipped_shapefile, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_source_partition(
+    source: TileIndexSource, input_dir: Path, partition_file: Path
+) -> Path:
+    gdf = _extract_transform_tile_index(source, input_dir)
+    tmp_file = partition_file.with_suffix(".tmp")
+    gdf.to_parquet(tmp_file)
+    tmp_file.replace(partition_file)
+    return partition_file
+
+
+def build_source_partitions(
+    config: TileIndexPipelineConfig,
+    input_dir: Path,
+    cache_dir: Path = DEFAULT_SOURCE_CACHE_DIR,
+    workers: int = 1,
+) -> list[Path]:
+    """Extracts and transforms each source into a GeoParquet partition in
+    cache_dir, named by the hash of its zipped shapefile and config fields. Only
+    sources without a partition, new or changed, are processed, across a pool of
+    worker processes; partitions no source refers to any more are removed.
+    """
+    logger = logging.getLogger(__name__)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    partition_files = [
+        cache_dir / f"{source.workunit}-{_source_key(source, input_dir)}.parquet"
         for source in config.tile_index_sources
+    ]
+    missing = [
+        (source, partition_file)
+        for source, partition_file in zip(config.tile_index_sources, partition_files)
+        if not partition_file.exists()
+    ]
+    logger.info(
+        "%s of %s source(s) changed or new, processing with %s worker(s)",
+        len(missing),
+        len(partition_files),
+        workers,
     )
+    if workers <= 1:
+        for source, partition_file in missing:
+            _write_source_partition(source, input_dir, partition_file)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_write_source_partition, source, input_dir, partition_file)
+                for source, partition_file in missing
+            ]
+            for future in futures:
+                future.result()
+
+    for stale_file in set(cache_dir.glob("*.parquet")) - set(partition_files):
+        stale_file.unlink()
+    return partition_files
+
+
+def tile_index_pipeline(
+    config: TileIndexPipelineConfig,
+    input_dir: Path,
+    output_file: Path,
+    cache_dir: Path = DEFAULT_SOURCE_CACHE_DIR,
+    workers: int = 1,
+) -> None:
+    """Assembles the tile index from per-source partitions, reprocessing only the
+    sources whose zipped shapefile or config changed since the last build.
+    """
+    partition_files = build_source_partitions(config, input_dir, cache_dir, workers)
+    gdfs = (geopandas.read_parquet(f) for f in partition_files)
     contatinated: GeoDataFrame = pd.concat(gdfs)
     if output_file.suffix == ".parquet":
-        contatinated.to_parquet(output_file)
+        write_tile_index_parquet(contatinated, output_file)
+    elif not output_file.suffix:
+        write_partitioned_tile_index(contatinated, output_file)
     else:
         contatinated.to_file(output_file)
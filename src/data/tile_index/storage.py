@@ -0,0 +1,129 @@
+import json
+import shutil
+from pathlib import Path
+from typing import Optional
+
+import geopandas
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from geopandas import GeoDataFrame
+from pyproj import CRS
+from shapely import box
+
+PARTITIONS_FILE_NAME = "_partitions.json"
+PARTITION_FILE_NAME = "part-0.parquet"
+DEFAULT_ROW_GROUP_SIZE = 2048
+
+
+def sort_spatially(
+    gdf: GeoDataFrame, total_bounds: Optional[np.ndarray] = None
+) -> GeoDataFrame:
+    """Orders tiles along a Hilbert curve so that tiles close to each other share
+    row groups, keeping the bbox statistics of each row group tight.
+    """
+    distance = gdf.hilbert_distance(total_bounds=total_bounds).to_numpy()
+    return gdf.iloc[np.argsort(distance, kind="stable")]
+
+
+def _write_geoparquet(gdf: GeoDataFrame, output_file: Path, row_group_size: int):
+    gdf.to_parquet(output_file, write_covering_bbox=True, row_group_size=row_group_size)
+
+
+def write_tile_index_parquet(
+    gdf: GeoDataFrame,
+    output_file: Path,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> None:
+    """Writes a spatially sorted GeoParquet with a bbox covering column."""
+    _write_geoparquet(sort_spatially(gdf), output_file, row_group_size)
+
+
+def write_partitioned_tile_index(
+    gdf: GeoDataFrame,
+    output_dir: Path,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> None:
+    """Writes a GeoParquet dataset partitioned by workunit, hive style, with each
+    partition spatially sorted and carrying a bbox covering column. The bounds of
+    every partition are recorded alongside so that reads can skip partitions, as
+    are the CRS and column types, so that an index without tiles reads as empty.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in output_dir.glob("workunit=*"):
+        shutil.rmtree(stale)
+
+    total_bounds = gdf.total_bounds
+    partitions = {}
+    for workunit, tiles in gdf.groupby("workunit", sort=True):
+        partition_dir = output_dir / f"workunit={workunit}"
+        partition_dir.mkdir()
+        _write_geoparquet(
+            sort_spatially(tiles.drop(columns="workunit"), total_bounds),
+            partition_dir / PARTITION_FILE_NAME,
+            row_group_size,
+        )
+        partitions[workunit] = tiles.total_bounds.tolist()
+
+    columns = {
+        column: str(dtype)
+        for column, dtype in gdf.dtypes.items()
+        if column != gdf.geometry.name
+    }
+    metadata = {"crs": gdf.crs.to_json(), "columns": columns, "partitions": partitions}
+    with open(output_dir / PARTITIONS_FILE_NAME, "w") as f:
+        json.dump(metadata, f)
+
+
+def _parquet_crs(parquet_file: Path) -> CRS:
+    geo = json.loads(pq.read_schema(parquet_file).metadata[b"geo"])
+    crs = geo["columns"][geo["primary_column"]].get("crs")
+    return CRS.from_json_dict(crs) if crs else CRS.from_epsg(4326)
+
+
+def _aoi_bbox(aoi: GeoDataFrame, crs: CRS) -> tuple[float, float, float, float]:
+    return tuple(aoi.to_crs(crs).total_bounds)
+
+
+def _empty_tile_index(metadata: dict, crs: CRS) -> GeoDataFrame:
+    columns = metadata.get("columns", {"tile_name": "string", "workunit": "string"})
+    data = {column: pd.Series(dtype=dtype) for column, dtype in columns.items()}
+    return GeoDataFrame(data, geometry=geopandas.GeoSeries([], crs=crs))
+
+
+def _read_partitioned_tile_index(
+    dataset_dir: Path, aoi: Optional[GeoDataFrame]
+) -> GeoDataFrame:
+    with open(dataset_dir / PARTITIONS_FILE_NAME) as f:
+        metadata = json.load(f)
+    crs = CRS.from_json(metadata["crs"])
+    if not metadata["partitions"]:
+        return _empty_tile_index(metadata, crs)
+    bbox = _aoi_bbox(aoi, crs) if aoi is not None else None
+
+    workunits = [
+        workunit
+        for workunit, bounds in metadata["partitions"].items()
+        if bbox is None or box(*bounds).intersects(box(*bbox))
+    ]
+    # read one partition even when none overlap, for an empty frame with its schema
+    parts = []
+    for workunit in workunits or list(metadata["partitions"])[:1]:
+        partition_file = dataset_dir / f"workunit={workunit}" / PARTITION_FILE_NAME
+        part = geopandas.read_parquet(partition_file, bbox=bbox)
+        parts.append(part.assign(workunit=workunit).astype({"workunit": "string"}))
+    return pd.concat(parts, ignore_index=True)
+
+
+def read_tile_index(path: Path, aoi: Optional[GeoDataFrame] = None) -> GeoDataFrame:
+    """Reads the tiles of a tile index that may intersect the AOI, or every tile
+    when no AOI is given. GeoParquet files and datasets are filtered on their bbox
+    covering column so that only the partitions and row groups overlapping the AOI's
+    bounds are read; other formats are read with the AOI as a mask.
+    """
+    if path.is_dir():
+        return _read_partitioned_tile_index(path, aoi)
+    if path.suffix == ".parquet":
+        bbox = _aoi_bbox(aoi, _parquet_crs(path)) if aoi is not None else None
+        return geopandas.read_parquet(path, bbox=bbox)
+    return geopandas.read_file(path, mask=aoi)
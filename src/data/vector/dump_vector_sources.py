@@ -1,41 +1,155 @@
 """Dump vector sources to COPY statements for importing to PostGIS."""
+import hashlib
+import json
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 from loguru import logger
 
-from src.settings import Settings, VectorSource
+from src.data.vector.extract_vector_sources import file_sha256
+from src.settings import SQL_DUMP_DIR, LoadLayer, Settings, VectorSource
 
+DUMP_SCRIPT = Path(__file__).resolve().parent / "scripts/dump_to_pgsql.sh"
+FINGERPRINTS_FILE = SQL_DUMP_DIR / "dump_fingerprints.json"
+DEFAULT_MAX_WORKERS = 4
 
-def _source_in_newer(source_file: Path, dump_file: Path) -> bool:
-    return source_file.stat().st_mtime > dump_file.stat().st_mtime
+
+@dataclass
+class LayerDump:
+    to_table: str
+    fingerprint: Optional[str]  # None when the source could not be read
+    elapsed: float
+    error: Optional[str] = None
+
+
+def _fingerprint(source_hash: str, lyr: LoadLayer, script_hash: str) -> str:
+    """Identifies a dump by the content of its source file, the layer and table it
+    maps, and the dump script holding the ogr2ogr options.
+    """
+    inputs = {
+        "source": source_hash,
+        "layer": lyr.layer,
+        "to_table": lyr.to_table,
+        "script": script_hash,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def _load_fingerprints(fingerprints_file: Path) -> dict[str, str]:
+    if not fingerprints_file.exists():
+        return {}
+    with open(fingerprints_file) as f:
+        return json.load(f)
+
+
+def _save_fingerprints(fingerprints: dict[str, str], fingerprints_file: Path) -> None:
+    fingerprints_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = fingerprints_file.with_suffix(".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(fingerprints, f, indent=2)
+    tmp_file.replace(fingerprints_file)
+
+
+def _check_source(
+    src: VectorSource, fingerprints: dict[str, str], script_hash: str
+) -> tuple[list[tuple[Path, LoadLayer, str]], list[LayerDump]]:
+    """Fingerprints the source's layers, returning those whose dump is missing or
+    out of date, and a failed dump for every layer when the source cannot be read.
+    """
+    try:
+        source_hash = file_sha256(src.filepath)
+    except OSError as e:
+        logger.error(f"DUMP: Failed to read {src.filepath}: {e}")
+        failed = [LayerDump(lyr.to_table, None, 0.0, str(e)) for lyr in src.load_layers]
+        return [], failed
+    stale = []
+    for lyr in src.load_layers:
+        fingerprint = _fingerprint(source_hash, lyr, script_hash)
+        dump_file = lyr.sql_dump_file
+        if dump_file.exists() and fingerprints.get(lyr.to_table) == fingerprint:
+            logger.info(f"DUMP: {dump_file.name} is up-to-date")
+            continue
+        stale.append((src.filepath, lyr, fingerprint))
+    return stale, []
 
 
 def _dump_to_pgsql(
     dump_file: Path, source_file: Path, layer: str, to_table: str
 ) -> None:
-    script = Path(__file__).resolve().parent / "scripts/dump_to_pgsql.sh"
-    subprocess.run(["sh", script, str(dump_file), str(source_file), layer, to_table])
+    """Dumps the layer to a temporary file, renamed over dump_file only when the
+    dump script succeeds.
+    """
+    tmp_file = dump_file.with_name(dump_file.name + ".tmp")
+    tmp_file.unlink(missing_ok=True)
+    result = subprocess.run(
+        ["sh", DUMP_SCRIPT, str(tmp_file), str(source_file), layer, to_table],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        tmp_file.unlink(missing_ok=True)
+        raise RuntimeError(
+            f"{DUMP_SCRIPT.name} exited with {result.returncode}: "
+            f"{result.stderr.strip()}"
+        )
+    tmp_file.replace(dump_file)
+
+
+def _dump_layer(source_file: Path, lyr: LoadLayer, fingerprint: str) -> LayerDump:
+    dump_file = lyr.sql_dump_file
+    logger.info(f"DUMP: Dumping {source_file.name}:{lyr.layer} to {dump_file.name}")
+    # Ensure sql dump directory exists
+    dump_file.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    try:
+        _dump_to_pgsql(dump_file, source_file, lyr.layer, lyr.to_table)
+    except (RuntimeError, OSError) as e:
+        elapsed = time.perf_counter() - start
+        logger.error(f"DUMP: {dump_file.name} failed after {elapsed:.1f}s: {e}")
+        return LayerDump(lyr.to_table, fingerprint, elapsed, str(e))
+    elapsed = time.perf_counter() - start
+    logger.info(f"DUMP: {dump_file.name} dumped in {elapsed:.1f}s")
+    return LayerDump(lyr.to_table, fingerprint, elapsed)
 
 
-def dump_vector_sources(settings: Settings) -> None:
+def dump_vector_sources(
+    settings: Settings,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    fingerprints_file: Path = FINGERPRINTS_FILE,
+) -> None:
+    """Dumps every layer of the vector sources whose recorded fingerprint no longer
+    matches, across up to max_workers concurrent ogr2ogr processes. Fingerprints
+    hash file contents rather than compare modification times, so touching a
+    source does not force a dump while a changed layer mapping or option does.
+    A source that cannot be read fails its own layers only.
+    """
     vector_sources: list[VectorSource] = list(settings.vector_sources.values())
+    fingerprints = _load_fingerprints(fingerprints_file)
+    script_hash = file_sha256(DUMP_SCRIPT)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        checks = list(
+            pool.map(
+                lambda src: _check_source(src, fingerprints, script_hash),
+                vector_sources,
+            )
+        )
+        stale = [layer for layers, _ in checks for layer in layers]
+        dumps = [dump for _, failed in checks for dump in failed]
+        dumps += pool.map(lambda args: _dump_layer(*args), stale)
+
+    for dump in dumps:
+        if dump.error is None:
+            fingerprints[dump.to_table] = dump.fingerprint
+    _save_fingerprints(fingerprints, fingerprints_file)
 
-    for src in vector_sources:
-        source_file = src.filepath
-        for lyr in src.load_layers:
-            dump_file = lyr.sql_dump_file
-            layer = lyr.layer
-            to_table = lyr.to_table
-
-            if dump_file.exists() and not _source_in_newer(source_file, dump_file):
-                logger.info(f"DUMP: {dump_file.name} is up-to-date")
-                continue
-
-            logger.info(f"DUMP: Dumping {source_file.name}:{layer} to {dump_file.name}")
-            # Ensure sql dump directory exists
-            dump_file.parent.mkdir(parents=True, exist_ok=True)
-            _dump_to_pgsql(dump_file, source_file, layer, to_table)
+    failed = [dump.to_table for dump in dumps if dump.error is not None]
+    if failed:
+        raise RuntimeError(f"Failed to dump {', '.join(failed)}")
 
 
 if __name__ == "__main__":
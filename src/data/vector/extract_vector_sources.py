@@ -1,66 +1,286 @@
 """Module for downloading external vector sources."""
+import hashlib
+import json
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from email.utils import format_datetime
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from zipfile import ZipFile
+from typing import Optional
+from zipfile import BadZipFile, ZipFile
 
 import requests
 from loguru import logger
 from pydantic import HttpUrl
+from requests.adapters import HTTPAdapter
 
-from src.settings import Settings
+from src.settings import Settings, VectorSource
+
+CHUNK_SIZE = 1024**2  # bytes held in memory at a time while downloading
+VALIDATORS_FILE_NAME = "external/vector_source_validators.json"
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class Transfer:
+    downloaded: bool  # False when the remote file was not modified
+    bytes_transferred: int
+    validators: dict[str, Optional[str]]  # etag and last_modified of the response
+
+
+@dataclass
+class SourceRefresh:
+    name: str
+    status: str  # up-to-date, downloaded or failed
+    bytes_transferred: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
 
 
 def _get_last_modified_dt(filepath: Path) -> None:
     return datetime.fromtimestamp(filepath.lstat().st_mtime)
 
 
-def _remote_is_newer(url: HttpUrl, source_file: Path) -> bool:
-    """Uses If-Modified-Since request header to determine if the remote file is
-    newer than the local copy.
+def _conditional_headers(validators: Optional[dict], source_file: Path) -> dict:
+    """Request headers that make a download conditional on the remote file having
+    changed since the local copy was downloaded, from the validators recorded then.
+    Without recorded validators, falls back to the local copy's modification time.
     [MDN If-Modified-Since](https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/If-Modified-Since)
     """
-    last_modified = _get_last_modified_dt(filepath=source_file)
-    headers = {"If-Modified-Since": format_datetime(dt=last_modified)}
-    r = requests.head(url, headers=headers)
-    return r.status_code == 200
+    if not source_file.exists():
+        return {}
+    if not validators or not (validators["etag"] or validators["last_modified"]):
+        last_modified = _get_last_modified_dt(filepath=source_file)
+        return {"If-Modified-Since": format_datetime(dt=last_modified)}
+    headers = {}
+    if validators["etag"]:
+        headers["If-None-Match"] = validators["etag"]
+    if validators["last_modified"]:
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def _response_validators(r: requests.Response) -> dict[str, Optional[str]]:
+    return {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+    }
+
 
+def _load_validators(validators_file: Path) -> dict[str, dict]:
+    if not validators_file.exists():
+        return {}
+    with open(validators_file) as f:
+        return json.load(f)
 
-def _download_gpkg(url: HttpUrl, source_file: Path) -> None:
-    r = requests.get(url, stream=True)
-    with open(source_file, "wb") as f:
-        f.write(r.content)
 
+def _save_validators(validators: dict[str, dict], validators_file: Path) -> None:
+    validators_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = validators_file.with_suffix(".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(validators, f, indent=2)
+    tmp_file.replace(validators_file)
+
+
+def file_sha256(filepath: Path) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _expected_size(r: requests.Response) -> Optional[int]:
+    """The size of the whole remote file, from Content-Range on a partial response
+    and Content-Length otherwise, when the server reports it.
+    """
+    if r.status_code == 206:
+        total = r.headers.get("Content-Range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = r.headers.get("Content-Length")
+    return int(length) if length is not None else None
+
+
+def _download_file(
+    url: HttpUrl,
+    output_file: Path,
+    sha256: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    conditional_headers: Optional[dict] = None,
+) -> Transfer:
+    """Streams url to a .part file next to output_file, CHUNK_SIZE bytes at a time,
+    and renames it into place once its size and, when given, sha256 checksum are
+    verified. A .part file left by an interrupted download is resumed with an HTTP
+    Range request, guarded by If-Range so a file changed since restarts instead.
+    Otherwise the request carries conditional_headers, and a 304 Not Modified
+    response downloads nothing.
+    """
+    session = session or requests.Session()
+    part_file = output_file.with_name(output_file.name + ".part")
+    validator_file = output_file.with_name(output_file.name + ".part.etag")
+    headers = dict(conditional_headers or {})
+    if part_file.exists() and validator_file.exists():
+        headers = {
+            "Range": f"bytes={part_file.stat().st_size}-",
+            "If-Range": validator_file.read_text(),
+        }
 
-def _download_and_unzip_gpkg(url: HttpUrl, source_file: Path) -> None:
-    r = requests.get(url, stream=True)
-    with NamedTemporaryFile("w+b") as tmp:
-        tmp.write(r.content)
-        with ZipFile(tmp, "r") as z:
-            gpkg = [name for name in z.namelist() if ".gpkg" in name][0]
-            z.extract(member=gpkg, path=source_file.parent)
+    bytes_transferred = 0
+    with session.get(url, headers=headers, stream=True) as r:
+        if r.status_code == 304:
+            return Transfer(False, 0, _response_validators(r))
+        if r.status_code == 416:  # nothing left to resume from, start over
+            part_file.unlink()
+            validator_file.unlink()
+            return _download_file(url, output_file, sha256, session)
+        r.raise_for_status()
+        validator = r.headers.get("ETag") or r.headers.get("Last-Modified")
+        if validator:
+            validator_file.write_text(validator)
+        resumed = r.status_code == 206
+        if resumed:
+            logger.info(f"EXTRACT: Resuming {output_file.name} from {headers['Range']}")
+        expected_size = _expected_size(r)
+        with open(part_file, "ab" if resumed else "wb") as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                bytes_transferred += len(chunk)
+        validators = _response_validators(r)
 
+    size = part_file.stat().st_size
+    if expected_size is not None and size != expected_size:
+        raise IOError(f"Downloaded {size} of {expected_size} bytes from {url}")
+    if sha256 is not None and file_sha256(part_file) != sha256:
+        part_file.unlink()
+        validator_file.unlink(missing_ok=True)
+        raise IOError(f"Checksum of the file downloaded from {url} does not match")
+    part_file.replace(output_file)
+    validator_file.unlink(missing_ok=True)
+    return Transfer(True, bytes_transferred, validators)
 
-def extract_vector_sources(settings: Settings) -> None:
+
+def _download_gpkg(
+    url: HttpUrl,
+    source_file: Path,
+    sha256: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    conditional_headers: Optional[dict] = None,
+) -> Transfer:
+    return _download_file(url, source_file, sha256, session, conditional_headers)
+
+
+def _download_and_unzip_gpkg(
+    url: HttpUrl,
+    source_file: Path,
+    sha256: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    conditional_headers: Optional[dict] = None,
+) -> Transfer:
+    """Downloads the zip next to source_file, then streams its .gpkg member into
+    source_file and removes the zip. Raises BadZipFile when the download is not a
+    zip archive or has no .gpkg member.
+    """
+    zip_file = source_file.with_suffix(".zip")
+    transfer = _download_file(url, zip_file, sha256, session, conditional_headers)
+    if not transfer.downloaded:
+        return transfer
+    tmp_file = source_file.with_name(source_file.name + ".tmp")
+    with ZipFile(zip_file, "r") as z:
+        members = [name for name in z.namelist() if ".gpkg" in name]
+        if not members:
+            raise BadZipFile(f"{zip_file.name} has no .gpkg member")
+        gpkg = members[0]
+        with z.open(gpkg) as src, open(tmp_file, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    tmp_file.replace(source_file)
+    zip_file.unlink()
+    return transfer
+
+
+def _refresh_source(
+    name: str,
+    src: VectorSource,
+    validators: dict[str, dict],
+    session: requests.Session,
+    lock: threading.Lock,
+) -> SourceRefresh:
+    """Downloads the source unless a single conditional request reports that the
+    local copy is up-to-date, then records the response's validators.
+    """
+    start = time.perf_counter()
+    source_file = src.filepath
+    url = src.download_url
+    recorded = validators.get(name)
+    if recorded is not None and recorded.get("url") != url:
+        recorded = None
+    headers = _conditional_headers(recorded, source_file)
+    # Ensure file directory exists
+    source_file.parent.mkdir(parents=True, exist_ok=True)
+    download = _download_and_unzip_gpkg if url.endswith(".zip") else _download_gpkg
+    try:
+        transfer = download(url, source_file, src.download_sha256, session, headers)
+    except (requests.RequestException, OSError, BadZipFile) as e:
+        elapsed = time.perf_counter() - start
+        return SourceRefresh(name, "failed", elapsed=elapsed, error=repr(e))
+
+    if transfer.downloaded or any(transfer.validators.values()):
+        with lock:
+            validators[name] = {"url": url, **transfer.validators}
+    status = "downloaded" if transfer.downloaded else "up-to-date"
+    elapsed = time.perf_counter() - start
+    return SourceRefresh(name, status, transfer.bytes_transferred, elapsed)
+
+
+def _log_summary(refreshes: list[SourceRefresh]) -> None:
+    for r in refreshes:
+        logger.info(
+            f"EXTRACT: {r.name:<24} {r.status:<10} "
+            f"{r.bytes_transferred / 1024**2:>10.1f} MiB {r.elapsed:>8.1f}s"
+        )
+    total_bytes = sum(r.bytes_transferred for r in refreshes)
+    logger.info(f"EXTRACT: {total_bytes / 1024**2:.1f} MiB transferred in total")
+
+
+def extract_vector_sources(
+    settings: Settings, max_workers: int = DEFAULT_MAX_WORKERS
+) -> None:
+    """Refreshes every vector source with a download_url concurrently, over a
+    session pooling up to max_workers connections. Whether a local copy is
+    up-to-date is decided by the ETag and Last-Modified recorded in a validators
+    file under the data directory when it was downloaded, so it does not depend
+    on local modification times, which copies and syncs do not preserve.
+    """
     # Filter vector sources for those with a download_url
-    vector_sources = [v for v in settings.vector_sources.values() if v.download_url]
-
-    for src in vector_sources:
-        source_file = src.filepath
-        url = src.download_url
-
-        if source_file.exists() and not _remote_is_newer(url, source_file):
-            logger.info(f"EXTRACT: Local {source_file.name} is up-to-date")
-            continue
-
-        logger.info(f"EXTRACT: Downloading {source_file.name}")
-        # Ensure file directory exists
-        source_file.parent.mkdir(parents=True, exist_ok=True)
-        if url.endswith(".zip"):
-            _download_and_unzip_gpkg(url, source_file)
-        else:
-            _download_gpkg(url, source_file)
+    vector_sources = {
+        name: v for name, v in settings.vector_sources.items() if v.download_url
+    }
+    validators_file = settings.data_dir / VALIDATORS_FILE_NAME
+    validators = _load_validators(validators_file)
+    lock = threading.Lock()
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    logger.info(f"EXTRACT: Refreshing {len(vector_sources)} vector sources")
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        refreshes = list(
+            pool.map(
+                lambda item: _refresh_source(*item, validators, session, lock),
+                vector_sources.items(),
+            )
+        )
+    _save_validators(validators, validators_file)
+    _log_summary(refreshes)
+
+    failed = [r for r in refreshes if r.status == "failed"]
+    for r in failed:
+        logger.error(f"EXTRACT: Failed to refresh {r.name}: {r.error}")
+    if failed:
+        raise RuntimeError(f"Failed to refresh {', '.join(r.name for r in failed)}")
 
 
 if __name__ == "__main__":
@@ -21,6 +21,7 @@ class LoadLayer(BaseModel):
 
 class VectorSource(BaseModel):
     download_url: Optional[HttpUrl]
+    download_sha256: Optional[str] = None  # checked against the download, if set
     filepath: Path
     load_layers: list[LoadLayer]
 
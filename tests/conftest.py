@@ -0,0 +1,55 @@
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+
+class RecordingRequestHandler(SimpleHTTPRequestHandler):
+    """Serves files from a directory, recording the path and status code of each
+    response on its server.
+    """
+
+    def send_response(self, code: int, message=None) -> None:
+        self.server.responses.append((self.path, code))
+        super().send_response(code, message)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class LocalServer:
+    """Serves local directories over HTTP, each on its own port, recording the
+    responses of all of them in order.
+    """
+
+    def __init__(self) -> None:
+        self.responses: list[tuple[str, int]] = []
+        self._servers: list[ThreadingHTTPServer] = []
+
+    def serve(self, directory: Path) -> str:
+        """Serves the directory on a daemon thread and returns its base url."""
+        handler = partial(RecordingRequestHandler, directory=str(directory))
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server.responses = self.responses
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self._servers.append(server)
+        host, port = server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requested(self) -> list[str]:
+        return [path for path, _ in self.responses]
+
+    def shutdown(self) -> None:
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+
+@pytest.fixture()
+def local_server():
+    server = LocalServer()
+    yield server
+    server.shutdown()
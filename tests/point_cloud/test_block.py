@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import numpy as np
+import rasterio
+import shapely
+from pyproj import CRS
+from rasterio.transform import from_origin
+
+from src.data.point_cloud.block import crop_tile_from_block, group_tiles_into_blocks
+from src.data.point_cloud.tile import TileData
+
+UTM15N = CRS.from_epsg(6344)
+
+
+def _tile(col: int, row: int) -> TileData:
+    minx, miny = 688000.0 + col * 1000.0, 4928000.0 + row * 1000.0
+    return TileData(
+        tile_name=f"15TXN{688 + col}{292 + row}",
+        minx=minx,
+        miny=miny,
+        maxx=minx + 1000.0,
+        maxy=miny + 1000.0,
+        crs=UTM15N,
+        ept_filter_as_wkt="",
+    )
+
+
+def test_group_tiles_into_blocks():
+    tiles = [_tile(col, row) for col in range(3) for row in range(2)]
+
+    blocks = group_tiles_into_blocks(tiles, 2, UTM15N)
+
+    assert sorted(len(block.tiles) for block in blocks) == [2, 4]
+    block = next(block for block in blocks if len(block.tiles) == 4)
+    assert (block.tile_data.minx, block.tile_data.miny) == (688000.0, 4928000.0)
+    assert (block.tile_data.maxx, block.tile_data.maxy) == (690000.0, 4930000.0)
+    footprint = shapely.from_wkt(block.tile_data.ept_filter_as_wkt)
+    assert footprint.bounds == (687990.0, 4927990.0, 690010.0, 4930010.0)
+
+
+def test_group_tiles_into_blocks_reads_only_the_selected_tiles():
+    tiles = [_tile(0, 0), _tile(1, 1)]
+
+    (block,) = group_tiles_into_blocks(tiles, 2, UTM15N)
+
+    footprint = shapely.from_wkt(block.tile_data.ept_filter_as_wkt)
+    assert not footprint.contains(shapely.Point(688500.0, 4929500.0))
+    assert footprint.contains(shapely.Point(689500.0, 4929500.0))
+
+
+def test_group_tiles_into_blocks_reprojects_footprint():
+    (block,) = group_tiles_into_blocks([_tile(0, 0)], 2, CRS.from_epsg(3857))
+
+    minx, miny, _, _ = shapely.from_wkt(block.tile_data.ept_filter_as_wkt).bounds
+    assert minx < -10000000.0
+    assert miny > 5000000.0
+
+
+def test_crop_tile_from_block(tmp_path: Path):
+    block_file = tmp_path / "dem_block.tif"
+    data = np.arange(8 * 8, dtype="float32").reshape(1, 8, 8)
+    profile = {
+        "driver": "GTiff",
+        "width": 8,
+        "height": 8,
+        "count": 1,
+        "dtype": "float32",
+        "crs": "EPSG:6344",
+        "nodata": -999999.0,
+        "transform": from_origin(688000.0, 4930000.0, 250.0, 250.0),
+    }
+    with rasterio.open(block_file, "w", **profile) as dst:
+        dst.write(data)
+    output_file = tmp_path / "dem_15TXN689292.tif"
+
+    crop_tile_from_block(_tile(1, 0), str(block_file), 250.0, str(output_file))
+
+    with rasterio.open(output_file) as src:
+        assert src.bounds == (689000.0, 4928000.0, 690000.0, 4929000.0)
+        assert src.nodata == -999999.0
+        np.testing.assert_array_equal(src.read(), data[:, 4:, 4:])
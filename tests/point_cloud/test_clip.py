@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from geopandas import GeoSeries
+from rasterio.transform import from_origin
+from shapely import box
+
+from src.data.point_cloud.clip import crop_bounds, mask_outside, read_geometries
+
+
+def test_read_geometries_clips_tile_buffers():
+    geometry = GeoSeries(
+        [box(689000, 4929000, 690000, 4930000), box(690000, 4929000, 691000, 4930000)],
+        crs=6344,
+    )
+    clip_area = box(689500, 4929500, 690200, 4929600)
+
+    unclipped = read_geometries(geometry, None)
+    clipped = read_geometries(geometry, clip_area)
+
+    assert unclipped.area.tolist() == [1020**2, 1020**2]
+    assert clipped.bounds.to_numpy().tolist() == [
+        [689500, 4929500, 690010, 4929600],
+        [689990, 4929500, 690200, 4929600],
+    ]
+
+
+def test_crop_bounds_snaps_to_tile_grid():
+    tile_bounds = np.array(
+        [[689000.0, 4929000.0, 690000.0, 4930000.0]] * 2,
+    )
+    read_bounds = np.array(
+        [
+            [689500.3, 4929500.0, 689700.6, 4929600.1],
+            [688990.0, 4928990.0, 690010.0, 4930010.0],
+        ]
+    )
+
+    result = crop_bounds(tile_bounds, read_bounds, 1.0)
+
+    assert result.tolist() == [
+        [689500.0, 4929500.0, 689701.0, 4929601.0],
+        [689000.0, 4929000.0, 690000.0, 4930000.0],
+    ]
+
+
+def test_mask_outside(tmp_path: Path):
+    raster_file = tmp_path / "dem_15TXN689290.tif"
+    profile = {
+        "driver": "GTiff",
+        "width": 10,
+        "height": 10,
+        "count": 1,
+        "dtype": "float32",
+        "crs": "EPSG:6344",
+        "nodata": -999999.0,
+        "transform": from_origin(689000.0, 4929010.0, 1.0, 1.0),
+    }
+    with rasterio.open(raster_file, "w", **profile) as dst:
+        dst.write(np.ones((1, 10, 10), dtype="float32"))
+
+    mask_outside(str(raster_file), box(689000, 4929000, 689004, 4929010).wkt)
+
+    with rasterio.open(raster_file) as src:
+        data = src.read(1)
+    assert (data[:, :4] == 1.0).all()
+    assert (data[:, 4:] == -999999.0).all()
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from src.data.point_cloud.cog import convert_to_cog
+
+
+def test_convert_to_cog(tmp_path: Path):
+    raster_file = tmp_path / "dem_15TXN689290.tif"
+    profile = {
+        "driver": "GTiff",
+        "width": 2000,
+        "height": 2000,
+        "count": 1,
+        "dtype": "float32",
+        "crs": "EPSG:6344",
+        "nodata": -999999.0,
+        "compress": "deflate",
+        "transform": from_origin(689000.0, 4930000.0, 0.5, 0.5),
+    }
+    data = np.linspace(300.0, 310.0, 2000 * 2000, dtype="float32").reshape(
+        1, 2000, 2000
+    )
+    with rasterio.open(raster_file, "w", **profile) as dst:
+        dst.write(data)
+
+    convert_to_cog(str(raster_file))
+
+    with rasterio.open(raster_file) as src:
+        image_structure = src.tags(ns="IMAGE_STRUCTURE")
+        assert image_structure["LAYOUT"] == "COG"
+        assert image_structure["PREDICTOR"] == "3"
+        assert src.block_shapes == [(512, 512)]
+        assert src.overviews(1) == [2, 4]
+        np.testing.assert_array_equal(src.read(), data)
+    assert list(tmp_path.iterdir()) == [raster_file]
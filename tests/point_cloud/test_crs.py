@@ -0,0 +1,62 @@
+import pytest
+from geopandas import GeoSeries
+from pyproj import CRS
+from shapely import box
+
+from src.data.point_cloud.crs import (
+    epsg_code,
+    get_transformer,
+    is_noop_reprojection,
+    linear_scale,
+    reproject_geometries,
+)
+
+UTM15N = CRS.from_epsg(6344)
+UTM15N_NAVD88 = CRS("EPSG:6344+5703")
+WEB_MERCATOR = CRS.from_epsg(3857)
+
+
+@pytest.mark.parametrize(
+    "from_crs, to_crs, expected",
+    [
+        (UTM15N, UTM15N, True),
+        (CRS.from_wkt(UTM15N.to_wkt()), UTM15N, True),
+        (UTM15N_NAVD88, UTM15N, True),
+        (UTM15N, UTM15N_NAVD88, False),
+        (UTM15N_NAVD88, UTM15N_NAVD88, True),
+        (WEB_MERCATOR, UTM15N, False),
+    ],
+)
+def test_is_noop_reprojection(from_crs: CRS, to_crs: CRS, expected: bool):
+    assert is_noop_reprojection(from_crs, to_crs) == expected
+
+
+def test_cached_lookups():
+    assert epsg_code(UTM15N_NAVD88) is None
+    assert epsg_code(CRS.from_epsg(6344)) == 6344
+    assert get_transformer(UTM15N, WEB_MERCATOR) is get_transformer(
+        CRS.from_epsg(6344), CRS.from_epsg(3857)
+    )
+
+
+def test_reproject_geometries():
+    geometry = GeoSeries(
+        [box(689000, 4929000, 690000, 4930000), box(690000, 4929000, 691000, 4930000)],
+        index=[3, 7],
+        crs=UTM15N,
+    )
+
+    result = reproject_geometries(geometry, WEB_MERCATOR)
+
+    expected = geometry.to_crs(WEB_MERCATOR)
+    assert result.crs == WEB_MERCATOR
+    assert list(result.index) == [3, 7]
+    assert result.geom_equals_exact(expected, tolerance=1e-6).all()
+    assert reproject_geometries(geometry, UTM15N) is not geometry
+    assert reproject_geometries(geometry, UTM15N).equals(geometry)
+
+
+def test_linear_scale():
+    assert linear_scale(UTM15N, UTM15N_NAVD88, 689000.0, 4929000.0) == 1.0
+    scale = linear_scale(UTM15N, WEB_MERCATOR, 689000.0, 4929000.0)
+    assert scale == pytest.approx(1.4, abs=0.05)
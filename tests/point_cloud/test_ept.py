@@ -0,0 +1,106 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.data.point_cloud.ept import (
+    StacItemIndex,
+    fetch_ept_data,
+    fetch_ept_data_for_workunits,
+)
+
+
+def _stac_item(workunit: str, epsg: int) -> dict:
+    return {
+        "id": workunit,
+        "bbox": [-93.0, 47.0, -92.0, 48.0],
+        "properties": {"proj:epsg": epsg},
+        "assets": {
+            "ept.json": {
+                "href": f"https://s3-us-west-2.amazonaws.com/usgs-lidar-public/{workunit}/ept.json"
+            }
+        },
+    }
+
+
+@pytest.fixture()
+def catalog_url(tmp_path: Path, local_server) -> str:
+    """Serves a small STAC catalog from a local directory."""
+    root = tmp_path / "ept"
+    root.mkdir()
+    workunits = {"MN_RainyLake_10_2020": 26915, "MN_RainyLake_1_2020": 3857}
+    links = [{"rel": "item", "href": f"./{workunit}.json"} for workunit in workunits]
+    catalog = {"links": [{"rel": "root", "href": "./catalog.json"}, *links]}
+    (root / "catalog.json").write_text(json.dumps(catalog))
+    for workunit, epsg in workunits.items():
+        (root / f"{workunit}.json").write_text(json.dumps(_stac_item(workunit, epsg)))
+
+    return f"{local_server.serve(tmp_path)}/ept/catalog.json"
+
+
+def test_fetch_ept_data_matches_workunit_exactly(catalog_url: str, tmp_path: Path):
+    stac_index = StacItemIndex.load(tmp_path / "index.json", catalog_url)
+
+    result = fetch_ept_data("MN_RainyLake_1_2020", stac_index)
+
+    assert result.ept_json_url.endswith("/MN_RainyLake_1_2020/ept.json")
+    assert result.crs.to_epsg() == 3857
+
+
+def test_fetch_ept_data_unknown_workunit(catalog_url: str, tmp_path: Path):
+    stac_index = StacItemIndex.load(tmp_path / "index.json", catalog_url)
+
+    with pytest.raises(KeyError):
+        fetch_ept_data("MN_RainyLake", stac_index)
+
+
+def test_stac_item_index_is_persisted(catalog_url: str, local_server, tmp_path: Path):
+    StacItemIndex.load(tmp_path / "index.json", catalog_url).refresh()
+    local_server.responses.clear()
+
+    stac_index = StacItemIndex.load(tmp_path / "index.json", catalog_url)
+    result = fetch_ept_data("MN_RainyLake_10_2020", stac_index)
+
+    assert result.crs.to_epsg() == 26915
+    assert local_server.responses == []
+
+
+def test_stac_item_index_refresh_is_conditional(
+    catalog_url: str, local_server, tmp_path: Path
+):
+    StacItemIndex.load(tmp_path / "index.json", catalog_url).refresh()
+    local_server.responses.clear()
+
+    stac_index = StacItemIndex.load(tmp_path / "index.json", catalog_url)
+    stac_index.refresh(revalidate_items=True)
+
+    assert {code for _, code in local_server.responses} == {304}
+    assert len(local_server.responses) == 3
+
+
+def test_fetch_ept_data_for_workunits_refreshes_catalog_once(
+    catalog_url: str, local_server, tmp_path: Path
+):
+    stac_index = StacItemIndex.load(tmp_path / "index.json", catalog_url)
+
+    result = fetch_ept_data_for_workunits(
+        ["MN_RainyLake_10_2020", "MN_RainyLake_1_2020"], stac_index
+    )
+
+    assert {w: d.crs.to_epsg() for w, d in result.items()} == {
+        "MN_RainyLake_10_2020": 26915,
+        "MN_RainyLake_1_2020": 3857,
+    }
+    assert local_server.requested.count("/ept/catalog.json") == 1
+    assert len(local_server.requested) == 3
+
+
+def test_fetch_ept_data_for_workunits_unknown_workunit(
+    catalog_url: str, tmp_path: Path
+):
+    stac_index = StacItemIndex.load(tmp_path / "index.json", catalog_url)
+
+    with pytest.raises(KeyError, match="MN_RainyLake"):
+        fetch_ept_data_for_workunits(
+            ["MN_RainyLake_1_2020", "MN_RainyLake"], stac_index
+        )
@@ -0,0 +1,141 @@
+import json
+from pathlib import Path
+from urllib.parse import urljoin
+
+import pytest
+import requests
+
+from src.data.point_cloud import ept_cache
+from src.data.point_cloud.ept_cache import EPTCache, EPTCacheServer, proxy_ept_readers
+
+
+@pytest.fixture()
+def ept_server(tmp_path: Path, local_server) -> str:
+    """Serves a small EPT dataset from a local directory."""
+    root = tmp_path / "usgs-lidar-public" / "MN_Test_2021"
+    (root / "ept-hierarchy").mkdir(parents=True)
+    (root / "ept-data").mkdir()
+    (root / "ept.json").write_text(json.dumps({"srs": {"horizontal": "3857"}}))
+    (root / "ept-hierarchy" / "0-0-0-0.json").write_text(json.dumps({"0-0-0-0": 10}))
+    (root / "ept-data" / "0-0-0-0.laz").write_bytes(b"\x00" * 1000)
+    (root / "ept-data" / "1-0-0-0.laz").write_bytes(b"\x01" * 1000)
+
+    return f"{local_server.serve(tmp_path)}/usgs-lidar-public/MN_Test_2021"
+
+
+def test_ept_cache_server_serves_from_cache(
+    ept_server: str, local_server, tmp_path: Path
+):
+    cache = EPTCache(tmp_path / "cache")
+
+    with EPTCacheServer(cache) as server:
+        first = requests.get(server.proxy_url(f"{ept_server}/ept.json"))
+        second = requests.get(server.proxy_url(f"{ept_server}/ept.json"))
+
+    assert first.json() == {"srs": {"horizontal": "3857"}}
+    assert second.content == first.content
+    assert local_server.requested == ["/usgs-lidar-public/MN_Test_2021/ept.json"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ept_cache_server_resolves_relative_urls(ept_server: str, tmp_path: Path):
+    cache = EPTCache(tmp_path / "cache")
+
+    with EPTCacheServer(cache) as server:
+        ept_json_url = server.proxy_url(f"{ept_server}/ept.json")
+        hierarchy_url = urljoin(ept_json_url, "ept-hierarchy/0-0-0-0.json")
+        result = requests.get(hierarchy_url)
+
+    assert result.json() == {"0-0-0-0": 10}
+
+
+def test_ept_cache_server_passes_through_missing(ept_server: str, tmp_path: Path):
+    cache = EPTCache(tmp_path / "cache")
+
+    with EPTCacheServer(cache) as server:
+        result = requests.get(server.proxy_url(f"{ept_server}/ept-data/9-9-9-9.laz"))
+
+    assert result.status_code == 404
+
+
+def test_ept_cache_evicts_least_recently_used(ept_server: str, tmp_path: Path):
+    cache = EPTCache(tmp_path / "cache", max_bytes=1500)
+
+    first = cache.get(f"{ept_server}/ept-data/0-0-0-0.laz")
+    second = cache.get(f"{ept_server}/ept-data/1-0-0-0.laz")
+
+    assert not first.exists()
+    assert second.exists()
+
+
+def test_ept_cache_reloads_existing_files(
+    ept_server: str, local_server, tmp_path: Path
+):
+    EPTCache(tmp_path / "cache").get(f"{ept_server}/ept.json")
+
+    cache = EPTCache(tmp_path / "cache")
+    cache.get(f"{ept_server}/ept.json")
+
+    assert cache.hits == 1
+    assert len(local_server.requested) == 1
+
+
+def test_ept_cache_removes_interrupted_download(
+    ept_server: str, tmp_path: Path, monkeypatch
+):
+    def interrupted_copy(src, dst, *args) -> None:
+        dst.write(src.read(100))
+        raise requests.ConnectionError("connection reset by peer")
+
+    monkeypatch.setattr(ept_cache.shutil, "copyfileobj", interrupted_copy)
+    cache = EPTCache(tmp_path / "cache")
+
+    with pytest.raises(requests.ConnectionError):
+        cache.get(f"{ept_server}/ept-data/0-0-0-0.laz")
+
+    assert [f for f in (tmp_path / "cache").rglob("*") if f.is_file()] == []
+
+
+def test_ept_cache_ignores_unfinished_downloads(tmp_path: Path):
+    node_dir = tmp_path / "cache/127.0.0.1/ept-data"
+    node_dir.mkdir(parents=True)
+    (node_dir / "0-0-0-0.laz").write_bytes(b"\x00" * 1000)
+    unfinished = node_dir / f"tmpabc123{ept_cache.TMP_SUFFIX}"
+    unfinished.write_bytes(b"\x00" * 500)
+
+    cache = EPTCache(tmp_path / "cache")
+
+    assert list(cache._files) == [node_dir / "0-0-0-0.laz"]
+    assert cache._size == 1000
+    assert not unfinished.exists()
+
+
+def test_proxy_ept_readers():
+    pipeline_json = json.dumps(
+        [
+            {"type": "readers.ept", "filename": "https://fake.com/MN/ept.json"},
+            {"type": "filters.range", "limits": "Classification[2:2]"},
+        ]
+    )
+
+    result = json.loads(proxy_ept_readers(pipeline_json, "http://127.0.0.1:8000"))
+
+    assert result[0]["filename"] == "http://127.0.0.1:8000/https/fake.com/MN/ept.json"
+    assert result[1] == {"type": "filters.range", "limits": "Classification[2:2]"}
+
+
+def test_ept_cache_server_counts_bytes_per_tile(ept_server: str, tmp_path: Path):
+    cache = EPTCache(tmp_path / "cache")
+    node_url = f"{ept_server}/ept-data/0-0-0-0.laz"
+    pipeline_json = json.dumps([{"type": "readers.ept", "filename": node_url}])
+
+    with EPTCacheServer(cache) as server:
+        proxied = proxy_ept_readers(pipeline_json, server.base_url, "15TXN689290")
+        tile_url = json.loads(proxied)[0]["filename"]
+        requests.get(tile_url)
+        requests.get(tile_url)
+        requests.get(server.proxy_url(node_url))
+
+    assert tile_url.startswith(f"{server.base_url}/tiles/15TXN689290/http/")
+    assert server.bytes_fetched == {"15TXN689290": 2000}
+    assert server.bytes_downloaded == {"15TXN689290": 1000}
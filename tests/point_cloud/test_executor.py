@@ -0,0 +1,264 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.data.point_cloud import executor
+from src.data.point_cloud.executor import (
+    TileResult,
+    TileTask,
+    execute_tile_task,
+    execute_tile_tasks,
+    iter_tile_results,
+    write_execution_summary,
+)
+
+
+class FlakyPipeline:
+    """Fails with the queued errors before executing successfully."""
+
+    errors: list[Exception] = []
+    points: int = 0
+
+    def __init__(self, pipeline_json: str, arrays=None) -> None:
+        self.pipeline_json = pipeline_json
+
+    def execute(self) -> int:
+        if FlakyPipeline.errors:
+            raise FlakyPipeline.errors.pop(0)
+        return FlakyPipeline.points
+
+
+@pytest.fixture()
+def flaky_pipeline(monkeypatch) -> type[FlakyPipeline]:
+    monkeypatch.setattr(executor.pdal, "Pipeline", FlakyPipeline)
+    FlakyPipeline.errors = []
+    FlakyPipeline.points = 0
+    return FlakyPipeline
+
+
+@pytest.fixture()
+def task() -> TileTask:
+    return TileTask(tile_name="15TXN689291", pipeline_jsons=["[]"])
+
+
+def test_execute_tile_task_retries_transient_error(flaky_pipeline, task):
+    flaky_pipeline.errors = [RuntimeError("readers.ept: curl error: timed out")]
+
+    result = execute_tile_task(task, retries=2, backoff=0)
+
+    assert result.success
+    assert result.attempts == 2
+
+
+def test_execute_tile_task_gives_up_after_retries(flaky_pipeline, task):
+    flaky_pipeline.errors = [RuntimeError("Connection reset")] * 3
+
+    result = execute_tile_task(task, retries=2, backoff=0)
+
+    assert not result.success
+    assert result.attempts == 3
+    assert result.error == "Connection reset"
+
+
+def test_execute_tile_task_does_not_retry_permanent_error(flaky_pipeline, task):
+    flaky_pipeline.errors = [RuntimeError("filters.delaunay: no points")]
+
+    result = execute_tile_task(task, retries=2, backoff=0)
+
+    assert not result.success
+    assert result.attempts == 1
+
+
+def test_execute_tile_tasks_continues_past_failed_tile(flaky_pipeline, task):
+    flaky_pipeline.errors = [RuntimeError("filters.delaunay: no points")]
+    tasks = [task, TileTask(tile_name="15TXN689292", pipeline_jsons=["[]"])]
+
+    result = execute_tile_tasks(tasks, workers=1, retries=0)
+
+    assert [r.success for r in result] == [False, True]
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "readers.ept: https://example.com/ept.json: 404 Not Found",
+        "readers.ept: https://example.com/ept.json: 403 Forbidden",
+        "readers.ept: Invalid polygon for https://example.com/USGS_503/ept.json",
+    ],
+)
+def test_execute_tile_task_does_not_retry_permanent_url_error(
+    flaky_pipeline, task, message
+):
+    flaky_pipeline.errors = [RuntimeError(message)]
+
+    result = execute_tile_task(task, retries=2, backoff=0)
+
+    assert not result.success
+    assert result.attempts == 1
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "readers.ept: https://example.com/ept.json: 503 Service Unavailable",
+        "readers.ept: https://example.com/ept.json: 429",
+        "curl: Couldn't resolve host name",
+    ],
+)
+def test_execute_tile_task_retries_transient_url_error(flaky_pipeline, task, message):
+    flaky_pipeline.errors = [RuntimeError(message)]
+
+    result = execute_tile_task(task, retries=2, backoff=0)
+
+    assert result.success
+    assert result.attempts == 2
+
+
+def test_iter_tile_results_continues_past_raising_tile(flaky_pipeline):
+    # not a RuntimeError, so execute_tile_task raises it rather than returning it
+    flaky_pipeline.errors = [ValueError("invalid pipeline")]
+    tasks = [
+        TileTask(tile_name="15TXN689291", pipeline_jsons=["[]"]),
+        TileTask(tile_name="15TXN689292", pipeline_jsons=["[]"]),
+    ]
+
+    results = [result for _, result in iter_tile_results(tasks, workers=1, retries=0)]
+
+    assert [r.success for r in results] == [False, True]
+    assert results[0].error == "ValueError('invalid pipeline')"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_iter_tile_results_draws_tasks_lazily(flaky_pipeline, workers):
+    drawn = []
+
+    def tasks():
+        for i in range(20):
+            drawn.append(i)
+            yield TileTask(tile_name=f"15TXN6892{i:02d}", pipeline_jsons=["[]"])
+
+    results = iter_tile_results(tasks(), workers=workers, retries=0)
+
+    task, result = next(results)
+    assert result.success
+    assert result.tile_name == task.tile_name
+    assert len(drawn) <= workers * executor.TASKS_IN_FLIGHT_PER_WORKER
+    assert len(list(results)) == 19
+
+
+def test_write_execution_summary(tmp_path: Path):
+    results = [
+        TileResult("15TXN689291", True, 1, 1.5),
+        TileResult("15TXN689292", False, 4, 9.0, "Connection reset"),
+    ]
+    summary_file = tmp_path / "execution_summary.json"
+
+    write_execution_summary(results, summary_file)
+
+    with open(summary_file) as f:
+        summary = json.load(f)
+    assert summary["succeeded"] == 1
+    assert summary["failed"] == 1
+    assert summary["results"][1]["error"] == "Connection reset"
+
+
+def test_execute_tile_task_records_metrics(flaky_pipeline, tmp_path: Path):
+    output_file = tmp_path / "dem_15TXN689291.tif"
+    task = TileTask(
+        tile_name="15TXN689291",
+        pipeline_jsons=["[]", "[]"],
+        outputs={str(output_file): "abc"},
+        post_steps=[lambda: output_file.write_bytes(b"\x00" * 10)],
+    )
+
+    result = execute_tile_task(task, retries=0)
+
+    assert len(result.metrics.stages) == 2
+    assert result.metrics.output_bytes == {str(output_file): 10}
+    assert result.metrics.max_rss_mib > 0
+
+
+@pytest.mark.parametrize("failing", ["pipeline", "post_step"])
+def test_execute_tile_task_removes_scratch_dir(
+    flaky_pipeline, tmp_path: Path, failing: str
+):
+    scratch_dir = tmp_path / ".blocks/block_15TXN689290"
+    scratch_dir.mkdir(parents=True)
+    (scratch_dir / "dem_block_15TXN689290.tif").write_bytes(b"\x00")
+    if failing == "pipeline":
+        flaky_pipeline.errors = [RuntimeError("filters.delaunay: no points")]
+
+    def post_step() -> None:
+        raise OSError("No space left on device")
+
+    task = TileTask(
+        tile_name="block_15TXN689290",
+        pipeline_jsons=["[]"],
+        post_steps=[post_step],
+        scratch_dir=scratch_dir,
+    )
+
+    result = execute_tile_task(task, retries=0)
+
+    assert not result.success
+    assert not scratch_dir.exists()
+
+
+def test_execute_tile_task_counts_points_not_reprojected(flaky_pipeline):
+    pipeline_json = json.dumps(
+        [{"tag": "vendor_classified_ground_points", "type": "filters.range"}]
+    )
+    task = TileTask(
+        tile_name="15TXN689291",
+        pipeline_jsons=[pipeline_json, pipeline_json],
+        reprojection_elided=True,
+    )
+    flaky_pipeline.points = 5
+
+    result = execute_tile_task(task, retries=0, stage_metrics=True)
+
+    assert result.metrics.points_not_reprojected == 10
+
+
+def test_execute_tile_task_points_not_reprojected_unknown_without_stage_metrics(
+    flaky_pipeline,
+):
+    pipeline_json = json.dumps(
+        [
+            {"tag": "vendor_classified_ground_points", "type": "filters.range"},
+            {"tag": "write_dem", "type": "writers.gdal"},
+            {"tag": "write_intensity", "type": "writers.gdal"},
+        ]
+    )
+    task = TileTask(
+        tile_name="15TXN689291",
+        pipeline_jsons=[pipeline_json],
+        reprojection_elided=True,
+    )
+    flaky_pipeline.points = 5
+
+    result = execute_tile_task(task, retries=0)
+
+    assert result.success
+    assert result.metrics.points_not_reprojected is None
+
+
+def test_iter_tile_results_holds_tasks_beyond_memory_budget(flaky_pipeline):
+    drawn = []
+
+    def tasks():
+        for i in range(6):
+            drawn.append(i)
+            yield TileTask(
+                tile_name=f"15TXN6892{i:02d}",
+                pipeline_jsons=["[]"],
+                estimated_memory_mib=600.0,
+            )
+
+    results = iter_tile_results(tasks(), workers=2, retries=0, memory_budget_mib=1000)
+
+    next(results)
+    # one task in the pool and the next held back, rather than four in flight
+    assert len(drawn) == 2
+    assert len(list(results)) == 5
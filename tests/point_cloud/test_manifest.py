@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from src.data.point_cloud.manifest import (
+    ProductManifest,
+    hash_product_inputs,
+    output_files,
+)
+
+SOURCE_STAGES = [
+    {
+        "tag": "raw_points",
+        "type": "readers.ept",
+        "filename": "https://fake.com/ept.json",
+        "polygon": "POLYGON ((0 0, 0 10, 10 10, 10 0, 0 0))",
+    }
+]
+
+PRODUCT_STAGES = [
+    {"tag": "delaunay_mesh", "type": "filters.delaunay"},
+    {
+        "tag": "write_faceraster",
+        "type": "writers.raster",
+        "filename": "/path/to/output/dem_15TXN689291.tif",
+    },
+]
+
+
+def test_hash_product_inputs_changes_with_inputs():
+    changed_source = [{**SOURCE_STAGES[0], "filename": "https://other.com/ept.json"}]
+
+    result = hash_product_inputs(SOURCE_STAGES, PRODUCT_STAGES)
+
+    assert result == hash_product_inputs(SOURCE_STAGES, PRODUCT_STAGES)
+    assert result != hash_product_inputs(changed_source, PRODUCT_STAGES)
+
+
+def test_output_files():
+    assert output_files(PRODUCT_STAGES) == ["/path/to/output/dem_15TXN689291.tif"]
+
+
+def test_output_files_of_python_filter():
+    stages = [
+        {
+            "type": "filters.python",
+            "pdalargs": {"filename": "/path/to/output/dem_15TXN689291.tif"},
+        },
+        {"type": "filters.python", "pdalargs": {"factor": 0.3048}},
+    ]
+
+    assert output_files(stages) == ["/path/to/output/dem_15TXN689291.tif"]
+
+
+def test_product_manifest_round_trip(tmp_path: Path):
+    manifest_file = tmp_path / "manifest.sqlite"
+    product_file = tmp_path / "dem_15TXN689291.tif"
+    product_file.touch()
+    ProductManifest(manifest_file).record("15TXN689291", {str(product_file): "abc"})
+
+    result = ProductManifest.load(manifest_file)
+
+    assert result.is_current([str(product_file)], "abc")
+    assert not result.is_current([str(product_file)], "def")
+
+
+def test_product_manifest_requires_existing_output(tmp_path: Path):
+    manifest = ProductManifest(tmp_path / "manifest.sqlite")
+    manifest.record("15TXN689291", {str(tmp_path / "missing.tif"): "abc"})
+
+    assert not manifest.is_current([str(tmp_path / "missing.tif")], "abc")
@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.data.point_cloud import metrics
+from src.data.point_cloud.executor import TileResult, append_tile_metrics
+from src.data.point_cloud.metrics import (
+    StageMetrics,
+    TileMetrics,
+    execute_pipeline_segmented,
+    segment_stages,
+    summarize_metrics,
+)
+
+STAGES = [
+    {"tag": "raw_points", "type": "readers.ept", "filename": "ept.json"},
+    {"tag": "ground_only", "inputs": ["raw_points"], "type": "filters.range"},
+    {"tag": "delaunay_mesh", "inputs": ["ground_only"], "type": "filters.delaunay"},
+    {"tag": "faceraster", "inputs": ["delaunay_mesh"], "type": "filters.faceraster"},
+    {"tag": "write_faceraster", "inputs": ["faceraster"], "type": "writers.raster"},
+    {"tag": "write_intensity", "inputs": ["ground_only"], "type": "writers.gdal"},
+]
+
+
+class RecordingPipeline:
+    """Records the stages and arrays of each pipeline and drops a point per stage."""
+
+    executed: list[tuple[list[str], int]] = []
+
+    def __init__(self, spec: str, arrays=None) -> None:
+        self.stages = json.loads(spec)
+        self.input_arrays = arrays or [np.zeros(10)]
+        self.arrays = []
+
+    def execute(self) -> int:
+        points = sum(len(a) for a in self.input_arrays)
+        RecordingPipeline.executed.append(([s["tag"] for s in self.stages], points))
+        assert "inputs" not in self.stages[0]
+        self.arrays = [np.zeros(points - 1)]
+        return points - 1
+
+
+@pytest.fixture()
+def recording_pipeline(monkeypatch) -> type[RecordingPipeline]:
+    monkeypatch.setattr(metrics.pdal, "Pipeline", RecordingPipeline)
+    RecordingPipeline.executed = []
+    return RecordingPipeline
+
+
+def test_segment_stages_keeps_mesh_with_its_consumers():
+    result = segment_stages(STAGES)
+
+    assert [[s["tag"] for s in segment] for segment in result] == [
+        ["raw_points"],
+        ["ground_only"],
+        ["delaunay_mesh", "faceraster", "write_faceraster"],
+        ["write_intensity"],
+    ]
+
+
+def test_execute_pipeline_segmented(recording_pipeline):
+    result = execute_pipeline_segmented(json.dumps(STAGES))
+
+    assert [(m.tags[-1], m.points) for m in result] == [
+        ("raw_points", 9),
+        ("ground_only", 8),
+        ("write_faceraster", 7),
+        ("write_intensity", 7),
+    ]
+    assert recording_pipeline.executed[3] == (["write_intensity"], 8)
+
+
+def test_summarize_metrics(tmp_path: Path):
+    metrics_file = tmp_path / "metrics.jsonl"
+    results = [
+        TileResult(
+            tile_name,
+            True,
+            1,
+            elapsed,
+            metrics=TileMetrics(
+                stages=[
+                    StageMetrics(["raw_points"], elapsed - 1, 100),
+                    StageMetrics(["write_faceraster"], 1.0, 100),
+                ]
+            ),
+        )
+        for tile_name, elapsed in [("15TXN689290", 5.0), ("15TXN689291", 9.0)]
+    ]
+    append_tile_metrics(results[:1], metrics_file)
+    append_tile_metrics(results[1:], metrics_file)
+
+    slowest_tiles, slowest_stages = summarize_metrics(metrics_file, top=1)
+
+    assert slowest_tiles["tile_name"].tolist() == ["15TXN689291"]
+    assert slowest_stages.index.tolist() == ["raw_points"]
+    assert slowest_stages.loc["raw_points", "total"] == 12.0
@@ -0,0 +1,405 @@
+import json
+from pathlib import Path
+
+import pytest
+import shapely
+from geopandas import GeoDataFrame, GeoSeries
+from pyproj import CRS
+from shapely import box
+
+from src.data.point_cloud import pipeline
+from src.data.point_cloud.clip import ClipMode
+from src.data.point_cloud.ept import EPTData
+from src.data.point_cloud.manifest import ProductManifest
+from src.data.point_cloud.pipeline import (
+    ProductsConfig,
+    _calc_ept_filter_as_wkt,
+    generate_block_tasks,
+    generate_pipelines,
+    generate_tile_data_batch,
+    generate_tile_task,
+    generate_workunit_tile_tasks,
+    iter_workunit_tile_tasks,
+)
+from src.data.point_cloud.product import OutputProfile, ProductName
+from src.data.point_cloud.tile import TileData
+
+
+@pytest.fixture()
+def selected_tiles() -> GeoDataFrame:
+    return GeoDataFrame(
+        data={
+            "tile_name": ["15TXN689290", "15TXN690290", "15TXN691290"],
+            "workunit": [
+                "MN_SEDriftless_1_2021",
+                "MN_SEDriftless_2_2021",
+                "MN_SEDriftless_1_2021",
+            ],
+        },
+        geometry=[
+            box(689000, 4929000, 690000, 4930000),
+            box(690000, 4929000, 691000, 4930000),
+            box(691000, 4929000, 692000, 4930000),
+        ],
+        crs=6344,
+    )
+
+
+@pytest.fixture()
+def ept_data_by_workunit() -> dict[str, EPTData]:
+    return {
+        workunit: EPTData(
+            workunit=workunit,
+            crs=CRS.from_epsg(3857),
+            ept_json_url=f"https://fake.com/{workunit}/ept.json",
+        )
+        for workunit in ["MN_SEDriftless_1_2021", "MN_SEDriftless_2_2021"]
+    }
+
+
+@pytest.fixture()
+def tile() -> TileData:
+    return TileData(
+        tile_name="15TXN689290",
+        minx=689000.0,
+        miny=4929000.0,
+        maxx=690000.0,
+        maxy=4930000.0,
+        crs=CRS.from_epsg(6344),
+        ept_filter_as_wkt="POLYGON ((0 0, 0 10, 10 10, 10 0, 0 0))",
+    )
+
+
+@pytest.fixture()
+def ept_data(ept_data_by_workunit: dict[str, EPTData]) -> EPTData:
+    return ept_data_by_workunit["MN_SEDriftless_1_2021"]
+
+
+def test_generate_workunit_tile_tasks(
+    selected_tiles: GeoDataFrame, ept_data_by_workunit: dict[str, EPTData]
+):
+    result = generate_workunit_tile_tasks(
+        selected_tiles,
+        ept_data_by_workunit,
+        ProductsConfig([ProductName.DELAUNEY_MESH_DEM], 0.5, Path("/path/to/output")),
+    )
+
+    ept_urls = {
+        task.tile_name: json.loads(task.pipeline_jsons[0])[0]["filename"]
+        for task in result
+    }
+    assert ept_urls == {
+        "15TXN689290": "https://fake.com/MN_SEDriftless_1_2021/ept.json",
+        "15TXN690290": "https://fake.com/MN_SEDriftless_2_2021/ept.json",
+        "15TXN691290": "https://fake.com/MN_SEDriftless_1_2021/ept.json",
+    }
+
+
+def test_iter_workunit_tile_tasks_is_lazy(
+    selected_tiles: GeoDataFrame, ept_data_by_workunit: dict[str, EPTData]
+):
+    drawn = []
+
+    def tile_batches():
+        for i in range(len(selected_tiles)):
+            drawn.append(i)
+            yield selected_tiles.iloc[[i]]
+
+    tasks = iter_workunit_tile_tasks(
+        tile_batches(),
+        ProductsConfig([ProductName.DELAUNEY_MESH_DEM], 0.5, Path("/path/to/output")),
+        ept_data_by_workunit=ept_data_by_workunit,
+    )
+
+    assert next(tasks).tile_name == "15TXN689290"
+    assert drawn == [0]
+    assert [task.tile_name for task in tasks] == ["15TXN690290", "15TXN691290"]
+
+
+def test_iter_workunit_tile_tasks_can_skip_validation(
+    selected_tiles: GeoDataFrame, ept_data_by_workunit: dict[str, EPTData], monkeypatch
+):
+    def fail(*args, **kwargs):
+        raise AssertionError("validated")
+
+    monkeypatch.setattr(pipeline.TileDataSchema, "validate", fail)
+
+    tasks = iter_workunit_tile_tasks(
+        [selected_tiles],
+        ProductsConfig([ProductName.DELAUNEY_MESH_DEM], 0.5, Path("/path/to/output")),
+        ept_data_by_workunit=ept_data_by_workunit,
+        validate=False,
+    )
+
+    assert len(list(tasks)) == 3
+
+
+def test_generate_tile_task_reads_once_for_all_products(
+    tile: TileData, ept_data: EPTData
+):
+    task = generate_tile_task(
+        tile,
+        ept_data,
+        ProductsConfig(
+            [ProductName.DELAUNEY_MESH_DEM, ProductName.INTENSITY_RASTER],
+            0.5,
+            Path("/path/to/output"),
+            product_options={ProductName.INTENSITY_RASTER: {"resolution": 1.0}},
+        ),
+    )
+
+    result = json.loads(task.pipeline_jsons[0])
+    readers = [stage for stage in result if stage["type"] == "readers.ept"]
+    writers = {
+        stage["tag"]: stage for stage in result if stage["type"].startswith("writers")
+    }
+    assert len(readers) == 1
+    assert (
+        writers["write_faceraster"]["filename"] == "/path/to/output/dem_15TXN689290.tif"
+    )
+    assert writers["write_intensity_raster"]["resolution"] == 1.0
+    assert writers["write_intensity_raster"]["inputs"] == [
+        "vendor_classified_ground_points"
+    ]
+
+
+def test_generate_tile_task_skips_current_products(
+    tile: TileData, ept_data: EPTData, tmp_path: Path
+):
+    products = [ProductName.DELAUNEY_MESH_DEM, ProductName.INTENSITY_RASTER]
+    config = ProductsConfig(products, 0.5, tmp_path)
+    first = generate_tile_task(tile, ept_data, config)
+    manifest = ProductManifest(tmp_path / "manifest.sqlite")
+    dem_file = str(tmp_path / "dem_15TXN689290.tif")
+    manifest.record(tile.tile_name, {dem_file: first.outputs[dem_file]})
+    open(dem_file, "w").close()
+
+    result = generate_tile_task(tile, ept_data, config, manifest)
+
+    assert list(result.outputs) == [str(tmp_path / "intensity_15TXN689290.tif")]
+    assert "write_faceraster" not in result.pipeline_jsons[0]
+
+
+def test_generate_tile_task_returns_none_when_all_current(
+    tile: TileData, ept_data: EPTData, tmp_path: Path
+):
+    config = ProductsConfig([ProductName.DELAUNEY_MESH_DEM], 0.5, tmp_path)
+    first = generate_tile_task(tile, ept_data, config)
+    manifest = ProductManifest(tmp_path / "manifest.sqlite")
+    manifest.record(tile.tile_name, first.outputs)
+    open(tmp_path / "dem_15TXN689290.tif", "w").close()
+
+    result = generate_tile_task(tile, ept_data, config, manifest)
+
+    assert result is None
+
+
+def test_generate_tile_task_splits_into_subtiles(
+    tile: TileData, ept_data: EPTData, tmp_path: Path
+):
+    config = ProductsConfig(
+        [ProductName.DELAUNEY_MESH_DEM], 0.5, tmp_path, subtiles=2, halo=20.0
+    )
+
+    task = generate_tile_task(tile, ept_data, config)
+
+    assert len(task.pipeline_jsons) == 4
+    assert list(task.outputs) == [str(tmp_path / "dem_15TXN689290.tif")]
+    writers = [
+        stage["filename"]
+        for pipeline_json in task.pipeline_jsons
+        for stage in json.loads(pipeline_json)
+        if stage["type"].startswith("writers")
+    ]
+    assert all(Path(w).parent == tmp_path / ".subtiles/15TXN689290" for w in writers)
+    assert len(task.post_steps) == 1
+    assert task.scratch_dir == tmp_path / ".subtiles/15TXN689290"
+
+
+def test_generate_tile_task_converts_cog_outputs(
+    tile: TileData, ept_data: EPTData, tmp_path: Path
+):
+    config = ProductsConfig(
+        [ProductName.DELAUNEY_MESH_DEM, ProductName.INTENSITY_RASTER],
+        0.5,
+        tmp_path,
+        product_options={
+            ProductName.INTENSITY_RASTER: {"output_profile": OutputProfile.COG}
+        },
+    )
+
+    task = generate_tile_task(tile, ept_data, config)
+
+    assert [step.args for step in task.post_steps] == [
+        (str(tmp_path / "intensity_15TXN689290.tif"),)
+    ]
+
+
+def test_generate_block_tasks_read_once_per_block(
+    selected_tiles: GeoDataFrame, ept_data: EPTData, tmp_path: Path
+):
+    tile_data = generate_tile_data_batch(selected_tiles, ept_data)
+    products = [ProductName.DELAUNEY_MESH_DEM, ProductName.INTENSITY_RASTER]
+    tile_config = ProductsConfig(products, 0.5, tmp_path)
+    block_config = ProductsConfig(products, 0.5, tmp_path, block_size=2)
+
+    tasks = list(generate_block_tasks(tile_data, ept_data, block_config))
+
+    # blocks align to a 2 km grid: 15TXN690290 and 15TXN691290 share one
+    assert [task.tile_name for task in tasks] == ["15TXN689290", "block_15TXN690290"]
+    readers = [
+        stage
+        for stage in json.loads(tasks[1].pipeline_jsons[0])
+        if stage["type"] == "readers.ept"
+    ]
+    assert len(readers) == 1
+    outputs = {f: h for task in tasks for f, h in task.outputs.items()}
+    tile_outputs = {
+        f: h
+        for tile in tile_data
+        for f, h in generate_tile_task(tile, ept_data, tile_config).outputs.items()
+    }
+    assert outputs == tile_outputs
+    assert tasks[1].scratch_dir == tmp_path / ".blocks/block_15TXN690290"
+    crops = [step.args[3] for step in tasks[1].post_steps]
+    assert sorted(crops) == sorted(
+        f for f in tile_outputs if "690290" in f or "691290" in f
+    )
+
+
+def test_products_config_rejects_subtiles_in_blocks():
+    with pytest.raises(ValueError):
+        ProductsConfig(
+            [ProductName.DELAUNEY_MESH_DEM], 0.5, Path(), subtiles=2, block_size=2
+        )
+
+
+def test_products_config_read_resolution():
+    products = [ProductName.DELAUNEY_MESH_DEM, ProductName.INTENSITY_RASTER]
+    options = {ProductName.DELAUNEY_MESH_DEM: {"resolution": 1.0}}
+
+    def read_resolution(**kwargs) -> float:
+        config = ProductsConfig(
+            products, 2.0, Path(), product_options=options, **kwargs
+        )
+        return config.read_resolution()
+
+    assert read_resolution() is None
+    assert read_resolution(points_per_cell=4) == 0.5
+    assert (
+        read_resolution(
+            points_per_cell=4, full_density_products=[ProductName.DELAUNEY_MESH_DEM]
+        )
+        is None
+    )
+
+
+def test_generate_tile_task_reads_coarser_for_coarse_products(
+    tile: TileData, ept_data: EPTData, tmp_path: Path
+):
+    full = ProductsConfig([ProductName.INTENSITY_RASTER], 2.0, tmp_path)
+    coarse = ProductsConfig(
+        [ProductName.INTENSITY_RASTER], 2.0, tmp_path, points_per_cell=4
+    )
+
+    full_task = generate_tile_task(tile, ept_data, full)
+    coarse_task = generate_tile_task(tile, ept_data, coarse)
+
+    reader = json.loads(coarse_task.pipeline_jsons[0])[0]
+    assert reader["resolution"] > 1.0
+    assert "resolution" not in json.loads(full_task.pipeline_jsons[0])[0]
+    assert full_task.outputs.keys() == coarse_task.outputs.keys()
+    assert full_task.outputs != coarse_task.outputs
+
+
+def test_generate_tile_task_clipped_to_aoi(
+    selected_tiles: GeoDataFrame, ept_data: EPTData, tmp_path: Path
+):
+    clip_area = box(689500, 4929500, 689700, 4929600)
+    mask = ProductsConfig(
+        [ProductName.INTENSITY_RASTER], 1.0, tmp_path, clip=ClipMode.MASK
+    )
+    crop = ProductsConfig(
+        [ProductName.INTENSITY_RASTER], 1.0, tmp_path, clip=ClipMode.CROP
+    )
+
+    tile = generate_tile_data_batch(selected_tiles[:1], ept_data, clip_area=clip_area)[
+        0
+    ]
+    cropped = generate_tile_data_batch(
+        selected_tiles[:1],
+        ept_data,
+        clip_area=clip_area,
+        crop_resolution=crop.crop_resolution(),
+    )[0]
+    task = generate_tile_task(tile, ept_data, mask)
+    cropped_task = generate_tile_task(cropped, ept_data, crop)
+
+    assert shapely.from_wkt(tile.clip_as_wkt).equals(clip_area)
+    assert (tile.minx, tile.maxy) == (689000.0, 4930000.0)
+    assert (cropped.minx, cropped.miny, cropped.maxx, cropped.maxy) == (
+        689500.0,
+        4929500.0,
+        689700.0,
+        4929600.0,
+    )
+    assert task.read_area == 200 * 100
+    assert task.area_saved == 1020**2 - 200 * 100
+    assert [step.args for step in task.post_steps] == [
+        (str(tmp_path / "intensity_15TXN689290.tif"), tile.clip_as_wkt)
+    ]
+    writer = json.loads(cropped_task.pipeline_jsons[0])[-1]
+    assert (writer["origin_x"], writer["width"]) == (689500.0, 200)
+
+
+def test_products_config_rejects_cropped_blocks():
+    with pytest.raises(ValueError):
+        ProductsConfig(
+            [ProductName.DELAUNEY_MESH_DEM], 0.5, Path(), block_size=2, clip="crop"
+        )
+
+
+def test_calc_ept_filter_as_wkt(selected_tiles: GeoDataFrame):
+    same_crs = _calc_ept_filter_as_wkt(selected_tiles.geometry, CRS.from_epsg(6344))
+    mercator = _calc_ept_filter_as_wkt(selected_tiles.geometry, CRS.from_epsg(3857))
+    clipped = _calc_ept_filter_as_wkt(
+        selected_tiles.geometry,
+        CRS.from_epsg(6344),
+        clip_area=box(689500, 4929500, 689700, 4929600),
+    )
+
+    assert shapely.from_wkt(same_crs.iloc[0]).bounds == (
+        688990.0,
+        4928990.0,
+        690010.0,
+        4930010.0,
+    )
+    expected = GeoSeries(selected_tiles.geometry.buffer(10, join_style="mitre"))
+    expected = expected.to_crs(3857).iloc[0]
+    assert shapely.from_wkt(mercator.iloc[0]).equals_exact(expected, 1e-3)
+    assert shapely.from_wkt(clipped.iloc[0]).bounds == (
+        689500.0,
+        4929500.0,
+        689700.0,
+        4929600.0,
+    )
+    assert shapely.from_wkt(clipped.iloc[2]).is_empty
+
+
+def test_generate_pipelines(tile: TileData, ept_data: EPTData, monkeypatch):
+    class RecordingPipeline:
+        def __init__(self, pipeline_json: str) -> None:
+            self.stages = json.loads(pipeline_json)
+
+    monkeypatch.setattr(pipeline.pdal, "Pipeline", RecordingPipeline)
+    config = ProductsConfig(
+        [ProductName.DELAUNEY_MESH_DEM], 0.5, Path("/path/to/output"), subtiles=2
+    )
+
+    result = generate_pipelines([tile], ept_data, config)
+
+    assert len(result) == 4
+    readers = [
+        stage for p in result for stage in p.stages if stage["type"] == "readers.ept"
+    ]
+    assert {reader["filename"] for reader in readers} == {ept_data.ept_json_url}
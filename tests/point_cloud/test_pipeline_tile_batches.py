@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from geopandas import GeoDataFrame
+from shapely import Point, box
+
+from src.data.point_cloud.pipeline import (
+    iter_selected_tile_batches,
+    select_tiles_by_location,
+)
+
+
+@pytest.fixture()
+def tile_index() -> GeoDataFrame:
+    col, row = np.meshgrid(np.arange(20), np.arange(20))
+    col, row = col.ravel(), row.ravel()
+    minx = 600000.0 + col * 1000.0
+    miny = 4800000.0 + row * 1000.0
+    return GeoDataFrame(
+        data={
+            "tile_name": [f"15TXN{c:03d}{r:03d}" for c, r in zip(col, row)],
+            "workunit": [f"SYNTHETIC_{c // 5}_2024" for c in col],
+        },
+        geometry=box(minx, miny, minx + 1000.0, miny + 1000.0),
+        crs=6344,
+    )
+
+
+@pytest.fixture()
+def aoi() -> GeoDataFrame:
+    # a disc whose bounding box overlaps tiles it does not intersect
+    disc = Point(610000.0, 4810000.0).buffer(6500.0)
+    return GeoDataFrame(geometry=[disc], crs=6344).to_crs(4326)
+
+
+def test_iter_selected_tile_batches(tile_index: GeoDataFrame, aoi: GeoDataFrame):
+    batches = list(iter_selected_tile_batches(aoi, tile_index, batch_size=16))
+
+    assert all(len(batch) <= 16 for batch in batches)
+    selected = [name for batch in batches for name in batch["tile_name"]]
+    expected = select_tiles_by_location(aoi, tile_index)["tile_name"]
+    assert sorted(selected) == sorted(expected)
+    assert len(selected) == len(set(selected))
+
+
+def test_iter_selected_tile_batches_are_spatially_compact(
+    tile_index: GeoDataFrame, aoi: GeoDataFrame
+):
+    batches = iter_selected_tile_batches(aoi, tile_index, batch_size=16)
+
+    first = next(batches)
+    minx, miny, maxx, maxy = first.total_bounds
+    # 16 tiles along a Hilbert curve cover a square, not a row of the index
+    assert maxx - minx <= 4000.0
+    assert maxy - miny <= 4000.0
+
+
+def test_iter_selected_tile_batches_multi_feature_aoi(tile_index: GeoDataFrame):
+    # two culverts in one tile, a third in the next
+    points = [
+        Point(600200.0, 4800200.0),
+        Point(600800.0, 4800800.0),
+        Point(601500.0, 4800500.0),
+    ]
+    aoi = GeoDataFrame(geometry=points, crs=6344)
+
+    batches = list(iter_selected_tile_batches(aoi, tile_index, batch_size=16))
+
+    selected = [name for batch in batches for name in batch["tile_name"]]
+    assert sorted(selected) == ["15TXN000000", "15TXN001000"]
@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+
+import pytest
+from shapely import box
+
+from src.data.point_cloud.executor import TileTask
+from src.data.point_cloud.plan import (
+    EPTHierarchy,
+    TilePlanner,
+    largest_first,
+    plan_tile_tasks,
+)
+
+
+@pytest.fixture()
+def ept_json_url(tmp_path: Path, local_server) -> str:
+    """Serves the ept.json and hierarchy of a small two-level EPT source, whose
+    1-0-1-0 node starts a hierarchy subtree.
+    """
+    root = tmp_path / "ept"
+    (root / "ept-hierarchy").mkdir(parents=True)
+    ept = {
+        "bounds": [0, 0, 0, 100, 100, 100],
+        "span": 10,
+        "schema": [
+            {"name": "X", "size": 4},
+            {"name": "Y", "size": 4},
+            {"name": "Z", "size": 4},
+            {"name": "Intensity", "size": 2},
+        ],
+    }
+    hierarchy = {"0-0-0-0": 1000, "1-0-0-0": 400, "1-1-0-0": 400, "1-0-1-0": -1}
+    subtree = {"1-0-1-0": 200, "2-0-2-0": 100}
+    (root / "ept.json").write_text(json.dumps(ept))
+    (root / "ept-hierarchy/0-0-0-0.json").write_text(json.dumps(hierarchy))
+    (root / "ept-hierarchy/1-0-1-0.json").write_text(json.dumps(subtree))
+
+    return f"{local_server.serve(tmp_path)}/ept/ept.json"
+
+
+def test_estimate_read_counts_nodes_in_polygon(ept_json_url: str):
+    hierarchy = EPTHierarchy(ept_json_url)
+
+    points, nodes, node_bytes = hierarchy.estimate_read(box(0, 0, 100, 100))
+    partial_points, partial_nodes, _ = hierarchy.estimate_read(box(0, 0, 40, 100))
+
+    assert (points, nodes, node_bytes) == (2100, 5, 2100 * 14)
+    # 40% of the root, 80% of the two level 1 nodes it overlaps, all of 2-0-2-0
+    assert partial_points == pytest.approx(400 + 320 + 160 + 100)
+    assert partial_nodes == 4
+
+
+def test_estimate_read_stops_at_read_resolution(ept_json_url: str):
+    hierarchy = EPTHierarchy(ept_json_url)
+
+    root_only, nodes, _ = hierarchy.estimate_read(box(0, 0, 100, 100), 10.0)
+    two_levels, _, _ = hierarchy.estimate_read(box(0, 0, 100, 100), 5.0)
+
+    assert (root_only, nodes) == (1000, 1)
+    assert two_levels == 2000
+
+
+def _task(tile_name: str, ept_json_url: str, polygon: str) -> TileTask:
+    reader = {"type": "readers.ept", "filename": ept_json_url, "polygon": polygon}
+    return TileTask(tile_name, [json.dumps([reader])])
+
+
+def test_plan_tile_tasks_runs_largest_first(ept_json_url: str):
+    tasks = [
+        _task("small", ept_json_url, box(0, 0, 10, 10).wkt),
+        _task("large", ept_json_url, box(0, 0, 100, 100).wkt),
+        _task("medium", ept_json_url, box(0, 0, 50, 50).wkt),
+    ]
+
+    planned = [task for task, _ in plan_tile_tasks(tasks, TilePlanner())]
+    ordered = list(largest_first(planned, window=2))
+
+    assert planned[1].estimated_points == 2100
+    assert planned[1].estimated_memory_mib > planned[0].estimated_memory_mib
+    assert [task.tile_name for task in ordered] == ["large", "medium", "small"]
+
+
+def test_largest_first_yields_before_planning_the_window():
+    planned = []
+
+    def tasks():
+        for i in range(100):
+            planned.append(i)
+            yield TileTask(f"tile_{i}", [], estimated_points=i)
+
+    ordered = largest_first(tasks(), window=16)
+
+    assert next(ordered).tile_name == "tile_1"
+    assert len(planned) == 2
+    rest = [task.tile_name for task in ordered]
+    assert len(rest) == 99
+    assert rest[-1] == "tile_0"
@@ -1,13 +1,19 @@
+import pytest
+from pyproj import CRS
+
 from src.data.point_cloud.point_source import vendor_classified_ground_points
+from src.data.point_cloud.tile import TileData
 
 
 class MochTileData:
     epsg: int = 6344
+    crs: CRS = CRS.from_epsg(6344)
     ept_filter_as_wkt: str = "POLYGON ((0 0, 0 10, 10 10, 10 0, 0 0))"
 
 
 class MochEPTData:
     ept_json_url: str = "https://fake.com/ept.json"
+    crs: CRS = CRS.from_epsg(3857)
 
 
 def test_vendor_classified_ground_points():
@@ -35,3 +41,32 @@ def test_vendor_classified_ground_points():
     ]
 
     assert result == expected
+
+
+def test_vendor_classified_ground_points_elides_noop_reprojection():
+    ept_data = MochEPTData()
+    ept_data.crs = CRS("EPSG:6344+5703")  # same horizontal CRS, with NAVD88 heights
+
+    result = vendor_classified_ground_points(ept_data, MochTileData())
+
+    assert [stage["type"] for stage in result] == ["readers.ept", "filters.range"]
+    assert result[-1]["tag"] == "vendor_classified_ground_points"
+
+
+def test_vendor_classified_ground_points_limits_read_resolution():
+    tile_data = TileData(
+        tile_name="15TXN689290",
+        minx=689000.0,
+        miny=4929000.0,
+        maxx=690000.0,
+        maxy=4930000.0,
+        crs=CRS.from_epsg(6344),
+        ept_filter_as_wkt="POLYGON ((0 0, 0 10, 10 10, 10 0, 0 0))",
+    )
+
+    full = vendor_classified_ground_points(MochEPTData(), tile_data)
+    coarse = vendor_classified_ground_points(MochEPTData(), tile_data, 1.0)
+
+    assert "resolution" not in full[0]
+    # a meter spans about 1 / cos(44.5) Web Mercator units at the tile
+    assert coarse[0]["resolution"] == pytest.approx(1.4, abs=0.05)
@@ -4,7 +4,16 @@ import pytest
 from pyproj import CRS
 from shapely import Polygon
 
-from src.data.point_cloud.product import delauney_mesh_dem, product_stages_func_factory
+from src.data.point_cloud.product import (
+    DemEngine,
+    OutputProfile,
+    ProductName,
+    delauney_mesh_dem,
+    generate_product_stages,
+    intensity_raster,
+    point_density_raster,
+    product_stages_func_factory,
+)
 from src.data.point_cloud.tile import TileData
 
 
@@ -135,3 +144,81 @@ def test_stages_func_factory(tile_data: TileData):
     ]
 
     assert result == expected
+
+
+def test_generate_product_stages(tile_data: TileData):
+    options = {"resolution": 0.5, "output_dir": Path("/path/to/output")}
+
+    result = generate_product_stages(tile_data, ProductName.DELAUNEY_MESH_DEM, options)
+
+    assert result == delauney_mesh_dem(tile_data, 0.5, Path("/path/to/output"))
+
+
+def test_cog_output_profile_writes_tiled_gtiff(tile_data: TileData):
+    output_dir = Path("/path/to/output")
+
+    dem = delauney_mesh_dem(
+        tile_data, 0.5, output_dir, output_profile=OutputProfile.COG
+    )
+    intensity = intensity_raster(
+        tile_data, 0.5, output_dir, output_profile=OutputProfile.COG
+    )
+
+    assert dem[-1]["gdalopts"] == (
+        "TILED=YES,BLOCKXSIZE=512,BLOCKYSIZE=512,COMPRESS=DEFLATE,PREDICTOR=3"
+    )
+    assert intensity[-1]["gdalopts"].endswith("PREDICTOR=2")
+
+
+def test_point_density_raster(tile_data: TileData):
+    func = product_stages_func_factory(
+        ProductName.POINT_DENSITY_RASTER,
+        resolution=1.0,
+        output_dir=Path("/path/to/output"),
+    )
+    result = func(tile_data=tile_data)
+
+    expected = [
+        {
+            "tag": "write_point_density_raster",
+            "inputs": ["vendor_classified_ground_points"],
+            "type": "writers.gdal",
+            "output_type": "count",
+            "binmode": True,
+            "resolution": 1.0,
+            "width": 1000,
+            "height": 1000,
+            "origin_x": 10.0,
+            "origin_y": 10.0,
+            "filename": "/path/to/output/density_15TXN689291.tif",
+            "gdaldriver": "GTiff",
+            "gdalopts": "COMPRESS=DEFLATE",
+            "data_type": "uint16",
+            "nodata": 0,
+        },
+    ]
+
+    assert result == expected
+    assert result == point_density_raster(tile_data, 1.0, Path("/path/to/output"))
+
+
+def test_delauney_mesh_dem_numpy_engine(tile_data: TileData):
+    result = delauney_mesh_dem(
+        tile_data, 0.5, Path("/path/to/output"), engine=DemEngine.NUMPY
+    )
+
+    assert [stage["type"] for stage in result] == ["filters.python"]
+    assert result[0]["inputs"] == ["vendor_classified_ground_points"]
+    assert result[0]["pdalargs"] == {
+        "filename": "/path/to/output/dem_15TXN689291.tif",
+        "resolution": 0.5,
+        "width": 2000,
+        "height": 2000,
+        "origin_x": 10.0,
+        "origin_y": 10.0,
+        "crs": "EPSG:6344",
+        "gdaldriver": "GTiff",
+        "gdalopts": "COMPRESS=DEFLATE",
+        "data_type": "float32",
+        "nodata": -999999,
+    }
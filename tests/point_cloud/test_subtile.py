@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+import rasterio
+import shapely
+from pyproj import CRS
+from rasterio.transform import from_origin
+
+from src.data.point_cloud.crs import get_transformer
+from src.data.point_cloud.subtile import mosaic_subtiles, split_tile_data
+from src.data.point_cloud.tile import TileData
+
+
+@pytest.fixture()
+def tile() -> TileData:
+    return TileData(
+        tile_name="15TXN689290",
+        minx=689000.0,
+        miny=4929000.0,
+        maxx=689010.0,
+        maxy=4929010.0,
+        crs=CRS.from_epsg(6344),
+        ept_filter_as_wkt="POLYGON ((0 0, 0 10, 10 10, 10 0, 0 0))",
+    )
+
+
+def test_split_tile_data(tile: TileData):
+    result = split_tile_data(tile, 2, 1.2, 1.0, CRS.from_epsg(6344))
+
+    assert [s.tile_data.tile_name for s in result] == [
+        "15TXN689290_r0c0",
+        "15TXN689290_r0c1",
+        "15TXN689290_r1c0",
+        "15TXN689290_r1c1",
+    ]
+    assert result[0].core == (689000.0, 4929000.0, 689005.0, 4929005.0)
+    assert result[3].core == (689005.0, 4929005.0, 689010.0, 4929010.0)
+    assert (result[0].tile_data.minx, result[0].tile_data.maxx) == (688998.0, 689007.0)
+
+
+def test_split_tile_data_reprojects_read_polygons(tile: TileData):
+    same = split_tile_data(tile, 2, 1.2, 1.0, CRS.from_epsg(6344))
+    mercator = split_tile_data(tile, 2, 1.2, 1.0, CRS.from_epsg(3857))
+
+    polygon = shapely.from_wkt(same[0].tile_data.ept_filter_as_wkt)
+    assert polygon.bounds == (688988.0, 4928988.0, 689017.0, 4929017.0)
+    transformer = get_transformer(CRS.from_epsg(6344), CRS.from_epsg(3857))
+    expected = shapely.transform(polygon, transformer.transform, interleaved=False)
+    projected = shapely.from_wkt(mercator[0].tile_data.ept_filter_as_wkt)
+    assert projected.equals_exact(expected, 1e-6)
+
+
+def _write_raster(file: Path, bounds: tuple, value: float) -> None:
+    width, height = int(bounds[2] - bounds[0]), int(bounds[3] - bounds[1])
+    profile = {
+        "driver": "GTiff",
+        "width": width,
+        "height": height,
+        "count": 1,
+        "dtype": "float32",
+        "crs": "EPSG:6344",
+        "nodata": -9999.0,
+        "transform": from_origin(bounds[0], bounds[3], 1.0, 1.0),
+    }
+    with rasterio.open(file, "w", **profile) as dst:
+        dst.write(np.full((1, height, width), value, dtype="float32"))
+
+
+def test_mosaic_subtiles_writes_only_cores(tile: TileData, tmp_path: Path):
+    parts = []
+    for i, subtile in enumerate(split_tile_data(tile, 2, 2.0, 1.0, tile.crs)):
+        part_file = tmp_path / f"{subtile.tile_data.tile_name}.tif"
+        td = subtile.tile_data
+        _write_raster(part_file, (td.minx, td.miny, td.maxx, td.maxy), i)
+        parts.append((str(part_file), subtile.core))
+    output_file = tmp_path / "dem_15TXN689290.tif"
+
+    mosaic_subtiles(tile, parts, 1.0, str(output_file))
+
+    with rasterio.open(output_file) as src:
+        data = src.read(1)
+        assert src.bounds == (689000.0, 4929000.0, 689010.0, 4929010.0)
+    # rows run north to south, so the southern sub-tiles fill the bottom half
+    assert (data[5:, :5] == 0).all()
+    assert (data[5:, 5:] == 1).all()
+    assert (data[:5, :5] == 2).all()
+    assert (data[:5, 5:] == 3).all()
@@ -1,7 +1,8 @@
+import numpy as np
 import pytest
 from pyproj import CRS
 
-from src.data.point_cloud.tile import TileData
+from src.data.point_cloud.tile import TileData, TileDataBatch
 
 
 @pytest.fixture()
@@ -39,3 +40,40 @@ def test_tile_data_width(tile_data: TileData):
     assert tile_data.width(1.0) == 10
     assert tile_data.width(0.5) == 20
     assert tile_data.width(0.3) == 34
+
+
+@pytest.fixture()
+def tile_data_batch() -> TileDataBatch:
+    return TileDataBatch(
+        tile_name=np.array(["15TXN689291", "15TXN689292"], dtype=object),
+        minx=np.array([1.0, 11.0]),
+        miny=np.array([2.0, 2.0]),
+        maxx=np.array([11.0, 21.0]),
+        maxy=np.array([22.0, 22.0]),
+        crs=CRS.from_epsg(6344),
+        ept_filter_as_wkt=np.array(["POLYGON (...)", "POLYGON (...)"], dtype=object),
+    )
+
+
+def test_tile_data_batch_epsg(tile_data_batch: TileDataBatch):
+    assert tile_data_batch.epsg == 6344
+
+
+def test_tile_data_batch_getitem(tile_data_batch: TileDataBatch, tile_data: TileData):
+    assert tile_data_batch[0] == tile_data
+
+
+def test_tile_data_batch_iter_matches_tile_data(
+    tile_data_batch: TileDataBatch, tile_data: TileData
+):
+    first = next(iter(tile_data_batch))
+
+    assert first == tile_data
+    assert type(first.minx) is float
+
+
+def test_tile_data_batch_iter(tile_data_batch: TileDataBatch):
+    result = list(tile_data_batch)
+
+    assert [tile.tile_name for tile in result] == ["15TXN689291", "15TXN689292"]
+    assert [tile.epsg for tile in result] == [6344, 6344]
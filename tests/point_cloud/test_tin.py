@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+import rasterio
+
+from src.data.point_cloud.tin import rasterize_tin, write_tin_dem
+
+
+@pytest.fixture()
+def plane_points() -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(0)
+    x = np.concatenate([rng.uniform(0.0, 100.0, 2000), [0.0, 0.0, 100.0, 100.0]])
+    y = np.concatenate([rng.uniform(0.0, 100.0, 2000), [0.0, 100.0, 0.0, 100.0]])
+    return {"X": x, "Y": y, "Z": 300.0 + 0.5 * x - 0.25 * y}
+
+
+def test_rasterize_tin_interpolates_plane(plane_points: dict[str, np.ndarray]):
+    result = rasterize_tin(
+        plane_points["X"],
+        plane_points["Y"],
+        plane_points["Z"],
+        1.0,
+        100,
+        100,
+        0.0,
+        0.0,
+        -9999.0,
+    )
+
+    cols = np.arange(100) + 0.5
+    rows_y = 100.0 - (np.arange(100) + 0.5)
+    expected = 300.0 + 0.5 * cols[np.newaxis, :] - 0.25 * rows_y[:, np.newaxis]
+    np.testing.assert_allclose(result, expected)
+
+
+def test_rasterize_tin_outside_hull_is_nodata(plane_points: dict[str, np.ndarray]):
+    result = rasterize_tin(
+        plane_points["X"],
+        plane_points["Y"],
+        plane_points["Z"],
+        1.0,
+        110,
+        100,
+        0.0,
+        0.0,
+        -9999.0,
+    )
+
+    assert (result[:, 100:] == -9999.0).all()
+    assert (result[:, :100] != -9999.0).all()
+
+
+def test_rasterize_tin_blocks_match(plane_points: dict[str, np.ndarray]):
+    args = (
+        plane_points["X"],
+        plane_points["Y"],
+        plane_points["Z"],
+        1.0,
+        100,
+        100,
+        0.0,
+        0.0,
+        -9999.0,
+    )
+
+    np.testing.assert_array_equal(
+        rasterize_tin(*args, block_rows=7), rasterize_tin(*args, block_rows=100)
+    )
+
+
+@pytest.mark.parametrize(
+    "x, y",
+    [
+        ([], []),
+        ([10.0, 20.0], [10.0, 20.0]),
+        ([10.0, 20.0, 30.0, 40.0], [10.0, 20.0, 30.0, 40.0]),
+    ],
+    ids=["no-points", "two-points", "collinear"],
+)
+def test_rasterize_tin_degenerate_points_are_nodata(x: list, y: list):
+    x, y = np.array(x), np.array(y)
+
+    result = rasterize_tin(x, y, 300.0 + x, 1.0, 50, 50, 0.0, 0.0, -9999.0)
+
+    assert result.shape == (50, 50)
+    assert (result == -9999.0).all()
+
+
+def test_write_tin_dem(plane_points: dict[str, np.ndarray], tmp_path: Path):
+    args = {
+        "filename": str(tmp_path / "dem_15TXN689290.tif"),
+        "resolution": 0.5,
+        "width": 200,
+        "height": 200,
+        "origin_x": 0.0,
+        "origin_y": 0.0,
+        "crs": "EPSG:6344",
+        "gdaldriver": "GTiff",
+        "gdalopts": "COMPRESS=DEFLATE",
+        "data_type": "float32",
+        "nodata": -999999,
+    }
+
+    write_tin_dem(plane_points, args)
+
+    with rasterio.open(args["filename"]) as src:
+        assert src.bounds == (0.0, 0.0, 100.0, 100.0)
+        assert src.crs.to_epsg() == 6344
+        assert src.nodata == -999999
+        assert src.profile["compress"] == "deflate"
+        assert src.read(1)[0, 0] == pytest.approx(300.0 + 0.5 * 0.25 - 0.25 * 99.75)
@@ -0,0 +1,121 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+import requests
+
+from src.data.tile_index.config import TileIndexPipelineConfig
+from src.data.tile_index.ept_metadata import EPTMetadataResolver
+
+
+@pytest.fixture()
+def base_url(tmp_path: Path, local_server) -> str:
+    """Serves an ept.json for each of 100 workunits from a local directory."""
+    root = tmp_path / "usgs-lidar-public"
+    for i in range(100):
+        (root / f"MN_Workunit_{i}").mkdir(parents=True)
+        ept = {"srs": {"horizontal": "3857", "vertical": "5703"}}
+        (root / f"MN_Workunit_{i}/ept.json").write_text(json.dumps(ept))
+
+    return f"{local_server.serve(tmp_path)}/usgs-lidar-public"
+
+
+@pytest.fixture()
+def config_file(tmp_path: Path, base_url: str) -> Path:
+    sources = "\n".join(f"""
+[[tile_index_sources]]
+workunit = "MN_Workunit_{i}"
+zipped_shapefile = "MN_Workunit_{i}_TileIndex.zip"
+tile_name_field = "Name"
+ept_json_url = "{base_url}/MN_Workunit_{i}/ept.json"
+""" for i in range(100))
+    config_file = tmp_path / "tile_index_pipeline.toml"
+    config_file.write_text(sources)
+    return config_file
+
+
+def test_parse_toml_resolves_from_warm_cache(
+    config_file: Path, local_server, tmp_path: Path
+):
+    cache_file = tmp_path / "ept_metadata_cache.json"
+
+    cold = TileIndexPipelineConfig.parse_toml(
+        config_file, EPTMetadataResolver.load(cache_file)
+    )
+    cold_requests = len(local_server.responses)
+    warm = TileIndexPipelineConfig.parse_toml(
+        config_file, EPTMetadataResolver.load(cache_file)
+    )
+
+    assert cold_requests == 100
+    assert len(local_server.responses) == 100
+    assert {s.ept_epsg_code for s in cold.tile_index_sources} == {"3857"}
+    assert warm == cold
+
+
+class BarrierSession(requests.Session):
+    """Holds each request until parties requests are waiting at once, failing
+    them all with BrokenBarrierError if that does not happen within the timeout.
+    """
+
+    def __init__(self, parties: int) -> None:
+        super().__init__()
+        self.barrier = threading.Barrier(parties, timeout=10)
+
+    def get(self, url, **kwargs) -> requests.Response:
+        self.barrier.wait()
+        return super().get(url, **kwargs)
+
+
+def test_resolve_fetches_concurrently(base_url: str, tmp_path: Path):
+    urls = [f"{base_url}/MN_Workunit_{i}/ept.json" for i in range(4)]
+    resolver = EPTMetadataResolver.load(
+        tmp_path / "cache.json", session=BarrierSession(4), max_workers=4
+    )
+
+    assert resolver.resolve(urls) == {url: "3857" for url in urls}
+
+
+def test_resolve_revalidates_expired_entries(
+    base_url: str, local_server, tmp_path: Path
+):
+    url = f"{base_url}/MN_Workunit_0/ept.json"
+    resolver = EPTMetadataResolver.load(tmp_path / "cache.json", ttl=0)
+
+    first = resolver.resolve([url])
+    second = resolver.resolve([url, url])
+
+    assert first == second == {url: "3857"}
+    assert [code for _, code in local_server.responses] == [200, 304]
+
+
+def test_resolve_leaves_unreadable_sources_unresolved(
+    base_url: str, local_server, tmp_path: Path
+):
+    (tmp_path / "usgs-lidar-public/MN_Broken").mkdir()
+    (tmp_path / "usgs-lidar-public/MN_Broken/ept.json").write_text("<html>")
+    broken = f"{base_url}/MN_Broken/ept.json"
+    resolver = EPTMetadataResolver.load(tmp_path / "cache.json")
+
+    assert resolver.resolve([broken]) == {broken: None}
+    assert resolver.resolve([broken]) == {broken: None}
+    assert len(local_server.responses) == 2  # failures are not cached
+
+
+def test_parse_toml_keeps_configured_epsg_codes(tmp_path: Path):
+    config_file = tmp_path / "tile_index_pipeline.toml"
+    config_file.write_text("""
+[[tile_index_sources]]
+workunit = "MN_LakeCounty_2018"
+zipped_shapefile = "MN_LakeCounty_2018_C20_TileIndex.zip"
+tile_name_field = "Name"
+ept_json_url = "http://127.0.0.1:9/ept.json"
+ept_epsg_code = "26915"
+""")
+
+    config = TileIndexPipelineConfig.parse_toml(
+        config_file, EPTMetadataResolver.load(tmp_path / "cache.json")
+    )
+
+    assert config.tile_index_sources[0].ept_epsg_code == "26915"
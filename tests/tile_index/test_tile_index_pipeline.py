@@ -0,0 +1,117 @@
+import zipfile
+from pathlib import Path
+
+import geopandas
+import pytest
+from geopandas import GeoDataFrame
+from shapely import box
+
+from src.data.tile_index import pipeline
+from src.data.tile_index.config import TileIndexPipelineConfig, TileIndexSource
+from src.data.tile_index.pipeline import tile_index_pipeline
+
+
+def _write_zipped_shapefile(input_dir: Path, workunit: str, offset: float) -> str:
+    shapefile_dir = input_dir / workunit
+    shapefile_dir.mkdir()
+    GeoDataFrame(
+        data={"Name": [f"{workunit}_{i}" for i in range(3)], "Other": [1, 2, 3]},
+        geometry=[box(offset + i, 0, offset + i + 1, 1) for i in range(3)],
+        crs=6344,
+    ).to_file(shapefile_dir / f"{workunit}.shp")
+    zipped_shapefile = f"{workunit}_TileIndex.zip"
+    with zipfile.ZipFile(input_dir / zipped_shapefile, "w") as zf:
+        for f in shapefile_dir.iterdir():
+            zf.write(f, f.name)
+    return zipped_shapefile
+
+
+@pytest.fixture()
+def input_dir(tmp_path: Path) -> Path:
+    input_dir = tmp_path / "tile_index"
+    input_dir.mkdir()
+    return input_dir
+
+
+def _source(input_dir: Path, workunit: str, offset: float) -> TileIndexSource:
+    zipped_shapefile = _write_zipped_shapefile(input_dir, workunit, offset)
+    return TileIndexSource(workunit, zipped_shapefile, "Name", ept_epsg_code="3857")
+
+
+@pytest.fixture()
+def extracted(monkeypatch) -> list[Path]:
+    calls = []
+    extract = pipeline._extract_tile_index
+
+    def counting_extract(zipped_shapefile: Path, tile_name_field: str):
+        calls.append(zipped_shapefile)
+        return extract(zipped_shapefile, tile_name_field)
+
+    monkeypatch.setattr(pipeline, "_extract_tile_index", counting_extract)
+    return calls
+
+
+def test_tile_index_pipeline_reprocesses_only_new_sources(
+    input_dir: Path, tmp_path: Path, extracted: list[Path]
+):
+    cache_dir, output_file = tmp_path / "cache", tmp_path / "tile_index.parquet"
+    sources = [_source(input_dir, "MN_A_2021", 0), _source(input_dir, "MN_B_2021", 10)]
+
+    tile_index_pipeline(
+        TileIndexPipelineConfig(sources), input_dir, output_file, cache_dir
+    )
+    sources.append(_source(input_dir, "MN_C_2021", 20))
+    tile_index_pipeline(
+        TileIndexPipelineConfig(sources), input_dir, output_file, cache_dir
+    )
+
+    assert [f.name for f in extracted] == [
+        "MN_A_2021_TileIndex.zip",
+        "MN_B_2021_TileIndex.zip",
+        "MN_C_2021_TileIndex.zip",
+    ]
+    result = geopandas.read_parquet(output_file)
+    assert sorted(result["workunit"].unique()) == [
+        "MN_A_2021",
+        "MN_B_2021",
+        "MN_C_2021",
+    ]
+    assert "Other" not in result.columns
+    assert len(list(cache_dir.glob("*.parquet"))) == 3
+
+
+def test_tile_index_pipeline_reprocesses_changed_sources(
+    input_dir: Path, tmp_path: Path, extracted: list[Path]
+):
+    cache_dir, output_file = tmp_path / "cache", tmp_path / "tile_index.parquet"
+    sources = [_source(input_dir, "MN_A_2021", 0), _source(input_dir, "MN_B_2021", 10)]
+
+    tile_index_pipeline(
+        TileIndexPipelineConfig(sources), input_dir, output_file, cache_dir
+    )
+    sources[1].ept_epsg_code = "26915"
+    tile_index_pipeline(
+        TileIndexPipelineConfig(sources), input_dir, output_file, cache_dir
+    )
+
+    assert [f.name for f in extracted][2:] == ["MN_B_2021_TileIndex.zip"]
+    result = geopandas.read_parquet(output_file)
+    assert set(result["ept_epsg_code"]) == {"3857", "26915"}
+    assert len(list(cache_dir.glob("*.parquet"))) == 2
+
+
+def test_tile_index_pipeline_with_workers(input_dir: Path, tmp_path: Path):
+    sources = [_source(input_dir, f"MN_{i}_2021", i * 10) for i in range(4)]
+    config = TileIndexPipelineConfig(sources)
+
+    tile_index_pipeline(
+        config, input_dir, tmp_path / "serial.parquet", tmp_path / "serial"
+    )
+    tile_index_pipeline(
+        config, input_dir, tmp_path / "pool.parquet", tmp_path / "pool", workers=2
+    )
+
+    serial = geopandas.read_parquet(tmp_path / "serial.parquet")
+    pool = geopandas.read_parquet(tmp_path / "pool.parquet")
+    assert len(pool) == 12
+    assert pool.equals(serial)
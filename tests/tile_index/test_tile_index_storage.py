@@ -0,0 +1,136 @@
+import json
+from pathlib import Path
+
+import geopandas
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+from geopandas import GeoDataFrame
+from shapely import box
+
+from src.data.tile_index.storage import (
+    PARTITIONS_FILE_NAME,
+    read_tile_index,
+    sort_spatially,
+    write_partitioned_tile_index,
+    write_tile_index_parquet,
+)
+
+
+@pytest.fixture
+def tile_index() -> GeoDataFrame:
+    col, row = np.meshgrid(np.arange(40), np.arange(40))
+    col, row = col.ravel(), row.ravel()
+    minx = 600000.0 + col * 1000.0
+    miny = 4800000.0 + row * 1000.0
+    return GeoDataFrame(
+        data={
+            "tile_name": [f"15TXN{c:03d}{r:03d}" for c, r in zip(col, row)],
+            "workunit": [f"SYNTHETIC_{c // 10}_2024" for c in col],
+        },
+        geometry=box(minx, miny, minx + 1000.0, miny + 1000.0),
+        crs=6344,
+    ).astype({"tile_name": "string", "workunit": "string"})
+
+
+@pytest.fixture
+def aoi() -> GeoDataFrame:
+    return GeoDataFrame(
+        geometry=[box(602500.0, 4802500.0, 603500.0, 4803500.0)], crs=6344
+    ).to_crs(4326)
+
+
+def _expected_tiles(tile_index: GeoDataFrame, aoi: GeoDataFrame) -> set[str]:
+    return set(
+        tile_index[tile_index.intersects(aoi.to_crs(6344).union_all())].tile_name
+    )
+
+
+def test_sort_spatially_keeps_neighbours_together(tile_index):
+    sorted_index = sort_spatially(tile_index)
+    assert set(sorted_index.tile_name) == set(tile_index.tile_name)
+    centroids = sorted_index.centroid
+    steps = centroids.iloc[1:].distance(centroids.iloc[:-1], align=False)
+    # unlike row-major order, the curve never jumps across the index
+    assert steps.max() <= 2000.0
+
+
+def test_write_tile_index_parquet(tmp_path: Path, tile_index, aoi):
+    output_file = tmp_path / "tile_index.parquet"
+    write_tile_index_parquet(tile_index, output_file, row_group_size=100)
+
+    metadata = pq.ParquetFile(output_file).metadata
+    assert metadata.num_row_groups == 16
+    geo = json.loads(metadata.metadata[b"geo"])
+    assert "covering" in geo["columns"]["geometry"]
+
+    selected = read_tile_index(output_file, aoi)
+    assert len(selected) < len(tile_index)
+    assert _expected_tiles(tile_index, aoi) <= set(selected.tile_name)
+    assert len(read_tile_index(output_file)) == len(tile_index)
+
+
+def test_write_partitioned_tile_index(tmp_path: Path, tile_index, aoi):
+    output_dir = tmp_path / "tile_index"
+    write_partitioned_tile_index(tile_index, output_dir)
+
+    partitions = sorted(p.name for p in output_dir.glob("workunit=*"))
+    assert partitions == [f"workunit=SYNTHETIC_{i}_2024" for i in range(4)]
+    assert (output_dir / PARTITIONS_FILE_NAME).exists()
+
+    selected = read_tile_index(output_dir, aoi)
+    assert set(selected.workunit) == {"SYNTHETIC_0_2024"}
+    assert selected.workunit.dtype == "string"
+    assert _expected_tiles(tile_index, aoi) <= set(selected.tile_name)
+
+    everything = read_tile_index(output_dir)
+    assert set(everything.tile_name) == set(tile_index.tile_name)
+    assert everything.crs == tile_index.crs
+
+
+def test_write_partitioned_tile_index_replaces_stale_partitions(
+    tmp_path: Path, tile_index
+):
+    output_dir = tmp_path / "tile_index"
+    write_partitioned_tile_index(tile_index, output_dir)
+    first_workunit = tile_index[tile_index.workunit == "SYNTHETIC_0_2024"]
+    write_partitioned_tile_index(first_workunit, output_dir)
+
+    assert [p.name for p in output_dir.glob("workunit=*")] == [
+        "workunit=SYNTHETIC_0_2024"
+    ]
+    assert len(read_tile_index(output_dir)) == len(first_workunit)
+
+
+def test_read_tile_index_outside_the_index(tmp_path: Path, tile_index):
+    output_dir = tmp_path / "tile_index"
+    write_partitioned_tile_index(tile_index, output_dir)
+    far_away = GeoDataFrame(geometry=[box(0.0, 0.0, 1.0, 1.0)], crs=6344)
+
+    selected = read_tile_index(output_dir, far_away)
+    assert selected.empty
+    assert set(selected.columns) == {"tile_name", "workunit", "geometry"}
+    assert selected.crs == tile_index.crs
+
+
+@pytest.mark.parametrize("with_aoi", [False, True])
+def test_read_tile_index_without_tiles(tmp_path: Path, tile_index, aoi, with_aoi: bool):
+    output_dir = tmp_path / "tile_index"
+    write_partitioned_tile_index(tile_index.iloc[:0], output_dir)
+
+    selected = read_tile_index(output_dir, aoi if with_aoi else None)
+    assert isinstance(selected, geopandas.GeoDataFrame)
+    assert selected.empty
+    assert set(selected.columns) == {"tile_name", "workunit", "geometry"}
+    assert selected["workunit"].dtype == "string"
+    assert selected.crs == tile_index.crs
+
+
+def test_read_tile_index_geopackage(tmp_path: Path, tile_index, aoi):
+    output_file = tmp_path / "tile_index.gpkg"
+    tile_index.to_file(output_file)
+
+    selected = read_tile_index(output_file, aoi)
+    assert isinstance(selected, geopandas.GeoDataFrame)
+    assert _expected_tiles(tile_index, aoi) <= set(selected.tile_name)
+    assert len(selected) < len(tile_index)
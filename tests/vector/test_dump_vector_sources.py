@@ -0,0 +1,129 @@
+from pathlib import Path
+
+import pytest
+
+from src import settings as settings_module
+from src.data.vector import dump_vector_sources as dump_module
+from src.data.vector.dump_vector_sources import dump_vector_sources
+from src.settings import LoadLayer, Settings, VectorSource
+
+
+@pytest.fixture()
+def dump_script(tmp_path: Path, monkeypatch) -> Path:
+    """A stand-in for the ogr2ogr dump script that records its arguments."""
+    script = tmp_path / "dump_to_pgsql.sh"
+    script.write_text('echo "$2 $3 $4" > "$1"\n')
+    monkeypatch.setattr(dump_module, "DUMP_SCRIPT", script)
+    monkeypatch.setattr(settings_module, "SQL_DUMP_DIR", tmp_path / "sql")
+    return script
+
+
+@pytest.fixture()
+def settings(tmp_path: Path) -> Settings:
+    source_file = tmp_path / "struc_culvert_inventory_pub.gpkg"
+    source_file.write_bytes(b"culverts")
+    layers = ["Bridge_Assessments", "Stream_Crossing_Summary", "Culvert_Opening"]
+    return Settings(
+        postgres_db="db",
+        postgres_user="user",
+        postgres_pass="pass",
+        postgres_host="localhost",
+        postgres_port=5432,
+        vector_sources={
+            "mndnr_culvert_inventory": VectorSource(
+                download_url=None,
+                filepath=source_file,
+                load_layers=[
+                    LoadLayer(layer=layer, to_table=f"mndnr_{layer.lower()}")
+                    for layer in layers
+                ],
+            )
+        },
+    )
+
+
+def _dump_mtimes(tmp_path: Path) -> dict[str, int]:
+    return {f.name: f.stat().st_mtime_ns for f in (tmp_path / "sql").glob("*.sql")}
+
+
+def test_dump_vector_sources_in_parallel(
+    dump_script: Path, settings: Settings, tmp_path: Path
+):
+    # each dump waits until all three have started, failing if they never do
+    started = tmp_path / "started"
+    started.mkdir()
+    dump_script.write_text(
+        f'touch "{started}/$4"\n'
+        "for i in $(seq 100); do\n"
+        f'  [ "$(ls "{started}" | wc -l)" -ge 3 ] && break\n'
+        "  sleep 0.1\n"
+        "done\n"
+        f'[ "$(ls "{started}" | wc -l)" -ge 3 ] || exit 1\n'
+        'echo "$2 $3 $4" > "$1"\n'
+    )
+
+    dump_vector_sources(settings, max_workers=3, fingerprints_file=tmp_path / "f.json")
+
+    dump_file = tmp_path / "sql/mndnr_culvert_opening_dump.sql"
+    assert dump_file.read_text().split()[1:] == [
+        "Culvert_Opening",
+        "mndnr_culvert_opening",
+    ]
+    assert len(_dump_mtimes(tmp_path)) == 3
+
+
+def test_dump_vector_sources_redumps_on_content_change(
+    dump_script: Path, settings: Settings, tmp_path: Path
+):
+    fingerprints_file = tmp_path / "f.json"
+    source = settings.vector_sources["mndnr_culvert_inventory"]
+
+    dump_vector_sources(settings, fingerprints_file=fingerprints_file)
+    first = _dump_mtimes(tmp_path)
+    source.filepath.touch()
+    dump_vector_sources(settings, fingerprints_file=fingerprints_file)
+    touched = _dump_mtimes(tmp_path)
+    source.load_layers[0].to_table = "mndnr_bridges"
+    dump_vector_sources(settings, fingerprints_file=fingerprints_file)
+    remapped = _dump_mtimes(tmp_path)
+    dump_script.write_text(dump_script.read_text() + "# -lco SPATIAL_INDEX=NONE\n")
+    dump_vector_sources(settings, fingerprints_file=fingerprints_file)
+    reoptioned = _dump_mtimes(tmp_path)
+
+    assert touched == first
+    assert set(remapped.items()) - set(first.items()) == {
+        ("mndnr_bridges_dump.sql", remapped["mndnr_bridges_dump.sql"])
+    }
+    dump_files = [lyr.sql_dump_file.name for lyr in source.load_layers]
+    assert all(reoptioned[name] != remapped[name] for name in dump_files)
+
+
+def test_dump_vector_sources_surfaces_failures(
+    dump_script: Path, settings: Settings, tmp_path: Path
+):
+    dump_script.write_text('echo "ogr2ogr: layer $3 not found" >&2\nexit 1\n')
+    fingerprints_file = tmp_path / "f.json"
+
+    with pytest.raises(RuntimeError, match="mndnr_culvert_opening"):
+        dump_vector_sources(settings, fingerprints_file=fingerprints_file)
+
+    assert _dump_mtimes(tmp_path) == {}
+    assert fingerprints_file.read_text() == "{}"
+
+
+def test_dump_vector_sources_fails_only_unreadable_sources(
+    dump_script: Path, settings: Settings, tmp_path: Path
+):
+    missing = VectorSource(
+        download_url=None,
+        filepath=tmp_path / "missing.gpkg",
+        load_layers=[LoadLayer(layer="Culverts", to_table="missing_culverts")],
+    )
+    settings.vector_sources["missing"] = missing
+    fingerprints_file = tmp_path / "f.json"
+
+    with pytest.raises(RuntimeError, match="missing_culverts"):
+        dump_vector_sources(settings, fingerprints_file=fingerprints_file)
+
+    assert len(_dump_mtimes(tmp_path)) == 3
+    assert "missing_culverts" not in fingerprints_file.read_text()
@@ -0,0 +1,252 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import tracemalloc
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from src.data.vector.extract_vector_sources import (
+    VALIDATORS_FILE_NAME,
+    _download_and_unzip_gpkg,
+    _download_gpkg,
+    extract_vector_sources,
+)
+from src.settings import Settings, VectorSource
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves files from memory with an ETag, honoring Range, If-Range and
+    If-None-Match.
+    """
+
+    files: dict[str, bytes] = {}
+    etag = '"v1"'
+    requests: list[dict] = []
+
+    def do_GET(self) -> None:
+        RangeRequestHandler.requests.append(dict(self.headers))
+        body = self.files[self.path]
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.end_headers()
+            return
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", self.etag) == self.etag:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            if start >= len(body):
+                self.send_response(416)
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    RangeRequestHandler.files = {}
+    RangeRequestHandler.etag = '"v1"'
+    RangeRequestHandler.requests = []
+    host, port = server.server_address[:2]
+    yield f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_gpkg_streams_with_bounded_memory(base_url: str, tmp_path: Path):
+    content = os.urandom(32 * 1024**2)
+    RangeRequestHandler.files["/WESM.gpkg"] = content
+    source_file = tmp_path / "WESM.gpkg"
+
+    tracemalloc.start()
+    _download_gpkg(
+        f"{base_url}/WESM.gpkg", source_file, hashlib.sha256(content).hexdigest()
+    )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert source_file.read_bytes() == content
+    assert peak < 8 * 1024**2
+    assert list(tmp_path.iterdir()) == [source_file]
+
+
+def test_download_gpkg_resumes_partial_download(base_url: str, tmp_path: Path):
+    content = os.urandom(1024**2)
+    RangeRequestHandler.files["/WESM.gpkg"] = content
+    source_file = tmp_path / "WESM.gpkg"
+    (tmp_path / "WESM.gpkg.part").write_bytes(content[:1000])
+    (tmp_path / "WESM.gpkg.part.etag").write_text('"v1"')
+
+    _download_gpkg(f"{base_url}/WESM.gpkg", source_file)
+
+    assert RangeRequestHandler.requests[0]["Range"] == "bytes=1000-"
+    assert source_file.read_bytes() == content
+    assert list(tmp_path.iterdir()) == [source_file]
+
+
+def test_download_gpkg_restarts_when_remote_changed(base_url: str, tmp_path: Path):
+    content = os.urandom(1024**2)
+    RangeRequestHandler.files["/WESM.gpkg"] = content
+    RangeRequestHandler.etag = '"v2"'
+    source_file = tmp_path / "WESM.gpkg"
+    (tmp_path / "WESM.gpkg.part").write_bytes(b"stale partial download")
+    (tmp_path / "WESM.gpkg.part.etag").write_text('"v1"')
+
+    _download_gpkg(f"{base_url}/WESM.gpkg", source_file)
+
+    assert source_file.read_bytes() == content
+
+
+def test_download_gpkg_rejects_checksum_mismatch(base_url: str, tmp_path: Path):
+    RangeRequestHandler.files["/WESM.gpkg"] = b"not the expected content"
+    source_file = tmp_path / "WESM.gpkg"
+
+    with pytest.raises(IOError):
+        _download_gpkg(f"{base_url}/WESM.gpkg", source_file, "0" * 64)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_and_unzip_gpkg(base_url: str, tmp_path: Path):
+    content = os.urandom(1024**2)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        z.writestr("struc_culvert_inventory_pub.gpkg", content)
+        z.writestr("metadata.xml", b"<metadata/>")
+    RangeRequestHandler.files["/culverts.zip"] = buffer.getvalue()
+    source_file = tmp_path / "struc_culvert_inventory_pub.gpkg"
+
+    _download_and_unzip_gpkg(f"{base_url}/culverts.zip", source_file)
+
+    assert source_file.read_bytes() == content
+    assert list(tmp_path.iterdir()) == [source_file]
+
+
+def _zipped(member: str, content: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        z.writestr(member, content)
+    return buffer.getvalue()
+
+
+def _settings(base_url: str, data_dir: Path, **extra_sources) -> Settings:
+    vector_sources = {
+        "usgs_wesm": VectorSource(
+            download_url=f"{base_url}/WESM.gpkg",
+            filepath=data_dir / "external/usgs/WESM.gpkg",
+            load_layers=[],
+        ),
+        "mndnr_culvert_inventory": VectorSource(
+            download_url=f"{base_url}/culverts.zip",
+            filepath=data_dir / "external/mndnr/struc_culvert_inventory_pub.gpkg",
+            load_layers=[],
+        ),
+        **extra_sources,
+    }
+    return Settings(
+        data_dir=data_dir,
+        postgres_db="db",
+        postgres_user="user",
+        postgres_pass="pass",
+        postgres_host="localhost",
+        postgres_port=5432,
+        vector_sources=vector_sources,
+    )
+
+
+def test_extract_vector_sources_checks_recorded_validators(
+    base_url: str, tmp_path: Path
+):
+    RangeRequestHandler.files["/WESM.gpkg"] = b"wesm"
+    RangeRequestHandler.files["/culverts.zip"] = _zipped("culverts.gpkg", b"culverts")
+    settings = _settings(base_url, tmp_path)
+
+    extract_vector_sources(settings)
+    # local copies restored from a sync carry new modification times
+    for src in settings.vector_sources.values():
+        os.utime(src.filepath, (0, 0))
+    extract_vector_sources(settings)
+
+    validators = json.loads((tmp_path / VALIDATORS_FILE_NAME).read_text())
+    assert {v["etag"] for v in validators.values()} == {'"v1"'}
+    if_none_match = [r.get("If-None-Match") for r in RangeRequestHandler.requests]
+    assert sorted(if_none_match, key=str) == [
+        '"v1"',
+        '"v1"',
+        None,
+        None,
+    ]
+    assert (tmp_path / "external/usgs/WESM.gpkg").read_bytes() == b"wesm"
+    culverts = tmp_path / "external/mndnr/struc_culvert_inventory_pub.gpkg"
+    assert culverts.read_bytes() == b"culverts"
+
+
+def test_extract_vector_sources_downloads_changed_sources(
+    base_url: str, tmp_path: Path
+):
+    RangeRequestHandler.files["/WESM.gpkg"] = b"wesm"
+    RangeRequestHandler.files["/culverts.zip"] = _zipped("culverts.gpkg", b"culverts")
+    settings = _settings(base_url, tmp_path)
+
+    extract_vector_sources(settings)
+    RangeRequestHandler.files["/WESM.gpkg"] = b"wesm, revised"
+    RangeRequestHandler.etag = '"v2"'
+    extract_vector_sources(settings)
+
+    assert (tmp_path / "external/usgs/WESM.gpkg").read_bytes() == b"wesm, revised"
+
+
+def test_extract_vector_sources_reports_failed_sources(base_url: str, tmp_path: Path):
+    RangeRequestHandler.files["/WESM.gpkg"] = b"wesm"
+    RangeRequestHandler.files["/culverts.zip"] = _zipped("culverts.gpkg", b"culverts")
+    missing = VectorSource(
+        download_url=f"{base_url}/missing.gpkg",
+        filepath=tmp_path / "external/missing.gpkg",
+        load_layers=[],
+    )
+    settings = _settings(base_url, tmp_path, missing=missing)
+
+    with pytest.raises(RuntimeError, match="missing"):
+        extract_vector_sources(settings)
+
+    validators = json.loads((tmp_path / VALIDATORS_FILE_NAME).read_text())
+    assert sorted(validators) == ["mndnr_culvert_inventory", "usgs_wesm"]
+
+
+@pytest.mark.parametrize(
+    "archive",
+    [b"not a zip", _zipped("culverts.shp", b"culverts")],
+    ids=["bad-zip", "no-gpkg-member"],
+)
+def test_extract_vector_sources_reports_bad_archives(
+    base_url: str, tmp_path: Path, archive: bytes
+):
+    RangeRequestHandler.files["/WESM.gpkg"] = b"wesm"
+    RangeRequestHandler.files["/culverts.zip"] = archive
+    settings = _settings(base_url, tmp_path)
+
+    with pytest.raises(RuntimeError, match="mndnr_culvert_inventory"):
+        extract_vector_sources(settings)
+
+    validators = json.loads((tmp_path / VALIDATORS_FILE_NAME).read_text())
+    assert sorted(validators) == ["usgs_wesm"]
+    assert (tmp_path / "external/usgs/WESM.gpkg").read_bytes() == b"wesm"